@@ -23,5 +23,8 @@ CORS_ALLOW_HEADERS = ["*"]
 # 请求超时配置 (秒)
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
 
+# 启动时预热签名环境
+SIGN_WARM_UP = os.getenv("SIGN_WARM_UP", "1") == "1"
+
 # 视频代理配置
 VIDEO_PROXY_CHUNK_SIZE = 1024 * 1024  # 1MB
@@ -2,6 +2,7 @@
 FastAPI 应用入口
 抖音视频解析 Web API 服务
 """
+import asyncio
 import os
 import sys
 
@@ -21,7 +22,7 @@ logger.add(sys.stderr, level=LOG_LEVEL)
 
 from api.config import (
     API_VERSION, CORS_ORIGINS, CORS_ALLOW_CREDENTIALS,
-    CORS_ALLOW_METHODS, CORS_ALLOW_HEADERS, HOST, PORT
+    CORS_ALLOW_METHODS, CORS_ALLOW_HEADERS, HOST, PORT, SIGN_WARM_UP
 )
 from api.routers.video import router as video_router
 from api.routers.auth import router as auth_router
@@ -31,6 +32,8 @@ from api.routers.comment import router as comment_router
 from api.routers.live import router as live_router
 from api.routers.collection import router as collection_router
 from api.routers.relation import router as relation_router
+from api.routers.metrics import router as metrics_router
+from utils.dy_util import warm_up
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -59,6 +62,7 @@ app.include_router(comment_router)
 app.include_router(live_router)
 app.include_router(collection_router)
 app.include_router(relation_router)
+app.include_router(metrics_router)
 
 # 静态文件服务 (前端构建产物)
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "web", "dist")
@@ -76,6 +80,13 @@ async def startup_event():
     """应用启动事件"""
     logger.info(f"抖音视频解析 API 服务启动 - 版本 {API_VERSION}")
     logger.info(f"API 文档: http://{HOST}:{PORT}/docs")
+    if SIGN_WARM_UP:
+        # 提前加载签名脚本, 避免首个请求承担冷启动开销
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, warm_up)
+            logger.info("签名环境预热完成")
+        except Exception as e:
+            logger.warning(f"签名环境预热失败: {e}")
 
 
 @app.on_event("shutdown")
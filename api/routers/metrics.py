@@ -0,0 +1,91 @@
+"""
+运行指标路由
+"""
+from fastapi import APIRouter
+
+from api.schemas.metrics import (
+    CacheResponse, CacheStats, CoalescingResponse, CoalescingStats, ConcurrencyResponse, ConcurrencyWindow,
+    ProxyResponse, ProxyStats
+)
+from utils.concurrency import get_concurrency_controller
+from utils.response_cache import get_response_cache
+from utils.single_flight import get_async_single_flight, get_single_flight
+from utils.transport import get_transport
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/concurrency",
+    response_model=ConcurrencyResponse,
+    summary="获取自适应并发窗口",
+    responses={
+        200: {"description": "获取成功", "model": ConcurrencyResponse}
+    }
+)
+async def api_get_concurrency():
+    """
+    获取各接口/账号当前的 AIMD 并发窗口
+
+    返回允许的在途请求数、当前在途数以及成功、限流、错误次数
+    """
+    windows = [ConcurrencyWindow(**item) for item in get_concurrency_controller().snapshot()]
+    return ConcurrencyResponse(success=True, message="获取成功", data=windows)
+
+
+@router.get(
+    "/proxies",
+    response_model=ProxyResponse,
+    summary="获取代理池状态",
+    responses={
+        200: {"description": "获取成功", "model": ProxyResponse}
+    }
+)
+async def api_get_proxies():
+    """
+    获取共享传输层代理池中各代理的延迟、在途数和成功失败次数
+
+    未配置代理时返回空列表, 连续失败被移除的代理不再返回
+    """
+    proxy_pool = get_transport().proxy_pool
+    proxies = [ProxyStats(**item) for item in proxy_pool.snapshot()] if proxy_pool else []
+    return ProxyResponse(success=True, message="获取成功", data=proxies)
+
+
+@router.get(
+    "/cache",
+    response_model=CacheResponse,
+    summary="获取响应缓存命中统计",
+    responses={
+        200: {"description": "获取成功", "model": CacheResponse}
+    }
+)
+async def api_get_cache():
+    """
+    获取只读接口响应缓存的命中统计
+
+    按接口返回过期时间、内存/磁盘命中次数、未命中次数和命中率
+    """
+    stats = [CacheStats(**item) for item in get_response_cache().snapshot()]
+    return CacheResponse(success=True, message="获取成功", data=stats)
+
+
+@router.get(
+    "/coalescing",
+    response_model=CoalescingResponse,
+    summary="获取请求合并统计",
+    responses={
+        200: {"description": "获取成功", "model": CoalescingResponse}
+    }
+)
+async def api_get_coalescing():
+    """
+    获取相同请求合并 (single-flight) 的统计
+
+    calls 为实际发往上游的请求数, shared 为直接复用在途请求结果的调用次数
+    """
+    stats = [
+        CoalescingStats(mode="sync", **get_single_flight().stats()),
+        CoalescingStats(mode="async", **get_async_single_flight().stats()),
+    ]
+    return CoalescingResponse(success=True, message="获取成功", data=stats)
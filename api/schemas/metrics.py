@@ -0,0 +1,71 @@
+"""
+运行指标相关的 Pydantic 数据模型
+"""
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ConcurrencyWindow(BaseModel):
+    """单个接口/账号的并发窗口"""
+    endpoint: str = Field(default="", description="接口路径")
+    account: str = Field(default="", description="账号标识, sessionid 的 sha1 摘要前 8 位")
+    limit: float = Field(default=0, description="当前允许的在途请求数")
+    inflight: int = Field(default=0, description="当前在途请求数")
+    successes: int = Field(default=0, description="正常响应次数")
+    throttles: int = Field(default=0, description="限流次数")
+    errors: int = Field(default=0, description="其他错误次数")
+
+
+class ConcurrencyResponse(BaseModel):
+    """并发窗口响应"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(default="", description="消息")
+    data: List[ConcurrencyWindow] = Field(default_factory=list, description="各接口/账号的并发窗口")
+
+
+class ProxyStats(BaseModel):
+    """单个代理的状态"""
+    url: str = Field(default="", description="代理地址(隐藏密码)")
+    latency: float = Field(default=0, description="平均延迟(秒)")
+    inflight: int = Field(default=0, description="当前在途请求数")
+    successes: int = Field(default=0, description="成功次数")
+    failures: int = Field(default=0, description="失败次数")
+
+
+class ProxyResponse(BaseModel):
+    """代理池响应"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(default="", description="消息")
+    data: List[ProxyStats] = Field(default_factory=list, description="代理池中的代理")
+
+
+class CacheStats(BaseModel):
+    """单个接口的响应缓存统计"""
+    endpoint: str = Field(default="", description="接口名")
+    ttl: float = Field(default=0, description="过期时间(秒), 0 表示不缓存")
+    memory_hits: int = Field(default=0, description="内存缓存命中次数")
+    disk_hits: int = Field(default=0, description="磁盘缓存命中次数")
+    misses: int = Field(default=0, description="未命中次数")
+    hit_rate: float = Field(default=0, description="命中率")
+
+
+class CacheResponse(BaseModel):
+    """响应缓存统计响应"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(default="", description="消息")
+    data: List[CacheStats] = Field(default_factory=list, description="各接口的缓存统计")
+
+
+class CoalescingStats(BaseModel):
+    """请求合并统计"""
+    mode: str = Field(default="", description="sync 或 async")
+    inflight: int = Field(default=0, description="当前在途的合并请求数")
+    calls: int = Field(default=0, description="实际发出的请求数")
+    shared: int = Field(default=0, description="共享在途请求结果的调用次数")
+
+
+class CoalescingResponse(BaseModel):
+    """请求合并统计响应"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(default="", description="消息")
+    data: List[CoalescingStats] = Field(default_factory=list, description="同步和异步的合并统计")
@@ -21,6 +21,7 @@ from utils.qrcode_login import (
     QRCodeStatus,
 )
 from builder.auth import DouyinAuth
+from builder.auth_pool import get_auth_pool
 from dy_apis.douyin_api import DouyinAPI
 
 
@@ -130,6 +131,8 @@ async def check_qrcode_status(token: str) -> StatusResult:
             save_success, save_error = save_cookie_to_env(cookie_str)
 
             if save_success:
+                # 新登录的账号直接加入账号池, 无需重启服务
+                get_auth_pool().add_cookie(cookie_str)
                 result.cookie = cookie_str
                 result.message = "登录成功，Cookie 已保存"
             else:
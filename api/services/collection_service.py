@@ -10,23 +10,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from dy_apis.douyin_api import DouyinAPI
 from builder.auth import DouyinAuth
+from builder.auth_pool import get_auth_pool
 from api.schemas.collection import (
     CollectionFolder, CollectionListResponse, CollectResponse
 )
 
 
 def _get_auth() -> DouyinAuth:
-    """获取认证对象"""
-    from dotenv import load_dotenv
-    load_dotenv()
-
-    cookie_str = os.getenv("COOKIE", "")
-    if not cookie_str:
-        raise ValueError("未配置 Cookie，请在 .env 文件中设置 COOKIE 环境变量")
-
-    auth = DouyinAuth()
-    auth.perepare_auth(cookie_str)
-    return auth
+    """获取认证对象, 从账号池中按负载和健康状况选取"""
+    return get_auth_pool().get()
 
 
 def _extract_collection_folder(item: dict) -> CollectionFolder:
@@ -53,8 +53,9 @@ async def resolve_short_url(short_url: str) -> str:
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from dy_apis.douyin_api import DouyinAPI
+from dy_apis.async_douyin_api import AsyncDouyinAPI
 from builder.auth import DouyinAuth
+from builder.auth_pool import get_auth_pool
 from api.schemas.video import (
     VideoInfo, VideoQuality, AuthorInfo, Statistics, VideoParseResponse
 )
@@ -64,18 +65,9 @@ from api.config import REQUEST_TIMEOUT
 def _get_auth() -> DouyinAuth:
     """
     获取认证对象
-    从环境变量或 .env 文件读取 Cookie
+    从账号池中按负载和健康状况选取 (COOKIE / DY_COOKIES_FILE)
     """
-    from dotenv import load_dotenv
-    load_dotenv()
-
-    cookie_str = os.getenv("COOKIE", "")
-    if not cookie_str:
-        raise ValueError("未配置 Cookie，请在 .env 文件中设置 COOKIE 环境变量")
-
-    auth = DouyinAuth()
-    auth.perepare_auth(cookie_str)
-    return auth
+    return get_auth_pool().get()
 
 
 def _format_bitrate(bitrate: int) -> str:
@@ -186,7 +178,7 @@ async def parse_video(input_text: str) -> VideoParseResponse:
         auth = _get_auth()
 
         # 调用现有 API 获取视频信息
-        result = DouyinAPI.get_work_info(auth, url)
+        result = await AsyncDouyinAPI.get_work_info(auth, url)
 
         if not result or "aweme_detail" not in result:
             return VideoParseResponse(
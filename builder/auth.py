@@ -1,8 +1,17 @@
 import base64
 import json
+import os
 
 from dy_apis.douyin_api import DouyinAPI
-from utils.dy_util import trans_cookies, generate_msToken
+from utils.cache_util import LRUCache, RefreshingValue
+from utils.dy_util import trans_cookies, generate_msToken, generate_ree_key, generate_signature, generate_webid, \
+    generate_fake_webid
+
+# 直播间签名的缓存时间(秒)
+LIVE_SIGNATURE_TTL = int(os.getenv('DY_LIVE_SIGNATURE_TTL', '600'))
+# webid 的缓存时间(秒), 获取失败时临时使用伪造 webid, 到期后重试
+WEBID_TTL = int(os.getenv('DY_WEBID_TTL', '3600'))
+WEBID_RETRY_TTL = int(os.getenv('DY_WEBID_RETRY_TTL', '60'))
 
 
 class DouyinAuth:
@@ -16,6 +25,9 @@ class DouyinAuth:
         self.ree_public_key = None
         self.uid = None
         self.msToken = None
+        # 确定性签名的结果缓存, 避免重复调用 JS 引擎
+        self.sign_cache = LRUCache(maxsize=256)
+        self.webid_cache = RefreshingValue(self._load_webid, ttl=WEBID_TTL)
 
     def perepare_auth(self, cookieStr: str, web_protect_: str = "", keys_: str = ""):
         self.cookie = trans_cookies(cookieStr)
@@ -23,6 +35,7 @@ class DouyinAuth:
         self.msToken = self.cookie["msToken"] if "msToken" in self.cookie else generate_msToken()
         self.cookie["msToken"] = self.msToken
         self.cookie_str = "; ".join([f"{k}={v}" for k, v in self.cookie.items()])
+        self.webid_cache.invalidate()
         if web_protect_ != "":
             web_protect_ = json.loads(json.loads(web_protect_)['data'])
             self.ticket = web_protect_['ticket']
@@ -34,6 +47,32 @@ class DouyinAuth:
             self.ree_public_key = base64.b64encode(self.private_key.encode()).decode()
 
 
+    def _load_webid(self):
+        webid = generate_webid(self, fallback=False)
+        if webid is None:
+            raise ValueError('webid not found')
+        return webid, None
+
+    def get_webid(self):
+        """webid 按账号缓存, 不再每次请求都下载一遍页面"""
+        try:
+            return self.webid_cache.get()
+        except Exception:
+            webid = generate_fake_webid()
+            self.webid_cache.set(webid, WEBID_RETRY_TTL)
+            return webid
+
+    def get_ree_key(self):
+        """bd-ticket-guard-ree-public-key 只取决于私钥"""
+        return self.sign_cache.get_or_set(('ree_key', self.private_key),
+                                          lambda: generate_ree_key(self.private_key))
+
+    def get_live_signature(self, room_id, user_unique_id):
+        """直播间 WebSocket 签名, 断线重连时复用"""
+        key = ('live_signature', str(room_id), str(user_unique_id))
+        return self.sign_cache.get_or_set(key, lambda: generate_signature(room_id, user_unique_id),
+                                          ttl=LIVE_SIGNATURE_TTL)
+
     def get_uid(self):
         if self.uid is None:
             self.uid = DouyinAPI.get_my_uid(self)
@@ -0,0 +1,212 @@
+"""
+多账号池
+从环境变量加载多个 cookie, 每个账号一个 DouyinAuth (各自的 msToken, webid 和 bd 密钥),
+按轮询或最少在途请求分配账号, 根据请求结果给账号打健康分, 频繁出错或被限流的账号暂停使用一段时间.
+
+账号来源:
+    COOKIE            单个账号
+    DY_COOKIES_FILE   多账号文件, 每行一个 cookie 字符串,
+                      或 JSON: {"cookie": "...", "web_protect": "...", "keys": "..."}
+    DY_AUTH_POOL_STRATEGY   round_robin 或 least_loaded (默认)
+    DY_AUTH_COOLDOWN        不健康账号的暂停时间(秒), 默认 300
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from builder.auth import DouyinAuth
+from utils.concurrency import OK, THROTTLED, get_concurrency_controller
+from utils.rate_limiter import account_key
+
+AUTH_POOL_STRATEGY = os.getenv('DY_AUTH_POOL_STRATEGY', 'least_loaded')
+AUTH_COOLDOWN = int(os.getenv('DY_AUTH_COOLDOWN', '300'))
+# 错误率按指数加权平均计算, 超过阈值且样本足够时暂停账号
+AUTH_ERROR_DECAY = 0.2
+AUTH_ERROR_THRESHOLD = float(os.getenv('DY_AUTH_ERROR_THRESHOLD', '0.5'))
+AUTH_MIN_SAMPLES = 5
+
+
+class PooledAuth:
+    def __init__(self, auth: DouyinAuth):
+        self.auth = auth
+        self.key = account_key(auth.cookie)
+        self.error_rate = 0.0
+        self.samples = 0
+        self.leased = 0
+        self.cooldown_until = 0.0
+
+    def available(self, now):
+        return now >= self.cooldown_until
+
+    def record(self, outcome):
+        failed = 0.0 if outcome == OK else 1.0
+        # 被限流比普通错误更说明账号有问题
+        if outcome == THROTTLED:
+            failed = 1.5
+        self.error_rate = (1 - AUTH_ERROR_DECAY) * self.error_rate + AUTH_ERROR_DECAY * failed
+        self.samples += 1
+
+    def unhealthy(self):
+        return self.samples >= AUTH_MIN_SAMPLES and self.error_rate > AUTH_ERROR_THRESHOLD
+
+    def snapshot(self):
+        return {
+            'account': self.key,
+            'error_rate': round(self.error_rate, 3),
+            'samples': self.samples,
+            'cooling_down': not self.available(time.monotonic()),
+        }
+
+
+class AuthPool:
+    def __init__(self, auths=None, strategy=None, cooldown=None):
+        self.accounts = [PooledAuth(auth) for auth in auths or []]
+        self.by_key = {account.key: account for account in self.accounts}
+        self.strategy = strategy or AUTH_POOL_STRATEGY
+        self.cooldown = AUTH_COOLDOWN if cooldown is None else cooldown
+        self.next_index = 0
+        self._lock = threading.Lock()
+        # 注册到创建时的控制器, close 时从同一个控制器注销
+        self.controller = get_concurrency_controller()
+        self.controller.add_listener(self.report)
+
+    @staticmethod
+    def from_env():
+        """从 COOKIE 和 DY_COOKIES_FILE 加载账号"""
+        pool = AuthPool()
+        pool.reload()
+        return pool
+
+    def reload(self):
+        """重新读取账号配置, 只添加池中还没有的账号"""
+        from dotenv import load_dotenv
+        load_dotenv()
+        for cookie_str, web_protect, keys in AuthPool.read_accounts():
+            self.add_cookie(cookie_str, web_protect, keys)
+
+    def add_cookie(self, cookie_str, web_protect='', keys=''):
+        """
+        按 cookie 添加账号, 已在池中的账号跳过.
+        :return: 新添加或已存在的 DouyinAuth object.
+        """
+        auth = DouyinAuth()
+        auth.perepare_auth(cookie_str, web_protect, keys)
+        account = self.by_key.get(account_key(auth.cookie))
+        if account is not None:
+            return account.auth
+        self.add(auth)
+        return auth
+
+    @staticmethod
+    def read_accounts():
+        accounts = []
+        cookie_str = os.getenv('COOKIE', '')
+        if cookie_str:
+            accounts.append((cookie_str, '', ''))
+        cookies_file = os.getenv('DY_COOKIES_FILE', '')
+        if cookies_file and os.path.exists(cookies_file):
+            with open(cookies_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    if line.startswith('{'):
+                        item = json.loads(line)
+                        accounts.append((item['cookie'], item.get('web_protect', ''), item.get('keys', '')))
+                    else:
+                        accounts.append((line, '', ''))
+        return accounts
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def add(self, auth: DouyinAuth):
+        with self._lock:
+            account = PooledAuth(auth)
+            self.accounts.append(account)
+            self.by_key[account.key] = account
+
+    def _load(self, account):
+        # 在途请求数来自并发控制器, 加上已借出但还没发请求的次数
+        return self.controller.inflight(account.key) + account.leased
+
+    def _choose(self):
+        now = time.monotonic()
+        candidates = [account for account in self.accounts if account.available(now)]
+        if not candidates:
+            # 全部在冷却时使用最早恢复的账号, 不阻塞调用方
+            return min(self.accounts, key=lambda account: account.cooldown_until)
+        if self.strategy == 'round_robin':
+            account = candidates[self.next_index % len(candidates)]
+            self.next_index += 1
+            return account
+        return min(candidates, key=lambda account: (self._load(account), account.error_rate))
+
+    def get(self) -> DouyinAuth:
+        """
+        取一个账号.
+        :return: DouyinAuth object.
+        """
+        if not self.accounts:
+            raise ValueError("未配置 Cookie，请在 .env 文件中设置 COOKIE 环境变量")
+        with self._lock:
+            return self._choose().auth
+
+    @contextmanager
+    def lease(self):
+        """借出一个账号, 借出期间计入该账号的负载"""
+        if not self.accounts:
+            raise ValueError("未配置 Cookie，请在 .env 文件中设置 COOKIE 环境变量")
+        with self._lock:
+            account = self._choose()
+            account.leased += 1
+        try:
+            yield account.auth
+        finally:
+            with self._lock:
+                account.leased -= 1
+
+    def report(self, url, cookies, outcome):
+        """并发控制器的回调, 记录请求结果并在账号不健康时暂停"""
+        account = self.by_key.get(account_key(cookies))
+        if account is None:
+            return
+        with self._lock:
+            account.record(outcome)
+            if account.unhealthy() and account.available(time.monotonic()):
+                account.cooldown_until = time.monotonic() + self.cooldown
+                # 冷却结束后从一半的错误率重新开始观察
+                account.error_rate = AUTH_ERROR_THRESHOLD / 2
+                account.samples = 0
+
+    def snapshot(self):
+        return [account.snapshot() for account in self.accounts]
+
+    def close(self):
+        """不再接收并发控制器的请求结果, 丢弃账号池前调用"""
+        self.controller.remove_listener(self.report)
+
+
+default_auth_pool = None
+default_auth_pool_lock = threading.Lock()
+
+
+def get_auth_pool() -> AuthPool:
+    global default_auth_pool
+    if default_auth_pool is None:
+        with default_auth_pool_lock:
+            if default_auth_pool is None:
+                default_auth_pool = AuthPool.from_env()
+    if not default_auth_pool:
+        # 还没有账号时每次都重新读取, 扫码登录写入 .env 后无需重启
+        default_auth_pool.reload()
+    return default_auth_pool
+
+
+def set_auth_pool(auth_pool: AuthPool):
+    global default_auth_pool
+    if default_auth_pool is not None and default_auth_pool is not auth_pool:
+        default_auth_pool.close()
+    default_auth_pool = auth_pool
@@ -1,6 +1,7 @@
 from enum import Enum
+from types import MappingProxyType
 
-from utils.dy_util import generate_ree_key, generate_bd_ticket_client_data, generate_csrf_token
+from utils.dy_util import generate_bd_ticket_client_data, get_csrf_token
 
 
 class HeaderType(Enum):
@@ -12,13 +13,13 @@ class HeaderType(Enum):
 
 
 class Header:
-    def __init__(self):
-        self.headers = {}
+    def __init__(self, headers=None):
+        self.headers = dict(headers) if headers else {}
 
     def with_bd(self, api, auth):
         self.set_header('bd-ticket-guard-client-data', generate_bd_ticket_client_data(api, auth.ticket, auth.ts_sign, auth.private_key))
         self.set_header('bd-ticket-guard-iteration-version', '1')
-        self.set_header('bd-ticket-guard-ree-public-key', generate_ree_key(auth.private_key))
+        self.set_header('bd-ticket-guard-ree-public-key', auth.get_ree_key())
         self.set_header('bd-ticket-guard-version', '2')
         self.set_header('bd-ticket-guard-web-version', '1')
 
@@ -27,7 +28,7 @@ class Header:
         return self
 
     def with_csrf(self, cookie_str):
-        self.set_header('x-secsdk-csrf-token', generate_csrf_token(cookie_str)[0])
+        self.set_header('x-secsdk-csrf-token', get_csrf_token(cookie_str)[0])
 
     def set_referer(self, url):
         self.set_header('referer', url)
@@ -49,9 +50,28 @@ class HeaderBuilder:
     # ua = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 '
     #       'Safari/537.36 Edg/125.0.0.0')
     ua = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0"
+    # 每种类型的基础请求头只构造一次, build 时复制
+    templates = {}
+
+    @staticmethod
+    def template(header_type) -> MappingProxyType:
+        """
+        获取某类请求的基础请求头.
+        :param header_type: HeaderType.
+        :return: 只读的请求头字典.
+        """
+        template = HeaderBuilder.templates.get(header_type)
+        if template is None:
+            template = MappingProxyType(HeaderBuilder._build(header_type).headers)
+            HeaderBuilder.templates[header_type] = template
+        return template
 
     @staticmethod
     def build(header_type):
+        return Header(HeaderBuilder.template(header_type))
+
+    @staticmethod
+    def _build(header_type):
         header = Header()
         header.set_header('user-agent', HeaderBuilder.ua)
         header.set_header('cache-control', 'no-cache')
@@ -1,40 +1,56 @@
+from types import MappingProxyType
+
 from builder.header import HeaderBuilder
-from utils.dy_util import generate_webid, generate_msToken, splice_url, generate_a_bogus, generate_fake_webid
+from utils.dy_util import generate_webid, generate_msToken, splice_url, generate_a_bogus, generate_fake_webid, \
+    generate_a_bogus_batch
+
+
+# 网页端的设备和浏览器参数, 只读, 各接口在此基础上覆盖个别值
+PC_WEB = MappingProxyType({
+    'device_platform': 'webapp',
+    'aid': '6383',
+    'channel': 'channel_pc_web',
+    'pc_client_type': '1',
+    'update_version_code': '170400',
+    'version_code': '170400',
+    'version_name': '17.4.0',
+    'cookie_enabled': 'true',
+    'screen_width': '1707',
+    'screen_height': '960',
+    'browser_language': 'zh-CN',
+    'browser_platform': 'Win32',
+    'browser_name': 'Edge',
+    'browser_version': '125.0.0.0',
+    'browser_online': 'true',
+    'engine_name': 'Blink',
+    'engine_version': '125.0.0.0',
+    'os_name': 'Windows',
+    'os_version': '10',
+    'cpu_core_num': '32',
+    'device_memory': '8',
+    'platform': 'PC',
+    'downlink': '10',
+    'effective_type': '4g',
+    'round_trip_time': '100',
+})
+
+# 直播间页面抓到的参数来自另一台设备
+PC_WEB_LIVE = MappingProxyType({
+    **PC_WEB,
+    'screen_width': '2560',
+    'screen_height': '1440',
+    'browser_version': '121.0.0.0',
+    'engine_version': '121.0.0.0',
+    'cpu_core_num': '20',
+})
 
 
 class Params:
-    def __init__(self):
-        self.params = {}
+    def __init__(self, params=None):
+        self.params = dict(params) if params else {}
 
     def with_platform(self):
-        params = {
-            'device_platform': 'webapp',
-            'aid': '6383',
-            'channel': 'channel_pc_web',
-            'pc_client_type': '1',
-            'update_version_code': '170400',
-            'version_code': '170400',
-            'version_name': '17.4.0',
-            'cookie_enabled': 'true',
-            'screen_width': '1707',
-            'screen_height': '960',
-            'browser_language': 'zh-CN',
-            'browser_platform': 'Win32',
-            'browser_name': 'Edge',
-            'browser_version': '125.0.0.0',
-            'browser_online': 'true',
-            'engine_name': 'Blink',
-            'engine_version': '125.0.0.0',
-            'os_name': 'Windows',
-            'os_version': '10',
-            'cpu_core_num': '32',
-            'device_memory': '8',
-            'platform': 'PC',
-            'downlink': '10',
-            'effective_type': '4g',
-            'round_trip_time': '100',
-        }
-        self.params.update(params)
+        self.params.update(PC_WEB)
         return self
 
     def update_params(self, params):
@@ -42,7 +58,12 @@ class Params:
         return self
 
     def with_web_id(self, auth=None, url="", fake=False):
-        webid = generate_fake_webid() if fake else generate_webid(auth, url)
+        if fake:
+            webid = generate_fake_webid()
+        elif auth is not None:
+            webid = auth.get_webid()
+        else:
+            webid = generate_webid(auth, url)
         self.params['webid'] = webid
         return self
 
@@ -56,6 +77,23 @@ class Params:
         self.add_param('a_bogus', abogus)
         return self
 
+    @staticmethod
+    def with_a_bogus_batch(prepared):
+        """
+        一次性给多组参数签名 a_bogus.
+        :param prepared: Params 或 (Params, data) 组成的列表, data 同 with_a_bogus.
+        :return: 签名后的 Params 列表.
+        """
+        params_list = []
+        queries = []
+        for item in prepared:
+            params, data = item if isinstance(item, tuple) else (item, None)
+            params_list.append(params)
+            queries.append((splice_url(params.get()), splice_url(data) if data is not None else ''))
+        for params, abogus in zip(params_list, generate_a_bogus_batch(queries)):
+            params.add_param('a_bogus', abogus)
+        return params_list
+
     def with_ms_token(self):
         msToken = generate_msToken()
         self.params['msToken'] = msToken
@@ -11,7 +11,7 @@ import uuid
 
 import static.Request_pb2 as RequestProto
 from builder.header import HeaderBuilder
-from utils.dy_util import generate_webid, generate_req_sign, generate_millisecond
+from utils.dy_util import generate_req_sign, generate_millisecond
 
 
 class ProtoBuilder:
@@ -43,7 +43,7 @@ class ProtoBuilder:
         request.headers['referer'] = ''
         request.headers['timezone_name'] = 'Etc/GMT-8'
         request.headers['deviceId'] = '0'
-        request.headers['webid'] = generate_webid()
+        request.headers['webid'] = auth.get_webid()
         request.headers['fp'] = auth.cookie['s_v_web_id']
         request.headers['is-retry'] = '0'
         request.auth_type = 4
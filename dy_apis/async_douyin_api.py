@@ -0,0 +1,527 @@
+import asyncio
+import collections
+import functools
+
+from dy_apis.douyin_api import DouyinAPI, REPLY_CONCURRENCY, aweme_key, cacheable_result, flight_key, parse_aweme_id, \
+    parse_user_id, response_key, user_key
+from dy_apis.pagination import Page, atake
+from utils.checkpoint import IncompletePage, acrawl
+from utils.concurrency import OK, get_concurrency_controller
+from utils.rate_limiter import get_rate_limiter
+from utils.response_cache import get_response_cache
+from utils.single_flight import get_async_single_flight
+from utils.transport import ApiRequest, AsyncTransport, get_async_transport
+
+
+def async_endpoint(sync_endpoint):
+    """
+    由 DouyinAPI 的接口生成对应的异步接口.
+    参数构造包含 a_bogus 签名和 webid 获取, 都是阻塞调用, 放到线程池里执行, 请求本身走 httpx.
+    """
+    build = sync_endpoint.build
+    cache_key = sync_endpoint.cache_key
+    cacheable = sync_endpoint.cacheable
+
+    @functools.wraps(build)
+    async def call(*args, proxies=None, **kwargs):
+        cache = response_key(build, cache_key, sync_endpoint.per_account, args, kwargs) if cache_key else None
+        if cache:
+            result = get_response_cache().get(*cache)
+            if result is not None:
+                return result
+
+        async def load():
+            request = await asyncio.to_thread(build, *args, **kwargs)
+            request.proxies = proxies
+            return await AsyncDouyinAPI.send(request, cache, cacheable)
+        if not sync_endpoint.coalesce:
+            return await load()
+        return await get_async_single_flight().do(flight_key(build, cache_key, args, kwargs), load)
+    return staticmethod(call)
+
+
+class AsyncDouyinAPI:
+    """
+    DouyinAPI 的异步版本, 接口名称和参数与 DouyinAPI 一致.
+    用法:
+        res = await AsyncDouyinAPI.get_work_info(auth, url)
+    """
+    # 异步传输层, 为 None 时使用全局默认实例, 可通过 set_transport 注入
+    transport = None
+
+    @staticmethod
+    def get_transport() -> AsyncTransport:
+        return AsyncDouyinAPI.transport or get_async_transport()
+
+    @staticmethod
+    def set_transport(transport: AsyncTransport):
+        AsyncDouyinAPI.transport = transport
+
+    @staticmethod
+    async def send(request: ApiRequest, cache=None, cacheable=None):
+        await get_rate_limiter().acquire_async(request.url, request.cookies)
+        async with get_concurrency_controller().slot_async(request.url, request.cookies) as slot:
+            res = await AsyncDouyinAPI.get_transport().send(request)
+            try:
+                result = request.parse(res)
+            except Exception:
+                slot.observe(res)
+                raise
+            if slot.observe(res, result, request.expect) == OK and cache and (cacheable or cacheable_result)(result):
+                get_response_cache().set(*cache, result)
+            return result
+
+    get_user_work_info = async_endpoint(DouyinAPI.get_user_work_info)
+    get_work_info = async_endpoint(DouyinAPI.get_work_info)
+    get_work_out_comment = async_endpoint(DouyinAPI.get_work_out_comment)
+    get_work_inner_comment = async_endpoint(DouyinAPI.get_work_inner_comment)
+    get_user_info = async_endpoint(DouyinAPI.get_user_info)
+    search_general_work = async_endpoint(DouyinAPI.search_general_work)
+    search_user = async_endpoint(DouyinAPI.search_user)
+    search_live = async_endpoint(DouyinAPI.search_live)
+    get_user_favorite = async_endpoint(DouyinAPI.get_user_favorite)
+    get_my_uid = async_endpoint(DouyinAPI.get_my_uid)
+    get_my_sec_uid = async_endpoint(DouyinAPI.get_my_sec_uid)
+    get_live_info = async_endpoint(DouyinAPI.get_live_info)
+    get_live_production = async_endpoint(DouyinAPI.get_live_production)
+    get_live_production_detail = async_endpoint(DouyinAPI.get_live_production_detail)
+    collect_aweme = async_endpoint(DouyinAPI.collect_aweme)
+    move_collect_aweme = async_endpoint(DouyinAPI.move_collect_aweme)
+    remove_collect_aweme = async_endpoint(DouyinAPI.remove_collect_aweme)
+    get_collect_list = async_endpoint(DouyinAPI.get_collect_list)
+    get_user_follower_list = async_endpoint(DouyinAPI.get_user_follower_list)
+    get_user_following_list = async_endpoint(DouyinAPI.get_user_following_list)
+    get_notice_list = async_endpoint(DouyinAPI.get_notice_list)
+    get_feed = async_endpoint(DouyinAPI.get_feed)
+
+    @staticmethod
+    async def iter_user_work_pages(auth, user_url: str, max_cursor: str = "0", **kwargs):
+        """
+        逐页获取用户作品.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param max_cursor: 起始游标, 从第一页开始为 "0".
+        :param strict: 关键字参数, 为 True 时被限流或页不完整抛出 IncompletePage, 而不是当作翻页结束.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.get_user_work_info(auth, user_url, max_cursor, proxies=kwargs.get('proxies'))
+            if "aweme_list" not in res_json.keys():
+                if kwargs.get('strict'):
+                    raise IncompletePage(f'用户作品列表 {max_cursor} 页没有 aweme_list: {res_json}')
+                break
+            next_cursor = str(res_json["max_cursor"])
+            has_more = res_json.get("has_more", 0) == 1
+            yield Page(res_json["aweme_list"], max_cursor, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            max_cursor = next_cursor
+
+    @staticmethod
+    async def get_user_all_work_info(auth, user_url: str, checkpoint: bool = False, **kwargs) -> list:
+        """
+        获取用户全部作品信息.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
+        :return: 全部作品信息.
+        """
+        if checkpoint:
+            return await acrawl('get_user_all_work_info', parse_user_id(user_url),
+                                lambda cursor: AsyncDouyinAPI.iter_user_work_pages(auth, user_url, cursor or "0",
+                                                                                   strict=True, **kwargs))
+        return await atake(AsyncDouyinAPI.iter_user_work_pages(auth, user_url, **kwargs))
+
+    @staticmethod
+    async def get_user_new_work_info(auth, user_url: str, known: set, **kwargs) -> list:
+        """
+        增量获取用户作品, 只返回 known 中没有的作品, 遇到除置顶作品外都已抓取过的一页时停止翻页.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param known: 已抓取过的 aweme_id 集合.
+        :return: 新作品信息列表.
+        """
+        new_works = []
+        pages = AsyncDouyinAPI.iter_user_work_pages(auth, user_url, **kwargs)
+        async for page in pages:
+            new_works.extend(work for work in page.items if str(work['aweme_id']) not in known)
+            works = [work for work in page.items if not work.get('is_top')]
+            if works and all(str(work['aweme_id']) in known for work in works):
+                await pages.aclose()
+                break
+        return new_works
+
+    @staticmethod
+    async def iter_work_out_comment_pages(auth, url: str, cursor: str = "0", **kwargs):
+        """
+        逐页获取作品一级评论.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param cursor: 起始游标.
+        :param strict: 关键字参数, 为 True 时被限流或页不完整抛出 IncompletePage, 而不是当作翻页结束.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.get_work_out_comment(auth, url, cursor, proxies=kwargs.get('proxies'))
+            comments = res_json.get("comments")
+            if not comments:
+                if res_json.get("has_more") == 0:
+                    # 已经取完, 返回一页空结果让断点知道翻页正常结束
+                    yield Page([], cursor, cursor, False, res_json)
+                elif kwargs.get('strict'):
+                    raise IncompletePage(f'作品评论 {cursor} 页没有 comments: {res_json}')
+                break
+            next_cursor = str(res_json["cursor"])
+            has_more = res_json["has_more"] == 1
+            yield Page(comments, cursor, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            cursor = next_cursor
+
+    @staticmethod
+    async def get_work_all_out_comment(auth, url: str, checkpoint: bool = False, **kwargs) -> list:
+        """
+        获取作品全部一级评论.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
+        :return:
+        """
+        if checkpoint:
+            return await acrawl('get_work_all_out_comment', parse_aweme_id(url),
+                                lambda cursor: AsyncDouyinAPI.iter_work_out_comment_pages(auth, url, cursor or "0",
+                                                                                          strict=True, **kwargs))
+        return await atake(AsyncDouyinAPI.iter_work_out_comment_pages(auth, url, **kwargs))
+
+    @staticmethod
+    async def iter_work_inner_comment_pages(auth, comment: dict, cursor: str = "0", count: str = '5', request=None,
+                                            **kwargs):
+        """
+        逐页获取作品评论的二级评论.
+        :param auth: DouyinAuth object.
+        :param comment: 一级评论信息.
+        :param cursor: 起始游标.
+        :param count: 每页数量.
+        :param request: 已签名的第一页请求 (见 DouyinAPI.build_work_inner_comments), 为 None 时现场构造.
+        :return: Page 异步生成器.
+        """
+        while True:
+            if request is not None:
+                request.proxies = kwargs.get('proxies')
+                res_json = await AsyncDouyinAPI.send(request)
+                request = None
+            else:
+                res_json = await AsyncDouyinAPI.get_work_inner_comment(auth, comment, cursor, count,
+                                                                       proxies=kwargs.get('proxies'))
+            comments = res_json["comments"]
+            next_cursor = str(res_json["cursor"])
+            has_more = res_json["has_more"] == 1
+            yield Page(comments if type(comments) is list else [], cursor, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            cursor = next_cursor
+
+    @staticmethod
+    async def get_work_all_inner_comment(auth, comment: dict, **kwargs) -> list:
+        """
+        获取作品评论的全部二级评论.
+        :param auth: DouyinAuth object.
+        :param comment: 一级评论信息.
+        :return: 二级评论列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_work_inner_comment_pages(auth, comment, **kwargs))
+
+    @staticmethod
+    async def iter_work_comment_pages(auth, url: str, cursor: str = "0", concurrency: int = None, **kwargs):
+        """
+        逐页获取作品评论, 每页的一级评论带上全部二级评论 (reply_comment).
+        不同评论的二级评论并发获取, 获取上一页二级评论的同时请求下一页一级评论, 结果按原顺序组装.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param cursor: 起始游标.
+        :param concurrency: 同时获取二级评论的评论数, 默认 DY_REPLY_CONCURRENCY.
+        :return: Page 异步生成器.
+        """
+        semaphore = asyncio.Semaphore(concurrency or REPLY_CONCURRENCY)
+        pending = collections.deque()
+
+        async def fetch(comment, request):
+            async with semaphore:
+                return await AsyncDouyinAPI.get_work_all_inner_comment(auth, comment, request=request,
+                                                                       proxies=kwargs.get('proxies'))
+
+        async def assemble():
+            # 组装完成后才出队, 中途出错时剩余的任务在 finally 中取消
+            page, tasks = pending[0]
+            for comment, task in tasks:
+                comment['reply_comment'] = await task
+            pending.popleft()
+            return page
+
+        try:
+            async for page in AsyncDouyinAPI.iter_work_out_comment_pages(auth, url, cursor, **kwargs):
+                for comment in page.items:
+                    comment['reply_comment'] = []
+                # 同一页各评论的第一页二级评论请求一起签名
+                replied = [comment for comment in page.items if comment['reply_comment_total'] > 0]
+                requests = await asyncio.to_thread(DouyinAPI.build_work_inner_comments, auth, replied)
+                tasks = [(comment, asyncio.ensure_future(fetch(comment, request)))
+                         for comment, request in zip(replied, requests)]
+                pending.append((page, tasks))
+                while len(pending) > 1 or pending and all(task.done() for _, task in pending[0][1]):
+                    yield await assemble()
+            while pending:
+                yield await assemble()
+        finally:
+            for _, tasks in pending:
+                for _, task in tasks:
+                    task.cancel()
+
+    @staticmethod
+    async def get_work_all_comment(auth, url: str, checkpoint: bool = False, **kwargs):
+        """
+        获取作品全部评论.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
+        :return: 全部评论列表.
+        """
+        if checkpoint:
+            return await acrawl('get_work_all_comment', parse_aweme_id(url),
+                                lambda cursor: AsyncDouyinAPI.iter_work_comment_pages(auth, url, cursor or "0",
+                                                                                      strict=True, **kwargs))
+        return await atake(AsyncDouyinAPI.iter_work_comment_pages(auth, url, **kwargs))
+
+    @staticmethod
+    async def iter_search_general_work_pages(auth, query: str, sort_type: str = '0', publish_time: str = '0',
+                                             filter_duration="", search_range="", content_type="", offset: str = "0",
+                                             **kwargs):
+        """
+        逐页搜索综合频道作品, 参数同 search_general_work.
+        :param offset: 起始偏移量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.search_general_work(auth, query, sort_type, publish_time, offset,
+                                                                filter_duration, search_range, content_type,
+                                                                proxies=kwargs.get('proxies'))
+            works = res_json["data"]
+            next_offset = str(int(offset) + len(works))
+            has_more = res_json["has_more"] == 1
+            yield Page(works, offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
+
+    @staticmethod
+    async def search_some_general_work(auth, query: str, num: int, sort_type: str, publish_time: str,
+                                       filter_duration="", search_range="", content_type="", seen=None,
+                                       **kwargs) -> list:
+        """
+        搜索指定数量综合频道作品.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param num: 搜索结果数量.
+        :param sort_type: 排序方式 0 综合排序, 1 最多点赞, 2 最新发布.
+        :param publish_time: 发布时间 0 不限, 1 一天内, 7 一周内, 180 半年内.
+        :param filter_duration: 视频时长 空字符串 不限, 0-1 一分钟内, 1-5 1-5分钟内, 5-10000 5分钟以上
+        :param search_range: 搜索范围 0 不限, 1 最近看过, 2 还未看过, 3 关注的人
+        :param content_type: 内容形式 0 不限, 1 视频, 2 图文
+        :param seen: SeenFilter, 跳过已记录的作品, 跳过的不计入数量, 处理完后用 seen.mark(works, aweme_key) 记录.
+        :return: 作品列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_search_general_work_pages(auth, query, sort_type, publish_time,
+                                                                         filter_duration, search_range, content_type,
+                                                                         **kwargs), num, seen, aweme_key)
+
+    @staticmethod
+    async def iter_search_user_pages(auth, query: str, offset: str = "0", count: str = "25", **kwargs):
+        """
+        逐页搜索用户.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param offset: 起始偏移量.
+        :param count: 每页数量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.search_user(auth, query, offset, count, proxies=kwargs.get('proxies'))
+            next_offset = str(int(offset) + int(count))
+            has_more = res_json["has_more"] == 1
+            yield Page(res_json["user_list"], offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
+
+    @staticmethod
+    async def search_some_user(auth, query: str, num: int, seen=None, **kwargs) -> list:
+        """
+        搜索指定数量用户.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param num: 搜索结果数量.
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
+        :return: 用户列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_search_user_pages(auth, query, **kwargs), num, seen, user_key)
+
+    @staticmethod
+    async def iter_search_live_pages(auth, query: str, offset: str = "0", count: str = "25", **kwargs):
+        """
+        逐页搜索直播.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param offset: 起始偏移量.
+        :param count: 每页数量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.search_live(auth, query, offset, count, proxies=kwargs.get('proxies'))
+            next_offset = str(int(offset) + int(count))
+            has_more = res_json["has_more"] == 1
+            yield Page(res_json["data"], offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
+
+    @staticmethod
+    async def search_some_live(auth, query: str, num: int, **kwargs) -> list:
+        """
+        搜索指定数量直播.
+        :param auth: DouyinAuth object.
+        :param query:  搜索关键字.
+        :param num:  搜索数量.
+        :return: 直播列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_search_live_pages(auth, query, **kwargs), num)
+
+    @staticmethod
+    async def iter_live_production_pages(auth, url: str, room_id: str, author_id: str, offset: str = "0", **kwargs):
+        """
+        逐页获取直播间商品.
+        :param auth: DouyinAuth object.
+        :param url: 直播间链接.
+        :param room_id: 直播间ID
+        :param author_id: 主播ID
+        :param offset: 起始游标.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.get_live_production(auth, url, room_id, author_id, offset, proxies=kwargs.get('proxies'))
+            next_offset = str(res_json["next_offset"])
+            has_more = next_offset != "-1"
+            yield Page(res_json["promotions"], offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
+
+    @staticmethod
+    async def get_all_live_production(auth, url: str, **kwargs):
+        """
+        获取直播间的所有商品信息.
+        :param auth: DouyinAuth object.
+        :param url: 直播间链接.
+        :return:
+        """
+        room_info = await AsyncDouyinAPI.get_live_info(auth, url.split("/")[-1].split("?")[0], proxies=kwargs.get('proxies'))
+        return await atake(AsyncDouyinAPI.iter_live_production_pages(auth, url, room_info["room_id"],
+                                                                     room_info["author_id"], **kwargs))
+
+    @staticmethod
+    async def iter_user_follower_pages(auth, user_id: str, sec_id: str, max_time: str = "0", count: str = "20", **kwargs):
+        """
+        逐页获取用户的粉丝列表.
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param max_time: 起始游标.
+        :param count: 每页数量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.get_user_follower_list(auth, user_id, sec_id, max_time, count, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = res_json.get("min_time")
+            yield Page(res_json["followers"], max_time, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            max_time = next_cursor
+
+    @staticmethod
+    async def get_some_user_follower_list(auth, user_id: str, sec_id: str, num: int, seen=None, **kwargs) -> list:
+        """
+        获取用户的前num个粉丝列表
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param num: 要获取的数量
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
+        :return: 粉丝列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_user_follower_pages(auth, user_id, sec_id, **kwargs), num, seen,
+                           user_key)
+
+    @staticmethod
+    async def iter_user_following_pages(auth, user_id: str, sec_id: str, max_time: str = "0", count: str = "20", **kwargs):
+        """
+        逐页获取用户的关注列表.
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param max_time: 起始游标.
+        :param count: 每页数量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            res_json = await AsyncDouyinAPI.get_user_following_list(auth, user_id, sec_id, max_time, count, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = res_json.get("min_time")
+            yield Page(res_json["followings"], max_time, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            max_time = next_cursor
+
+    @staticmethod
+    async def get_some_user_following_list(auth, user_id: str, sec_id: str, num: int, seen=None, **kwargs) -> list:
+        """
+        获取用户的前num个关注列表
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param num: 要获取的数量
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
+        :return: 关注列表.
+        """
+        return await atake(AsyncDouyinAPI.iter_user_following_pages(auth, user_id, sec_id, **kwargs), num, seen,
+                           user_key)
+
+    @staticmethod
+    async def iter_notice_pages(auth, notice_group='700', cursor=("0", "0"), count: str = "10", **kwargs):
+        """
+        逐页获取通知.
+        :param auth: DouyinAuth object.
+        :param notice_group: 消息类型 | 700 全部消息 401 粉丝 601 @我的 2 评论 3 点赞 520 弹幕
+        :param cursor: 起始游标 (min_time, max_time).
+        :param count: 每页数量.
+        :return: Page 异步生成器.
+        """
+        while True:
+            min_time, max_time = cursor
+            res_json = await AsyncDouyinAPI.get_notice_list(auth, min_time, max_time, count, notice_group, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = (res_json.get("min_time"), res_json.get("max_time"))
+            yield Page(res_json["notice_list_v2"], cursor, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            cursor = next_cursor
+
+    @staticmethod
+    async def get_some_notice_list(auth, num: int = 20, notice_group='700', **kwargs) -> list:
+        """
+        获得前num条通知
+        :param auth: DouyinAuth object.
+        :param num: 数量.
+        :param notice_group: 消息类型 | 700 全部消息 401 粉丝 601 @我的 2 评论 3 点赞 520 弹幕
+        :return:
+        """
+        return await atake(AsyncDouyinAPI.iter_notice_pages(auth, notice_group, **kwargs), num)
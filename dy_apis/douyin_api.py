@@ -1,9 +1,12 @@
+import collections
+import functools
 import json
-import random
+import os
 import re
 import time
 import urllib
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 requests.packages.urllib3.disable_warnings()
@@ -12,56 +15,266 @@ from protobuf_to_dict import protobuf_to_dict
 
 import static.Response_pb2 as ResponseProto
 from builder.header import HeaderBuilder, HeaderType
-from builder.params import Params
 from builder.proto import ProtoBuilder
-from utils.dy_util import splice_url, generate_a_bogus, generate_msToken, trans_cookies
+from dy_apis import endpoints
+from dy_apis.pagination import Page, take
+from utils.checkpoint import IncompletePage, crawl
+from utils.concurrency import OK, get_concurrency_controller
+from utils.rate_limiter import account_key, default_reply_concurrency, get_rate_limiter
+from utils.response_cache import get_response_cache
+from utils.single_flight import get_single_flight
+from utils.dy_util import splice_url, generate_a_bogus, generate_msToken, trans_cookies, invalidate_csrf_token
+from utils.transport import ApiRequest, Transport, get_transport
 
+# get_work_all_comment 同时获取二级评论的评论数, 请求仍经过限流和并发控制.
+# 同一作品的二级评论都用同一个账号请求, 共用一个账号令牌桶, 并发超过桶容量 (突发) 的部分只是在排队,
+# 默认取账号限流的突发数, 账号不限流时为 8; 提高账号限流 (DY_RATE_LIMIT_ACCOUNT) 后并发才有意义.
+REPLY_CONCURRENCY = int(os.getenv('DY_REPLY_CONCURRENCY', '0')) or default_reply_concurrency()
+
+
+def parse_aweme_id(url):
+    """从作品链接或带 modal_id 的链接中取出作品ID"""
+    if 'video' in url:
+        return url.split("/")[-1].split("?")[0]
+    return re.findall(r'modal_id=(\d+)', url)[0]
+
+
+def parse_user_id(user_url):
+    """从用户主页链接中取出 sec_uid"""
+    return user_url.split("/")[-1].split("?")[0]
+
+
+def aweme_key(item):
+    """搜索结果中的作品ID, 不是作品的结果返回 None"""
+    return (item.get('aweme_info') or {}).get('aweme_id')
+
+
+def user_key(item):
+    """搜索用户结果和粉丝, 关注列表中的用户ID"""
+    return (item.get('user_info') or item).get('uid')
+
+
+def flight_key(build, cache_key, args, kwargs):
+    """
+    请求合并的键: (接口名, 归一化参数, 账号).
+    有 cache_key 时用归一化的 ID, 否则用除账号外的全部参数.
+    """
+    kwargs = dict(kwargs)
+    auth = args[0] if args else kwargs.pop('auth', None) or kwargs.pop('auth_', None)
+    if cache_key:
+        params = cache_key(*args, **kwargs) if args else cache_key(auth, **kwargs)
+    else:
+        params = json.dumps([args[1:], kwargs], sort_keys=True, ensure_ascii=False, default=str)
+    return build.__name__, params, account_key(getattr(auth, 'cookie', None))
+
+
+def response_key(build, cache_key, per_account, args, kwargs):
+    """
+    响应缓存的键: (接口名, 归一化ID), per_account 时归一化ID前加账号标识.
+    结果含账号相关字段 (是否关注, 是否点赞收藏等) 的接口按账号分开缓存, 账号池中的账号互不串用.
+    """
+    key = cache_key(*args, **kwargs)
+    if per_account:
+        auth = args[0] if args else kwargs.get('auth', kwargs.get('auth_'))
+        key = f'{account_key(getattr(auth, "cookie", None))}:{key}'
+    return build.__name__, key
+
+
+def cacheable_result(result):
+    """默认的缓存条件: 结果不为 None, 元组结果不能全为 None (解析失败)"""
+    if result is None:
+        return False
+    if isinstance(result, tuple) and all(value is None for value in result):
+        return False
+    return True
+
+
+def endpoint(build=None, cache_key=None, coalesce=True, cacheable=None, per_account=True):
+    """
+    把返回 ApiRequest 的函数包装成同步接口.
+    原函数保留在 .build 上, AsyncDouyinAPI 复用同样的参数和请求头构造.
+    所有接口都额外接受 proxies 参数, 可以是 requests 风格的代理字典或 ProxyPool.
+    :param cache_key: 以接口参数调用, 返回归一化的 ID, 设置后接口结果走响应缓存, 命中时不再签名和请求.
+    :param coalesce: 同一账号的相同请求同时在途时合并为一次, 写操作和每次结果都不同的接口应关闭.
+    :param cacheable: 以接口结果调用, 返回 True 时才写入响应缓存, 默认 cacheable_result.
+    :param per_account: 响应缓存按账号区分, 只有结果与账号无关的接口才能关闭.
+    """
+    if build is None:
+        return functools.partial(endpoint, cache_key=cache_key, coalesce=coalesce, cacheable=cacheable,
+                                 per_account=per_account)
+
+    @functools.wraps(build)
+    def call(*args, proxies=None, **kwargs):
+        cache = response_key(build, cache_key, per_account, args, kwargs) if cache_key else None
+        if cache:
+            result = get_response_cache().get(*cache)
+            if result is not None:
+                return result
+
+        def load():
+            request = build(*args, **kwargs)
+            request.proxies = proxies
+            return DouyinAPI.send(request, cache, cacheable)
+        if not coalesce:
+            return load()
+        return get_single_flight().do(flight_key(build, cache_key, args, kwargs), load)
+    call.build = build
+    call.cache_key = cache_key
+    call.coalesce = coalesce
+    call.cacheable = cacheable
+    call.per_account = per_account
+    return call
 
 
 class DouyinAPI:
     douyin_url = 'https://www.douyin.com'
     live_url = 'https://live.douyin.com'
     creator = "https://creator.douyin.com"
+    # 共享 HTTP 传输层, 为 None 时使用全局默认实例, 可通过 set_transport 注入
+    transport = None
+
+    @staticmethod
+    def get_transport() -> Transport:
+        return DouyinAPI.transport or get_transport()
+
+    @staticmethod
+    def set_transport(transport: Transport):
+        DouyinAPI.transport = transport
 
+    @staticmethod
+    def send(request: ApiRequest, cache=None, cacheable=None):
+        """
+        限流后发送请求并解析结果.
+        :param request: ApiRequest.
+        :param cache: (接口名, 归一化ID), 不为 None 时把正常响应写入响应缓存.
+        :param cacheable: 结果是否可以缓存, 默认 cacheable_result.
+        """
+        get_rate_limiter().acquire(request.url, request.cookies)
+        with get_concurrency_controller().slot(request.url, request.cookies) as slot:
+            res = DouyinAPI.get_transport().send(request)
+            try:
+                result = request.parse(res)
+            except Exception:
+                slot.observe(res)
+                raise
+            if slot.observe(res, result, request.expect) == OK and cache and (cacheable or cacheable_result)(result):
+                get_response_cache().set(*cache, result)
+            return result
 
     @staticmethod
-    def get_user_all_work_info(auth, user_url: str, **kwargs) -> list:
+    def check_csrf(auth, res):
         """
-        获取用户全部作品信息.
+        接口返回 403 或 csrf 相关错误时作废缓存的 csrf token.
         :param auth: DouyinAuth object.
-        :param user_url: 用户主页URL.
-        :return: 全部作品信息.
+        :param res: 响应.
         """
-        max_cursor = "0"
-        work_list = []
-        request_count = 0
-        while True:
-            request_count += 1
-            res_json = DouyinAPI.get_user_work_info(auth, user_url, max_cursor)
-            print(f"[DEBUG] 第{request_count}次请求, 响应: {res_json}，max_cursor={max_cursor}")
+        if res.status_code == 403 or 'csrf' in res.text[:1024].lower():
+            invalidate_csrf_token(auth.cookie_str)
 
-            if "aweme_list" not in res_json.keys():
-                print(f"[DEBUG] 响应中无 aweme_list, 响应: {res_json}")
-                break
+    @staticmethod
+    def csrf_parser(auth):
+        def parse(res):
+            DouyinAPI.check_csrf(auth, res)
+            return res.json()
+        return parse
 
-            works = res_json["aweme_list"]
-            max_cursor = str(res_json["max_cursor"])
-            has_more = res_json.get("has_more", 0)
+    @staticmethod
+    def parse_my_uid(res) -> int:
+        resp_json = json.loads(res.text)
+        return int(resp_json['user_uid'])
 
-            print(f"[DEBUG] 本次获取 {len(works)} 个, has_more={has_more}, 新cursor={max_cursor}")
+    @staticmethod
+    def parse_sec_uid(res) -> str:
+        sec_uid = re.findall(r'\\"secUid\\":\\"(.*?)\\"', res.text)[0]
+        return sec_uid
 
-            work_list.extend(works)
-            if has_more != 1:
+    @staticmethod
+    def parse_live_info(res):
+        ttwid = res.cookies['ttwid']
+        soup = BeautifulSoup(res.text, 'html.parser')
+        scripts = soup.select('script[nonce]')
+        for script in scripts:
+            if script.string is not None and 'roomId' in script.string:
+                try:
+                    room_id = re.findall(r'\\"roomId\\":\\"(\d+)\\"', script.string)[0]
+                    user_id = re.findall(r'\\"user_unique_id\\":\\"(\d+)\\"', script.string)[0]
+                    room_info = re.findall(r'\\"roomInfo\\":\{\\"room\\":\{\\"id_str\\":\\".*?\\",\\"status\\":(.*?),\\"status_str\\":\\".*?\\",\\"title\\":\\"(.*?)\\"', script.string)[0]
+                    room_status = room_info[0]
+                    room_title = room_info[1]
+                    return {
+                        "room_id": room_id,
+                        "user_id": user_id,
+                        "ttwid": ttwid,
+                        # 2 是直播中 4 是未开播
+                        "room_status": room_status,
+                        "room_title": room_title
+                    }
+                except Exception as e:
+                    pass
+        return None, None, None
+
+    @staticmethod
+    def iter_user_work_pages(auth, user_url: str, max_cursor: str = "0", **kwargs):
+        """
+        逐页获取用户作品.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param max_cursor: 起始游标, 从第一页开始为 "0".
+        :param strict: 关键字参数, 为 True 时被限流或页不完整抛出 IncompletePage, 而不是当作翻页结束.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.get_user_work_info(auth, user_url, max_cursor, proxies=kwargs.get('proxies'))
+            if "aweme_list" not in res_json.keys():
+                if kwargs.get('strict'):
+                    raise IncompletePage(f'用户作品列表 {max_cursor} 页没有 aweme_list: {res_json}')
+                break
+            next_cursor = str(res_json["max_cursor"])
+            has_more = res_json.get("has_more", 0) == 1
+            yield Page(res_json["aweme_list"], max_cursor, next_cursor, has_more, res_json)
+            if not has_more:
                 break
+            max_cursor = next_cursor
 
-            # 添加随机延时，避免请求过快触发反爬
-            time.sleep(random.uniform(1.0, 2.0))
+    @staticmethod
+    def get_user_all_work_info(auth, user_url: str, checkpoint: bool = False, **kwargs) -> list:
+        """
+        获取用户全部作品信息.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
+        :return: 全部作品信息.
+        """
+        if checkpoint:
+            return crawl('get_user_all_work_info', parse_user_id(user_url),
+                         lambda cursor: DouyinAPI.iter_user_work_pages(auth, user_url, cursor or "0",
+                                                                       strict=True, **kwargs))
+        return take(DouyinAPI.iter_user_work_pages(auth, user_url, **kwargs))
 
-        print(f"[DEBUG] 总共获取 {len(work_list)} 个作品")
-        return work_list
 
+    @staticmethod
+    def get_user_new_work_info(auth, user_url: str, known: set, **kwargs) -> list:
+        """
+        增量获取用户作品, 只返回 known 中没有的作品.
+        作品按发布时间倒序返回, 某一页除置顶作品外都已在 known 中时说明后面都是抓取过的作品, 不再请求下一页.
+        :param auth: DouyinAuth object.
+        :param user_url: 用户主页URL.
+        :param known: 已抓取过的 aweme_id 集合.
+        :return: 新作品信息列表.
+        """
+        new_works = []
+        pages = DouyinAPI.iter_user_work_pages(auth, user_url, **kwargs)
+        for page in pages:
+            new_works.extend(work for work in page.items if str(work['aweme_id']) not in known)
+            # 置顶作品可能是很早以前抓取过的, 不能作为停止的依据
+            works = [work for work in page.items if not work.get('is_top')]
+            if works and all(str(work['aweme_id']) in known for work in works):
+                pages.close()
+                break
+        return new_works
 
     @staticmethod
+    @endpoint
     def get_user_work_info(auth, user_url: str, max_cursor, **kwargs) -> dict:
         """
         获取用户作品信息.
@@ -70,57 +283,11 @@ class DouyinAPI:
         :param max_cursor:  上一次请求的max_cursor.
         :return:
         """
-        api = f"/aweme/v1/web/aweme/post/"
-        user_id = user_url.split("/")[-1].split("?")[0]
-        headers = HeaderBuilder().build(HeaderType.GET)
-        headers.set_referer(user_url)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("sec_user_id", user_id)
-        params.add_param("max_cursor", max_cursor)
-        params.add_param("locate_query", 'false')
-        params.add_param("show_live_replay_strategy", '1')
-        params.add_param("need_time_list", '1' if max_cursor == '0' else '0')
-        params.add_param("time_list_query", '0')
-        params.add_param("whale_cut_token", '')
-        params.add_param("cut_version", '1')
-        params.add_param("count", '18')
-        params.add_param("publish_video_strategy_type", '2')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '290100')
-        params.add_param("version_name", '29.1.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '100')
-        params.with_web_id(auth, user_url)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken",
-                         auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        return json.loads(resp.text)
+        return endpoints.USER_POST.build(auth, user_url, sec_user_id=parse_user_id(user_url), max_cursor=max_cursor,
+                                         need_time_list='1' if max_cursor == '0' else '0')
 
     @staticmethod
+    @endpoint(cache_key=lambda auth, url, **kwargs: parse_aweme_id(url))
     def get_work_info(auth, url: str) -> dict:
         """
         获取作品信息.
@@ -128,52 +295,13 @@ class DouyinAPI:
         :param url: 作品URL.
         :return: JSON.
         """
-        api = f"/aweme/v1/web/aweme/detail/"
-        if 'video' in url:
-            aweme_id = url.split("/")[-1].split("?")[0]
-        else:
-            aweme_id = re.findall(r'modal_id=(\d+)', url)[0]
+        aweme_id = parse_aweme_id(url)
+        if 'video' not in url:
             url = f'https://www.douyin.com/video/{aweme_id}'
-        headers = HeaderBuilder().build(HeaderType.GET)
-        headers.set_referer(url)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("aweme_id", aweme_id)
-        params.add_param("update_version_code", "170400")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "190500")
-        params.add_param("version_name", "19.5.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "4.75")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "150")
-        params.with_web_id(auth, url)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        resp_json = json.loads(resp.text)
-        return resp_json
+        return endpoints.WORK_DETAIL.build(auth, url, aweme_id=aweme_id)
 
     @staticmethod
+    @endpoint
     def get_work_out_comment(auth, url: str, cursor: str = '0', **kwargs) -> dict:
         """
         获取作品的全部一级评论.
@@ -182,79 +310,55 @@ class DouyinAPI:
         :param cursor: 评论游标.
         :return: JSON.
         """
-        api = f"/aweme/v1/web/comment/list/"
-        if 'video' in url:
-            aweme_id = url.split("/")[-1].split("?")[0]
-        else:
-            aweme_id = re.findall(r'modal_id=(\d+)', url)[0]
+        aweme_id = parse_aweme_id(url)
+        if 'video' not in url:
             url = f'https://www.douyin.com/video/{aweme_id}'
-        headers = HeaderBuilder().build(HeaderType.GET)
-        headers.set_referer(url)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("aweme_id", aweme_id)
-        params.add_param("cursor", cursor)
-        params.add_param("count", "5")
-        params.add_param("item_type", "0")
-        params.add_param("whale_cut_token", "")
-        params.add_param("cut_version", "1")
-        params.add_param("rcFT", "")
-        params.add_param("update_version_code", "170400")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "0")
-        params.with_web_id(auth, url)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        resp_json = json.loads(resp.text)
-        return resp_json
+        return endpoints.COMMENT_LIST.build(auth, url, aweme_id=aweme_id, cursor=cursor)
 
     @staticmethod
-    def get_work_all_out_comment(auth, url: str, **kwargs) -> list:
+    def iter_work_out_comment_pages(auth, url: str, cursor: str = "0", **kwargs):
         """
-        获取作品全部一级评论.
+        逐页获取作品一级评论.
         :param auth: DouyinAuth object.
         :param url: 作品URL.
-        :return:
+        :param cursor: 起始游标.
+        :param strict: 关键字参数, 为 True 时被限流或页不完整抛出 IncompletePage, 而不是当作翻页结束.
+        :return: Page 生成器.
         """
-        cursor = "0"
-        comment_list = []
         while True:
-            res_json = DouyinAPI.get_work_out_comment(auth, url, cursor)
-            comments = res_json["comments"]
-            cursor = str(res_json["cursor"])
-            if comments is None or len(comments) == 0:
+            res_json = DouyinAPI.get_work_out_comment(auth, url, cursor, proxies=kwargs.get('proxies'))
+            comments = res_json.get("comments")
+            if not comments:
+                if res_json.get("has_more") == 0:
+                    # 已经取完, 返回一页空结果让断点知道翻页正常结束
+                    yield Page([], cursor, cursor, False, res_json)
+                elif kwargs.get('strict'):
+                    raise IncompletePage(f'作品评论 {cursor} 页没有 comments: {res_json}')
                 break
-            comment_list.extend(comments)
-            if res_json["has_more"] != 1:
+            next_cursor = str(res_json["cursor"])
+            has_more = res_json["has_more"] == 1
+            yield Page(comments, cursor, next_cursor, has_more, res_json)
+            if not has_more:
                 break
-        return comment_list
+            cursor = next_cursor
 
     @staticmethod
+    def get_work_all_out_comment(auth, url: str, checkpoint: bool = False, **kwargs) -> list:
+        """
+        获取作品全部一级评论.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
+        :return:
+        """
+        if checkpoint:
+            return crawl('get_work_all_out_comment', parse_aweme_id(url),
+                         lambda cursor: DouyinAPI.iter_work_out_comment_pages(auth, url, cursor or "0",
+                                                                              strict=True, **kwargs))
+        return take(DouyinAPI.iter_work_out_comment_pages(auth, url, **kwargs))
+
+    @staticmethod
+    @endpoint
     def get_work_inner_comment(auth, comment: dict, cursor: str, count: str = '3', **kwargs):
         """
         获取作品评论的二级评论.
@@ -264,92 +368,117 @@ class DouyinAPI:
         :param cursor: 评论游标.
         :return:
         """
-        api = f"/aweme/v1/web/comment/list/reply/"
-        aweme_id = comment['aweme_id']
-        comment_id = comment['cid']
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = f'https://www.douyin.com/video/{aweme_id}'
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("item_id", aweme_id)
-        params.add_param("comment_id", comment_id)
-        params.add_param("cut_version", "1")
-        params.add_param("cursor", cursor)
-        params.add_param("count", count)
-        params.add_param("item_type", "0")
-        params.add_param("update_version_code", "170400")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "0")
-        params.with_web_id(auth, refer)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        resp_json = json.loads(resp.text)
-        return resp_json
+        refer = f'https://www.douyin.com/video/{comment["aweme_id"]}'
+        return endpoints.COMMENT_REPLY.build(auth, refer, item_id=comment['aweme_id'], comment_id=comment['cid'],
+                                             cursor=cursor, count=count)
 
     @staticmethod
-    def get_work_all_inner_comment(auth, comment: dict, **kwargs) -> list:
+    def build_work_inner_comments(auth, comments: list, count: str = '5') -> list:
         """
-        获取作品评论的全部二级评论.
+        构造多条一级评论的第一页二级评论请求, a_bogus 一次调用签名引擎全部签完.
+        :param auth: DouyinAuth object.
+        :param comments: 一级评论信息列表.
+        :param count: 每页数量.
+        :return: ApiRequest 列表, 与 comments 一一对应.
+        """
+        return endpoints.COMMENT_REPLY.build_many(auth, [
+            (f'https://www.douyin.com/video/{comment["aweme_id"]}', None,
+             dict(item_id=comment['aweme_id'], comment_id=comment['cid'], cursor='0', count=count))
+            for comment in comments])
+
+    @staticmethod
+    def iter_work_inner_comment_pages(auth, comment: dict, cursor: str = "0", count: str = '5', request=None,
+                                      **kwargs):
+        """
+        逐页获取作品评论的二级评论.
         :param auth: DouyinAuth object.
         :param comment: 一级评论信息.
-        :return: 二级评论列表.
+        :param cursor: 起始游标.
+        :param count: 每页数量.
+        :param request: 已签名的第一页请求 (见 build_work_inner_comments), 为 None 时现场构造.
+        :return: Page 生成器.
         """
-        cursor = "0"
-        count = '5'
-        comment_list = []
         while True:
-            res_json = DouyinAPI.get_work_inner_comment(auth, comment, cursor, count)
+            if request is not None:
+                request.proxies = kwargs.get('proxies')
+                res_json = DouyinAPI.send(request)
+                request = None
+            else:
+                res_json = DouyinAPI.get_work_inner_comment(auth, comment, cursor, count,
+                                                            proxies=kwargs.get('proxies'))
             comments = res_json["comments"]
-            cursor = str(res_json["cursor"])
-            if type(comments) is list and len(comments) > 0:
-                comment_list.extend(comments)
-            if res_json["has_more"] != 1:
+            next_cursor = str(res_json["cursor"])
+            has_more = res_json["has_more"] == 1
+            yield Page(comments if type(comments) is list else [], cursor, next_cursor, has_more, res_json)
+            if not has_more:
                 break
-        return comment_list
+            cursor = next_cursor
+
+    @staticmethod
+    def get_work_all_inner_comment(auth, comment: dict, **kwargs) -> list:
+        """
+        获取作品评论的全部二级评论.
+        :param auth: DouyinAuth object.
+        :param comment: 一级评论信息.
+        :return: 二级评论列表.
+        """
+        return take(DouyinAPI.iter_work_inner_comment_pages(auth, comment, **kwargs))
+
+    @staticmethod
+    def iter_work_comment_pages(auth, url: str, cursor: str = "0", concurrency: int = None, **kwargs):
+        """
+        逐页获取作品评论, 每页的一级评论带上全部二级评论 (reply_comment).
+        不同评论的二级评论并发获取, 获取上一页二级评论的同时请求下一页一级评论, 结果按原顺序组装.
+        :param auth: DouyinAuth object.
+        :param url: 作品URL.
+        :param cursor: 起始游标.
+        :param concurrency: 同时获取二级评论的评论数, 默认 DY_REPLY_CONCURRENCY.
+        :return: Page 生成器.
+        """
+        executor = ThreadPoolExecutor(max_workers=concurrency or REPLY_CONCURRENCY)
+        pending = collections.deque()
+
+        def assemble():
+            page, futures = pending.popleft()
+            for comment, future in futures:
+                comment['reply_comment'] = future.result()
+            return page
+
+        try:
+            for page in DouyinAPI.iter_work_out_comment_pages(auth, url, cursor, **kwargs):
+                for comment in page.items:
+                    comment['reply_comment'] = []
+                # 同一页各评论的第一页二级评论请求一起签名
+                replied = [comment for comment in page.items if comment['reply_comment_total'] > 0]
+                requests = DouyinAPI.build_work_inner_comments(auth, replied)
+                futures = [(comment, executor.submit(DouyinAPI.get_work_all_inner_comment, auth, comment,
+                                                     request=request, proxies=kwargs.get('proxies')))
+                           for comment, request in zip(replied, requests)]
+                pending.append((page, futures))
+                while len(pending) > 1 or pending and all(future.done() for _, future in pending[0][1]):
+                    yield assemble()
+            while pending:
+                yield assemble()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @staticmethod
-    def get_work_all_comment(auth, url: str, **kwargs):
+    def get_work_all_comment(auth, url: str, checkpoint: bool = False, **kwargs):
         """
         获取作品全部评论.
         :param auth: DouyinAuth object.
         :param url: 作品URL.
+        :param checkpoint: 是否保存断点, 中途失败后再次调用从上次的位置继续.
         :return: 全部评论列表.
         """
-        out_comment_list = DouyinAPI.get_work_all_out_comment(auth, url)
-        for comment in out_comment_list:
-            comment['reply_comment'] = []
-            if comment['reply_comment_total'] > 0:
-                inner_comment_list = DouyinAPI.get_work_all_inner_comment(auth, comment)
-                comment['reply_comment'] = inner_comment_list
-        return out_comment_list
+        if checkpoint:
+            return crawl('get_work_all_comment', parse_aweme_id(url),
+                         lambda cursor: DouyinAPI.iter_work_comment_pages(auth, url, cursor or "0",
+                                                                          strict=True, **kwargs))
+        return take(DouyinAPI.iter_work_comment_pages(auth, url, **kwargs))
 
     @staticmethod
+    @endpoint(cache_key=lambda auth, user_url, **kwargs: parse_user_id(user_url))
     def get_user_info(auth, user_url: str, **kwargs) -> dict:
         """
         获取用户信息.
@@ -357,50 +486,10 @@ class DouyinAPI:
         :param user_url: 用户主页URL.
         :return: 用户信息.
         """
-        api = f"/aweme/v1/web/user/profile/other/"
-        user_id = user_url.split("/")[-1].split("?")[0]
-        headers = HeaderBuilder().build(HeaderType.GET)
-        headers.set_referer(user_url)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("publish_video_strategy_type", '2')
-        params.add_param("source", 'channel_pc_web')
-        params.add_param("sec_user_id", user_id)
-        params.add_param("personal_center_strategy", '1')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '100')
-        params.with_web_id(auth, user_url)
-        params.add_param("msToken", auth.msToken)
-        params.add_param('verifyFp', auth.cookie['s_v_web_id'])
-        params.add_param('fp', auth.cookie['s_v_web_id'])
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        return json.loads(resp.text)
+        return endpoints.USER_PROFILE.build(auth, user_url, sec_user_id=parse_user_id(user_url))
 
     @staticmethod
+    @endpoint
     def search_general_work(auth, query: str, sort_type: str = '0', publish_time: str = '0', offset: str = '0',
                             filter_duration="", search_range="", content_type="", **kwargs):
         """
@@ -415,60 +504,35 @@ class DouyinAPI:
         :param content_type: 内容形式 0 不限, 1 视频, 2 图文
         :return: JSON数据.
         """
-        api = f"/aweme/v1/web/general/search/single/"
-        headers = HeaderBuilder().build(HeaderType.GET)
         refer = f'https://www.douyin.com/search/{urllib.parse.quote(query)}?aid={uuid.uuid4()}&type=general'
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("search_channel", "aweme_general")
-        params.add_param("enable_history", "1")
-        params.add_param("filter_selected", r'{"sort_type":"%s","publish_time":"%s","filter_duration":"%s",'
-                                            r'"search_range":"%s","content_type":"%s"}' % (sort_type, publish_time,
-                                                                                           filter_duration,
-                                                                                           search_range, content_type))
-        params.add_param("keyword", query)
-        params.add_param("search_source", "tab_search")
-        params.add_param("query_correct_type", "1")
-        params.add_param("is_filter_search", "1")
-        params.add_param("from_group_id", "")
-        params.add_param("offset", offset)
-        params.add_param("count", '25')
-        params.add_param("need_filter_settings", '1' if offset == '0' else '0')
-        params.add_param("list_type", "single")
-        params.add_param("update_version_code", "170400")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "190600")
-        params.add_param("version_name", "19.6.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "50")
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        return json.loads(resp.text)
+        filter_selected = (r'{"sort_type":"%s","publish_time":"%s","filter_duration":"%s",'
+                           r'"search_range":"%s","content_type":"%s"}' % (sort_type, publish_time, filter_duration,
+                                                                          search_range, content_type))
+        return endpoints.SEARCH_GENERAL.build(auth, refer, filter_selected=filter_selected, keyword=query,
+                                              offset=offset, need_filter_settings='1' if offset == '0' else '0')
+
+    @staticmethod
+    def iter_search_general_work_pages(auth, query: str, sort_type: str = '0', publish_time: str = '0',
+                                       filter_duration="", search_range="", content_type="", offset: str = "0",
+                                       **kwargs):
+        """
+        逐页搜索综合频道作品, 参数同 search_general_work.
+        :param offset: 起始偏移量.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.search_general_work(auth, query, sort_type, publish_time, offset,
+                                                     filter_duration, search_range, content_type, proxies=kwargs.get('proxies'))
+            works = res_json["data"]
+            next_offset = str(int(offset) + len(works))
+            has_more = res_json["has_more"] == 1
+            yield Page(works, offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
 
     @staticmethod
-    def search_some_general_work(auth, query: str, num: int, sort_type: str, publish_time: str, filter_duration="", search_range="", content_type="", **kwargs) -> list:
+    def search_some_general_work(auth, query: str, num: int, sort_type: str, publish_time: str, filter_duration="", search_range="", content_type="", seen=None, **kwargs) -> list:
         """
         搜索指定数量综合频道作品.
         :param auth: DouyinAuth object.
@@ -479,47 +543,46 @@ class DouyinAPI:
         :param filter_duration: 视频时长 空字符串 不限, 0-1 一分钟内, 1-5 1-5分钟内, 5-10000 5分钟以上
         :param search_range: 搜索范围 0 不限, 1 最近看过, 2 还未看过, 3 关注的人
         :param content_type: 内容形式 0 不限, 1 视频, 2 图文
+        :param seen: SeenFilter, 跳过已记录的作品, 跳过的不计入数量, 处理完后用 seen.mark(works, aweme_key) 记录.
         :return: 作品列表.
         """
-        offset = "0"
-        work_list = []
+        return take(DouyinAPI.iter_search_general_work_pages(auth, query, sort_type, publish_time, filter_duration,
+                                                             search_range, content_type, **kwargs), num, seen, aweme_key)
+
+    @staticmethod
+    def iter_search_user_pages(auth, query: str, offset: str = "0", count: str = "25", **kwargs):
+        """
+        逐页搜索用户.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param offset: 起始偏移量.
+        :param count: 每页数量.
+        :return: Page 生成器.
+        """
         while True:
-            res_json = DouyinAPI.search_general_work(auth, query, sort_type, publish_time, offset,
-                                                     filter_duration, search_range, content_type)
-            works = res_json["data"]
-            work_list.extend(works)
-            if res_json["has_more"] != 1 or len(work_list) >= num:
+            res_json = DouyinAPI.search_user(auth, query, offset, count, proxies=kwargs.get('proxies'))
+            next_offset = str(int(offset) + int(count))
+            has_more = res_json["has_more"] == 1
+            yield Page(res_json["user_list"], offset, next_offset, has_more, res_json)
+            if not has_more:
                 break
-            offset = str(int(offset) + len(works))
-        if len(work_list) > num:
-            work_list = work_list[:num]
-        return work_list
+            offset = next_offset
 
     @staticmethod
-    def search_some_user(auth, query: str, num: int, **kwargs) -> list:
+    def search_some_user(auth, query: str, num: int, seen=None, **kwargs) -> list:
         """
         搜索指定数量用户.
         :param auth: DouyinAuth object.
         :param query: 搜索关键字.
         :param num: 搜索结果数量.
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
         :return: 用户列表.
         """
-        offset = "0"
-        count = "25"
-        user_list = []
-        while True:
-            res_json = DouyinAPI.search_user(auth, query, offset, count)
-            users = res_json["user_list"]
-            user_list.extend(users)
-            if res_json["has_more"] != 1 or len(user_list) >= num:
-                break
-            offset = str(int(offset) + int(count))
-        if len(user_list) > num:
-            user_list = user_list[:num]
-        return user_list
+        return take(DouyinAPI.iter_search_user_pages(auth, query, **kwargs), num, seen, user_key)
 
 
     @staticmethod
+    @endpoint
     def search_user(auth, query: str, offset: str = '0', num: str = '25', douyin_user_fans="", douyin_user_type="", **kwargs):
         """
         搜索用户.
@@ -531,56 +594,15 @@ class DouyinAPI:
         :param douyin_user_type: 用户类型 空字符串 不限 common_user 普通用户 enterprise_user 企业用户 personal_user 个人认证用户
         :return: JSON数据.
         """
-        api = "/aweme/v1/web/discover/search"
-        headers = HeaderBuilder().build(HeaderType.GET)
         refer = f'https://www.douyin.com/search/{urllib.parse.quote(query)}?aid={uuid.uuid4()}&type=general'
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("search_channel", 'aweme_user_web')
-        params.add_param("search_filter_value", r'{"douyin_user_fans":["%s"],"douyin_user_type":["%s"]}' % (
-            douyin_user_fans, douyin_user_type))
-        params.add_param("keyword", query)
-        params.add_param("search_source", 'switch_tab')
-        params.add_param("query_correct_type", '1')
-        params.add_param("is_filter_search", '1')
-        # params.add_param("from_group_id", '7378456704385600820')
-        params.add_param("offset", offset)
-        params.add_param("count", num)
-        params.add_param("need_filter_settings", '1' if offset == '0' else '0')
-        params.add_param("list_type", 'single')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '150')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        return resp.json()
+        search_filter_value = r'{"douyin_user_fans":["%s"],"douyin_user_type":["%s"]}' % (douyin_user_fans,
+                                                                                          douyin_user_type)
+        return endpoints.SEARCH_USER.build(auth, refer, search_filter_value=search_filter_value, keyword=query,
+                                           offset=offset, count=num,
+                                           need_filter_settings='1' if offset == '0' else '0')
 
     @staticmethod
+    @endpoint
     def search_live(auth, query: str, offset: str = '0', num: str = '25', **kwargs):
         """
         搜索直播.
@@ -590,52 +612,28 @@ class DouyinAPI:
         :param num:  搜索数量.
         :return: JSON数据.
         """
-        api = "/aweme/v1/web/live/search/"
-        headers = HeaderBuilder().build(HeaderType.GET)
         refer = f'https://www.douyin.com/search/{urllib.parse.quote(query)}?aid={uuid.uuid4()}&type=live'
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("search_channel", 'aweme_live')
-        params.add_param("keyword", query)
-        params.add_param("search_source", 'normal_search')
-        params.add_param("query_correct_type", '1')
-        params.add_param("is_filter_search", '0')
-        params.add_param("from_group_id", '')
-        params.add_param("offset", offset)
-        params.add_param("count", num)
-        params.add_param("need_filter_settings", '1' if offset == '0' else '0')
-        params.add_param("list_type", 'single')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '50')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        resp = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                            params=params.get(), verify=False)
-        return resp.json()
+        return endpoints.SEARCH_LIVE.build(auth, refer, keyword=query, offset=offset, count=num,
+                                           need_filter_settings='1' if offset == '0' else '0')
+
+    @staticmethod
+    def iter_search_live_pages(auth, query: str, offset: str = "0", count: str = "25", **kwargs):
+        """
+        逐页搜索直播.
+        :param auth: DouyinAuth object.
+        :param query: 搜索关键字.
+        :param offset: 起始偏移量.
+        :param count: 每页数量.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.search_live(auth, query, offset, count, proxies=kwargs.get('proxies'))
+            next_offset = str(int(offset) + int(count))
+            has_more = res_json["has_more"] == 1
+            yield Page(res_json["data"], offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
 
     @staticmethod
     def search_some_live(auth, query: str, num: int, **kwargs) -> list:
@@ -646,21 +644,10 @@ class DouyinAPI:
         :param num:  搜索数量.
         :return: 直播列表.
         """
-        offset = "0"
-        count = "25"
-        live_list = []
-        while True:
-            res_json = DouyinAPI.search_live(auth, query, offset, count)
-            lives = res_json["data"]
-            live_list.extend(lives)
-            if res_json["has_more"] != 1 or len(live_list) >= num:
-                break
-            offset = str(int(offset) + int(count))
-        if len(live_list) > num:
-            live_list = live_list[:num]
-        return live_list
+        return take(DouyinAPI.iter_search_live_pages(auth, query, **kwargs), num)
 
     @staticmethod
+    @endpoint
     def get_user_favorite(auth, sec_id: str, max_cursor: str = '0', num: str = '18', **kwargs):
         """
         获取用户收藏.
@@ -670,77 +657,22 @@ class DouyinAPI:
         :param num: 要获取的收藏数量.
         :return: JSON.
         """
-        headers = HeaderBuilder.build(HeaderType.GET)
         refer = f"https://www.douyin.com/user/{sec_id}?showTab=like"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("sec_user_id", 'MS4wLjABAAAA99bTJ_GOw3odYmsXOe7i7xuEv0iQf2X_Kg_VUyVP0U8')
-        params.add_param("max_cursor", max_cursor)
-        params.add_param("min_cursor", '0')
-        params.add_param("whale_cut_token", '')
-        params.add_param("cut_version", '1')
-        params.add_param("count", num)
-        params.add_param("publish_video_strategy_type", '2')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '100')
-        params.with_web_id(auth=auth, url=refer)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken",
-                         auth.msToken)
-        params.with_a_bogus()
-        response = requests.get('https://www.douyin.com/aweme/v1/web/aweme/favorite/', params=params.get(),
-                                headers=headers.get(), cookies=auth.cookie,
-                                verify=False)
-        return response.json()
+        return endpoints.USER_FAVORITE.build(auth, refer, max_cursor=max_cursor, count=num)
 
 
     @staticmethod
+    @endpoint
     def get_my_uid(auth, **kwargs) -> int:
         """
         获取自己的用户ID.
         :param auth: DouyinAuth object.
         :return: 用户ID.
         """
-        url = 'https://www.douyin.com/aweme/v1/web/query/user/'
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = 'https://www.douyin.com/'
-        headers.set_header('referer', refer)
-        params = Params()
-        params.with_platform()
-        params.with_web_id(auth, refer)
-        params.with_ms_token()
-        params.add_param('verifyFp', auth.cookie['s_v_web_id'])
-        params.add_param('fp', auth.cookie['s_v_web_id'])
-        params.with_a_bogus()
-        resp = requests.get(url, params=params.get(), verify=False, headers=headers.get(), cookies=auth.cookie)
-        resp_json = json.loads(resp.text)
-        return int(resp_json['user_uid'])
+        return endpoints.QUERY_USER.build(auth, 'https://www.douyin.com/', parse=DouyinAPI.parse_my_uid)
 
     @staticmethod
+    @endpoint
     def get_my_sec_uid(auth, **kwargs) -> str:
         """
         获取自己的SECID.
@@ -752,12 +684,13 @@ class DouyinAPI:
         params = {
             "from_tab_name": "main"
         }
-        response = requests.get(url, headers=headers.get(), cookies=auth.cookie, params=params)
-        sec_uid = re.findall(r'\\"secUid\\":\\"(.*?)\\"', response.text)[0]
-        return sec_uid
+        return ApiRequest('GET', url, params=params, headers=headers.get(), cookies=auth.cookie,
+                          parse=DouyinAPI.parse_sec_uid)
 
 
     @staticmethod
+    @endpoint(cache_key=lambda auth_, live_id, **kwargs: live_id, cacheable=lambda result: isinstance(result, dict),
+              per_account=False)
     def get_live_info(auth_, live_id, **kwargs):
         """
         获取直播间信息.
@@ -766,31 +699,10 @@ class DouyinAPI:
         """
         url = "https://live.douyin.com/" + live_id
         headers = HeaderBuilder().build(HeaderType.GET)
-        res = requests.get(url, headers=headers.get(), cookies=auth_.cookie, verify=False)
-        ttwid = res.cookies.get_dict()['ttwid']
-        soup = BeautifulSoup(res.text, 'html.parser')
-        scripts = soup.select('script[nonce]')
-        for script in scripts:
-            if script.string is not None and 'roomId' in script.string:
-                try:
-                    room_id = re.findall(r'\\"roomId\\":\\"(\d+)\\"', script.string)[0]
-                    user_id = re.findall(r'\\"user_unique_id\\":\\"(\d+)\\"', script.string)[0]
-                    room_info = re.findall(r'\\"roomInfo\\":\{\\"room\\":\{\\"id_str\\":\\".*?\\",\\"status\\":(.*?),\\"status_str\\":\\".*?\\",\\"title\\":\\"(.*?)\\"', script.string)[0]
-                    room_status = room_info[0]
-                    room_title = room_info[1]
-                    return {
-                        "room_id": room_id,
-                        "user_id": user_id,
-                        "ttwid": ttwid,
-                        # 2 是直播中 4 是未开播
-                        "room_status": room_status,
-                        "room_title": room_title
-                    }
-                except Exception as e:
-                    pass
-        return None, None, None
+        return ApiRequest('GET', url, headers=headers.get(), cookies=auth_.cookie, parse=DouyinAPI.parse_live_info)
 
     @staticmethod
+    @endpoint
     def get_live_production(auth, url: str, room_id: str, author_id: str, offset: str, **kwargs):
         """
         获取直播间的商品信息.
@@ -801,45 +713,27 @@ class DouyinAPI:
         :param offset: 翻页游标.
         :return: JSON 商品列表.
         """
-        api = f"/live/promotions/page/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        headers.set_header("origin", DouyinAPI.live_url)
-        headers.set_referer(url)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("room_id", room_id)
-        params.add_param("author_id", author_id)
-        params.add_param("offset", offset)
-        params.add_param("limit", "20")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "210800")
-        params.add_param("version_name", "21.8.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "2560")
-        params.add_param("screen_height", "1440")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "121.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "121.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "20")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "50")
-        params.with_web_id(auth, url)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        res = requests.post(f'{DouyinAPI.live_url}{api}', headers=headers.get(), cookies=auth.cookie,
-                           params=params.get(), verify=False)
-        return res.json()
+        return endpoints.LIVE_PROMOTIONS.build(auth, url, room_id=room_id, author_id=author_id, offset=offset)
+
+    @staticmethod
+    def iter_live_production_pages(auth, url: str, room_id: str, author_id: str, offset: str = "0", **kwargs):
+        """
+        逐页获取直播间商品.
+        :param auth: DouyinAuth object.
+        :param url: 直播间链接.
+        :param room_id: 直播间ID
+        :param author_id: 主播ID
+        :param offset: 起始游标.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.get_live_production(auth, url, room_id, author_id, offset, proxies=kwargs.get('proxies'))
+            next_offset = str(res_json["next_offset"])
+            has_more = next_offset != "-1"
+            yield Page(res_json["promotions"], offset, next_offset, has_more, res_json)
+            if not has_more:
+                break
+            offset = next_offset
 
     @staticmethod
     def get_all_live_production(auth, url: str, **kwargs):
@@ -849,21 +743,12 @@ class DouyinAPI:
         :param url: 直播间链接.
         :return:
         """
-        room_info = DouyinAPI.get_live_info(auth, url.split("/")[-1].split("?")[0])
-        room_id = room_info["room_id"]
-        author_id = room_info["author_id"]
-        offset = "0"
-        production_list = []
-        while True:
-            res_json = DouyinAPI.get_live_production(auth, url, room_id, author_id, offset)
-            productions = res_json["promotions"]
-            production_list.extend(productions)
-            offset = str(res_json["next_offset"])
-            if offset == "-1":
-                break
-        return production_list
+        room_info = DouyinAPI.get_live_info(auth, url.split("/")[-1].split("?")[0], proxies=kwargs.get('proxies'))
+        return take(DouyinAPI.iter_live_production_pages(auth, url, room_info["room_id"], room_info["author_id"],
+                                                         **kwargs))
 
     @staticmethod
+    @endpoint
     def get_live_production_detail(auth, url, ec_promotion_id, sec_author_id, live_room_id, **kwargs):
         """
         获取直播间商品详情.
@@ -874,41 +759,6 @@ class DouyinAPI:
         :param live_room_id: 直播间ID
         :return: JSON 商品详情.
         """
-        api = f"/ecom/product/detail/saas/pc/"
-        headers = HeaderBuilder().build(HeaderType.FORM)
-        headers.set_header("origin", DouyinAPI.live_url)
-        headers.set_referer(url)
-        headers.with_csrf(auth.cookie_str)
-        params = Params()
-        params.add_param("is_h5", "1")
-        params.add_param("origin_type", "638301")
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("pc_client_type", "1")
-        params.add_param("update_version_code", "170400")
-        params.add_param("version_code", "")
-        params.add_param("version_name", "")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "1.7")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "200")
-        params.with_web_id(auth, url)
-        params.add_param("msToken", auth.msToken)
         data = {
             "bff_type": "2",
             "ec_promotion_id": ec_promotion_id,
@@ -921,12 +771,10 @@ class DouyinAPI:
             "sec_author_id": sec_author_id,
             "use_new_price": "1"
         }
-        params.with_a_bogus(data)
-        res = requests.post(f'{DouyinAPI.live_url}{api}', headers=headers.get(), params=params.get(),
-                            cookies=auth.cookie, data=data, verify=False)
-        return res.json()
+        return endpoints.LIVE_PRODUCT_DETAIL.build(auth, url, data=data, parse=DouyinAPI.csrf_parser(auth))
 
     @staticmethod
+    @endpoint(coalesce=False)
     def collect_aweme(auth, aweme_id: str, action: str = '1', **kwargs):
         """
         收藏或取消收藏视频.
@@ -935,54 +783,16 @@ class DouyinAPI:
         :param action: 1: 收藏, 0: 取消收藏.
         :return: 响应JSON.
         """
-        api = '/aweme/v1/web/aweme/collect/'
-        headers = HeaderBuilder().build(HeaderType.FORM)
-        refer = "https://www.douyin.com/?recommend=1"
-        headers.set_referer(refer)
-        headers.with_bd(api, auth)
-        headers.with_csrf(auth.cookie_str)
-        headers.set_header("origin", DouyinAPI.douyin_url)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("pc_client_type", "1")
-        params.add_param("update_version_code", "170400")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "50")
-        params.with_web_id(auth, refer)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken", auth.msToken)
         data = {
             "action": action,
             "aweme_id": aweme_id,
             "aweme_type": "0",
         }
-        params.with_a_bogus(data)
-        res = requests.post(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                            cookies=auth.cookie, data=data, verify=False)
-        return res.json()
+        return endpoints.COLLECT.build(auth, "https://www.douyin.com/?recommend=1", data=data,
+                                       parse=DouyinAPI.csrf_parser(auth))
 
     @staticmethod
+    @endpoint(coalesce=False)
     def move_collect_aweme(auth, aweme_id: str, collect_name: str, collect_id: str, **kwargs):
         """
         移动视频到指定收藏夹（需要先收藏视频）
@@ -992,55 +802,13 @@ class DouyinAPI:
         :param aweme_id: 视频ID.
         :return: 响应JSON.
         """
-        api = '/aweme/v1/web/collects/video/move/'
-        headers = HeaderBuilder().build(HeaderType.FORM)
-        refer = "https://www.douyin.com/?recommend=1"
-        headers.set_referer(refer)
-        headers.with_bd(api, auth)
-        headers.with_csrf(auth.cookie_str)
-        headers.set_header("origin", DouyinAPI.douyin_url)
-        params = Params()
-        params.add_param("aid", "6383")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_online", "true")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("collects_name", collect_name)
-        params.add_param("cookie_enabled", "true")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("device_platform", "webapp")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("item_ids", aweme_id)
-        params.add_param("item_type", "2")
-        params.add_param("move_collects_list", collect_id)
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("pc_client_type", "1")
-        params.add_param("platform", "PC")
-        params.add_param("round_trip_time", "50")
-        params.add_param("screen_height", "960")
-        params.add_param("screen_width", "1707")
-        params.add_param("to_collects_id", collect_id)
-        params.add_param("update_collects_sort", "true")
-        params.add_param("update_version_code", "170400")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.with_web_id(auth, refer)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        res = requests.post(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                            cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.COLLECT_MOVE.build(auth, "https://www.douyin.com/?recommend=1",
+                                            parse=DouyinAPI.csrf_parser(auth), collects_name=collect_name,
+                                            item_ids=aweme_id, move_collects_list=collect_id,
+                                            to_collects_id=collect_id)
 
     @staticmethod
+    @endpoint(coalesce=False)
     def remove_collect_aweme(auth, aweme_id: str, collect_name: str, collect_id: str, **kwargs):
         """
         从指定收藏夹中移除视频（需要先收藏视频）
@@ -1050,101 +818,22 @@ class DouyinAPI:
         :param aweme_id: 视频ID.
         :return: 响应JSON.
         """
-        api = '/aweme/v1/web/collects/video/move/'
-        headers = HeaderBuilder().build(HeaderType.FORM)
-        refer = "https://www.douyin.com/user/self?showTab=favorite_collection"
-        headers.set_referer(refer)
-        headers.with_bd(api, auth)
-        headers.with_csrf(auth.cookie_str)
-        headers.set_header("origin", DouyinAPI.douyin_url)
-        params = Params()
-        params.add_param("aid", "6383")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_online", "true")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("collects_name", collect_name)
-        params.add_param("cookie_enabled", "true")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("device_platform", "webapp")
-        params.add_param("downlink", "10")
-        params.add_param("effective_type", "4g")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("from_collects_id", collect_id)
-        params.add_param("item_ids", aweme_id)
-        params.add_param("item_type", "2")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("pc_client_type", "1")
-        params.add_param("platform", "PC")
-        params.add_param("round_trip_time", "50")
-        params.add_param("screen_height", "960")
-        params.add_param("screen_width", "1707")
-        params.add_param("update_version_code", "170400")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.with_web_id(auth, refer)
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        res = requests.post(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                            cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.COLLECT_REMOVE.build(auth, "https://www.douyin.com/user/self?showTab=favorite_collection",
+                                              parse=DouyinAPI.csrf_parser(auth), collects_name=collect_name,
+                                              from_collects_id=collect_id, item_ids=aweme_id)
 
     @staticmethod
+    @endpoint
     def get_collect_list(auth, **kwargs):
         """
         获取我的收藏夹列表
         :param auth: DouyinAuth object.
         :return: JSON.
         """
-        api = "/aweme/v1/web/collects/list/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = "https://www.douyin.com/?recommend=1"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", "webapp")
-        params.add_param("aid", "6383")
-        params.add_param("channel", "channel_pc_web")
-        params.add_param("cursor", "0")
-        params.add_param("count", "20")
-        params.add_param("update_version_code", "170400")
-        params.add_param("pc_client_type", "1")
-        params.add_param("version_code", "170400")
-        params.add_param("version_name", "17.4.0")
-        params.add_param("cookie_enabled", "true")
-        params.add_param("screen_width", "1707")
-        params.add_param("screen_height", "960")
-        params.add_param("browser_language", "zh-CN")
-        params.add_param("browser_platform", "Win32")
-        params.add_param("browser_name", "Edge")
-        params.add_param("browser_version", "125.0.0.0")
-        params.add_param("browser_online", "true")
-        params.add_param("engine_name", "Blink")
-        params.add_param("engine_version", "125.0.0.0")
-        params.add_param("os_name", "Windows")
-        params.add_param("os_version", "10")
-        params.add_param("cpu_core_num", "32")
-        params.add_param("device_memory", "8")
-        params.add_param("platform", "PC")
-        params.add_param("downlink", "5.95")
-        params.add_param("effective_type", "4g")
-        params.add_param("round_trip_time", "200")
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        res = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                           cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.COLLECT_LIST.build(auth, "https://www.douyin.com/?recommend=1")
 
     @staticmethod
+    @endpoint
     def get_user_follower_list(auth, user_id: str, sec_id: str, max_time: str = '0', count: str = '20', **kwargs):
         """
         获取用户的粉丝列表
@@ -1155,79 +844,45 @@ class DouyinAPI:
         :param count: 数量.
         :return:  JSON.
         """
-        api = "/aweme/v1/web/user/follower/list/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = f"https://www.douyin.com/user/{sec_id}"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("user_id", user_id)
-        params.add_param("sec_user_id", sec_id)
-        params.add_param("offset", '0')
-        params.add_param("min_time", '0')
-        params.add_param("max_time", max_time)
-        params.add_param("count", count)
-        params.add_param("source_type", '2' if max_time == '0' else '1')
-        params.add_param("gps_access", '0')
-        params.add_param("address_book_access", '0')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '150')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        res = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                           cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.FOLLOWER_LIST.build(auth, f"https://www.douyin.com/user/{sec_id}", user_id=user_id,
+                                             sec_user_id=sec_id, max_time=max_time, count=count,
+                                             source_type='2' if max_time == '0' else '1')
 
     @staticmethod
-    def get_some_user_follower_list(auth, user_id: str, sec_id: str, num: int, **kwargs) -> list:
+    def iter_user_follower_pages(auth, user_id: str, sec_id: str, max_time: str = "0", count: str = "20", **kwargs):
+        """
+        逐页获取用户的粉丝列表.
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param max_time: 起始游标.
+        :param count: 每页数量.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.get_user_follower_list(auth, user_id, sec_id, max_time, count, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = res_json.get("min_time")
+            yield Page(res_json["followers"], max_time, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            max_time = next_cursor
+
+    @staticmethod
+    def get_some_user_follower_list(auth, user_id: str, sec_id: str, num: int, seen=None, **kwargs) -> list:
         """
         获取用户的前num个粉丝列表
         :param auth: DouyinAuth object.
         :param user_id: 用户ID.
         :param sec_id: 用户sec_id.
         :param num: 要获取的数量
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
         :return: 粉丝列表.
         """
-        max_time = "0"
-        count = "20"
-        follower_list = []
-        while True:
-            res_json = DouyinAPI.get_user_follower_list(auth, user_id, sec_id, max_time, count)
-            followers = res_json["followers"]
-            follower_list.extend(followers)
-            if res_json["has_more"] != 1 or len(follower_list) >= num:
-                break
-            max_time = res_json["min_time"]
-        if len(follower_list) > num:
-            follower_list = follower_list[:num]
-        return follower_list
+        return take(DouyinAPI.iter_user_follower_pages(auth, user_id, sec_id, **kwargs), num, seen, user_key)
 
     @staticmethod
+    @endpoint
     def get_user_following_list(auth, user_id: str, sec_id: str, max_time: str = '0', count: str = '20', **kwargs):
         """
         获取用户的关注列表
@@ -1238,80 +893,45 @@ class DouyinAPI:
         :param count: 数量.
         :return:
         """
-        api = "/aweme/v1/web/user/following/list/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = f"https://www.douyin.com/user/{sec_id}"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("user_id", user_id)
-        params.add_param("sec_user_id", sec_id)
-        params.add_param("offset", '0')
-        params.add_param("min_time", '0')
-        params.add_param("max_time", max_time)
-        params.add_param("count", count)
-        params.add_param("source_type", '2' if max_time == '0' else '1')
-        params.add_param("gps_access", '0')
-        params.add_param("address_book_access", '0')
-        params.add_param("is_top", '1')
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '150')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        res = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                           cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.FOLLOWING_LIST.build(auth, f"https://www.douyin.com/user/{sec_id}", user_id=user_id,
+                                              sec_user_id=sec_id, max_time=max_time, count=count,
+                                              source_type='2' if max_time == '0' else '1')
+
+    @staticmethod
+    def iter_user_following_pages(auth, user_id: str, sec_id: str, max_time: str = "0", count: str = "20", **kwargs):
+        """
+        逐页获取用户的关注列表.
+        :param auth: DouyinAuth object.
+        :param user_id: 用户ID.
+        :param sec_id: 用户sec_id.
+        :param max_time: 起始游标.
+        :param count: 每页数量.
+        :return: Page 生成器.
+        """
+        while True:
+            res_json = DouyinAPI.get_user_following_list(auth, user_id, sec_id, max_time, count, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = res_json.get("min_time")
+            yield Page(res_json["followings"], max_time, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            max_time = next_cursor
 
     @staticmethod
-    def get_some_user_following_list(auth, user_id: str, sec_id: str, num: int, **kwargs) -> list:
+    def get_some_user_following_list(auth, user_id: str, sec_id: str, num: int, seen=None, **kwargs) -> list:
         """
         获取用户的前num个关注列表
         :param auth: DouyinAuth object.
         :param user_id: 用户ID.
         :param sec_id: 用户sec_id.
         :param num: 要获取的数量
+        :param seen: SeenFilter, 跳过已记录的用户, 跳过的不计入数量, 处理完后用 seen.mark(users, user_key) 记录.
         :return: 关注列表.
         """
-        max_time = "0"
-        count = "20"
-        following_list = []
-        while True:
-            res_json = DouyinAPI.get_user_following_list(auth, user_id, sec_id, max_time, count)
-            followings = res_json["followings"]
-            following_list.extend(followings)
-            if res_json["has_more"] != 1 or len(following_list) >= num:
-                break
-            max_time = res_json["min_time"]
-        if len(following_list) > num:
-            following_list = following_list[:num]
-        return following_list
+        return take(DouyinAPI.iter_user_following_pages(auth, user_id, sec_id, **kwargs), num, seen, user_key)
 
     @staticmethod
+    @endpoint
     def get_notice_list(auth, min_time='0', max_time='0', count='10', notice_group='700', **kwargs):
         """
         获得通知
@@ -1322,50 +942,28 @@ class DouyinAPI:
         :param notice_group: 消息类型 700 全部消息 401 粉丝 601 @我的 2 评论 3 点赞 520 弹幕
         :return: JSON.
         """
-        api = "/aweme/v1/web/notice/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = "https://www.douyin.com/?recommend=1"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("is_new_notice", '1')
-        params.add_param("is_mark_read", '1')
-        params.add_param("notice_group", notice_group)
-        params.add_param("count", count)
-        params.add_param("min_time", min_time)
-        params.add_param("max_time", max_time)
-        params.add_param("update_version_code", '170400')
-        params.add_param("pc_client_type", '1')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '50')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-        res = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                           cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.NOTICE_LIST.build(auth, "https://www.douyin.com/?recommend=1", notice_group=notice_group,
+                                           count=count, min_time=min_time, max_time=max_time)
+
+    @staticmethod
+    def iter_notice_pages(auth, notice_group='700', cursor=("0", "0"), count: str = "10", **kwargs):
+        """
+        逐页获取通知.
+        :param auth: DouyinAuth object.
+        :param notice_group: 消息类型 | 700 全部消息 401 粉丝 601 @我的 2 评论 3 点赞 520 弹幕
+        :param cursor: 起始游标 (min_time, max_time).
+        :param count: 每页数量.
+        :return: Page 生成器.
+        """
+        while True:
+            min_time, max_time = cursor
+            res_json = DouyinAPI.get_notice_list(auth, min_time, max_time, count, notice_group, proxies=kwargs.get('proxies'))
+            has_more = res_json["has_more"] == 1
+            next_cursor = (res_json.get("min_time"), res_json.get("max_time"))
+            yield Page(res_json["notice_list_v2"], cursor, next_cursor, has_more, res_json)
+            if not has_more:
+                break
+            cursor = next_cursor
 
     @staticmethod
     def get_some_notice_list(auth, num: int = 20, notice_group='700', **kwargs) -> list:
@@ -1376,23 +974,10 @@ class DouyinAPI:
         :param notice_group: 消息类型 | 700 全部消息 401 粉丝 601 @我的 2 评论 3 点赞 520 弹幕
         :return:
         """
-        min_time = "0"
-        max_time = "0"
-        count = "10"
-        notice_list = []
-        while True:
-            res_json = DouyinAPI.get_notice_list(auth, min_time, max_time, count, notice_group)
-            notices = res_json["notice_list_v2"]
-            notice_list.extend(notices)
-            if res_json["has_more"] != 1 or len(notice_list) >= num:
-                break
-            min_time = res_json["min_time"]
-            max_time = res_json["max_time"]
-        if len(notice_list) > num:
-            notice_list = notice_list[:num]
-        return notice_list
+        return take(DouyinAPI.iter_notice_pages(auth, notice_group, **kwargs), num)
 
     @staticmethod
+    @endpoint(coalesce=False)
     def get_feed(auth, count='20', refresh_index='2', **kwargs):
         """
         获取首页推荐视频
@@ -1401,55 +986,7 @@ class DouyinAPI:
         :param refresh_index: 刷新索引.
         :return: JSON.
         """
-        api = "/aweme/v1/web/module/feed/"
-        headers = HeaderBuilder().build(HeaderType.GET)
-        refer = "https://www.douyin.com/"
-        headers.set_referer(refer)
-        params = Params()
-        params.add_param("device_platform", 'webapp')
-        params.add_param("aid", '6383')
-        params.add_param("channel", 'channel_pc_web')
-        params.add_param("module_id", '3003101')
-        params.add_param("count", count)
-        params.add_param("filterGids", '')
-        params.add_param("presented_ids", '')
-        params.add_param("refresh_index", refresh_index)
-        params.add_param("refer_id", '')
-        params.add_param("refer_type", '10')
-        params.add_param("awemePcRecRawData", '{"is_client":false}')
-        params.add_param("Seo-Flag", '0')
-        params.add_param("install_time", '1715480185')
-        params.add_param("pc_client_type", '1')
-        params.add_param("update_version_code", '170400')
-        params.add_param("version_code", '170400')
-        params.add_param("version_name", '17.4.0')
-        params.add_param("cookie_enabled", 'true')
-        params.add_param("screen_width", '1707')
-        params.add_param("screen_height", '960')
-        params.add_param("browser_language", 'zh-CN')
-        params.add_param("browser_platform", 'Win32')
-        params.add_param("browser_name", 'Edge')
-        params.add_param("browser_version", '125.0.0.0')
-        params.add_param("browser_online", 'true')
-        params.add_param("engine_name", 'Blink')
-        params.add_param("engine_version", '125.0.0.0')
-        params.add_param("os_name", 'Windows')
-        params.add_param("os_version", '10')
-        params.add_param("cpu_core_num", '32')
-        params.add_param("device_memory", '8')
-        params.add_param("platform", 'PC')
-        params.add_param("downlink", '10')
-        params.add_param("effective_type", '4g')
-        params.add_param("round_trip_time", '100')
-        params.with_web_id(auth, refer)
-        params.add_param("msToken", auth.msToken)
-        params.with_a_bogus()
-        params.add_param("verifyFp", auth.cookie['s_v_web_id'])
-        params.add_param("fp", auth.cookie['s_v_web_id'])
-
-        res = requests.get(f'{DouyinAPI.douyin_url}{api}', headers=headers.get(), params=params.get(),
-                           cookies=auth.cookie, verify=False)
-        return res.json()
+        return endpoints.FEED.build(auth, "https://www.douyin.com/", count=count, refresh_index=refresh_index)
 
 
 
@@ -0,0 +1,323 @@
+"""
+接口定义
+每个接口的路径, 方法, 请求头类型, 参数顺序和固定值以数据描述, 模块加载时生成只读的参数模板,
+构造请求时复制模板并填入动态参数, 不再逐个 add_param.
+参数顺序与网页端抓包一致; 各接口 webid / verifyFp / fp / msToken / a_bogus 的先后不同, 由 tail 描述,
+a_bogus 只对它之前的参数签名.
+"""
+from types import MappingProxyType
+
+from builder.header import HeaderBuilder, HeaderType
+from builder.params import PC_WEB, PC_WEB_LIVE, Params
+from utils.transport import ApiRequest
+
+DOUYIN_URL = 'https://www.douyin.com'
+LIVE_URL = 'https://live.douyin.com'
+
+# 动态参数占位, 构造请求时由调用方传入
+ARG = None
+
+PREFIX = ('device_platform', 'aid', 'channel')
+FINGERPRINT = ('update_version_code', 'pc_client_type', 'version_code', 'version_name', 'cookie_enabled',
+               'screen_width', 'screen_height', 'browser_language', 'browser_platform', 'browser_name',
+               'browser_version', 'browser_online', 'engine_name', 'engine_version', 'os_name', 'os_version',
+               'cpu_core_num', 'device_memory', 'platform', 'downlink', 'effective_type', 'round_trip_time')
+# 部分接口 pc_client_type 在 update_version_code 之前
+FINGERPRINT_PC_FIRST = ('pc_client_type', 'update_version_code') + FINGERPRINT[2:]
+
+# tail 中的 verifyFp 同时添加 verifyFp 和 fp, new_msToken 表示每次新生成 msToken
+SIGN_LAST = ('webid', 'verifyFp', 'msToken', 'a_bogus')
+FP_LAST = ('webid', 'msToken', 'a_bogus', 'verifyFp')
+FP_BEFORE_SIGN = ('webid', 'msToken', 'verifyFp', 'a_bogus')
+NO_FP = ('webid', 'msToken', 'a_bogus')
+
+
+class EndpointSpec:
+    def __init__(self, path, params, method='GET', host=DOUYIN_URL, header_type=HeaderType.GET,
+                 header_extras=('referer',), tail=SIGN_LAST, profile=PC_WEB, overrides=None, expect=None):
+        """
+        :param path: 接口路径.
+        :param params: 参数顺序, 元素为参数名 (取 profile 中的值) 或 (参数名, 固定值或 ARG).
+        :param header_extras: 在基础请求头后依次添加 referer / origin / bd / csrf.
+        :param tail: 签名相关参数的顺序.
+        :param profile: 设备和浏览器参数.
+        :param overrides: 覆盖 profile 中的个别值.
+        :param expect: 正常响应必须包含的字段.
+        """
+        values = dict(profile, **(overrides or {}))
+        template = {}
+        for item in params:
+            key, value = item if isinstance(item, tuple) else (item, values[item])
+            template[key] = value
+        self.path = path
+        self.method = method
+        self.host = host
+        self.url = f'{host}{path}'
+        self.header_type = header_type
+        self.header_extras = tuple(header_extras)
+        self.tail = tuple(tail)
+        self.expect = expect
+        self.params = MappingProxyType(template)
+        self.arg_names = frozenset(key for key, value in template.items() if value is ARG)
+
+    def _prepare(self, auth, referer, args):
+        """复制模板, 填入参数和 a_bogus 之前的签名参数, 返回请求头, 参数和 a_bogus 之后的部分"""
+        if args.keys() != self.arg_names:
+            raise TypeError(f'{self.path} 参数不匹配: 需要 {sorted(self.arg_names)}, 传入 {sorted(args)}')
+        headers = HeaderBuilder.build(self.header_type)
+        for extra in self.header_extras:
+            if extra == 'referer':
+                headers.set_referer(referer)
+            elif extra == 'origin':
+                headers.set_header('origin', self.host)
+            elif extra == 'bd':
+                headers.with_bd(self.path, auth)
+            elif extra == 'csrf':
+                headers.with_csrf(auth.cookie_str)
+        # 模板中已有全部参数名, update 不改变参数顺序
+        params = Params(self.params).update_params(args)
+        sign_at = self.tail.index('a_bogus') if 'a_bogus' in self.tail else len(self.tail)
+        self._add_tail(auth, referer, params, self.tail[:sign_at])
+        return headers, params, self.tail[sign_at + 1:]
+
+    @staticmethod
+    def _add_tail(auth, referer, params, tail):
+        for item in tail:
+            if item == 'webid':
+                params.with_web_id(auth, referer)
+            elif item == 'verifyFp':
+                params.add_param('verifyFp', auth.cookie['s_v_web_id'])
+                params.add_param('fp', auth.cookie['s_v_web_id'])
+            elif item == 'msToken':
+                params.add_param('msToken', auth.msToken)
+            elif item == 'new_msToken':
+                params.with_ms_token()
+
+    def _request(self, auth, headers, params, data, parse):
+        kwargs = {'parse': parse} if parse is not None else {}
+        return ApiRequest(self.method, self.url, params=params.get(), headers=headers.get(), cookies=auth.cookie,
+                          data=data, expect=self.expect, **kwargs)
+
+    def build(self, auth, referer, data=None, parse=None, **args) -> ApiRequest:
+        """
+        复制模板构造请求.
+        :param auth: DouyinAuth object.
+        :param referer: 请求头 referer, 同时用于获取 webid.
+        :param data: 表单数据, 参与 a_bogus 签名.
+        :param parse: 响应解析函数, 默认解析 JSON.
+        :param args: 模板中 ARG 位置的参数值.
+        """
+        headers, params, rest = self._prepare(auth, referer, args)
+        if 'a_bogus' in self.tail:
+            params.with_a_bogus(data)
+        self._add_tail(auth, referer, params, rest)
+        return self._request(auth, headers, params, data, parse)
+
+    def build_many(self, auth, calls, parse=None) -> list:
+        """
+        构造一组请求, a_bogus 一次调用签名引擎全部签完.
+        :param auth: DouyinAuth object.
+        :param calls: (referer, data, args) 组成的列表, 含义同 build.
+        :return: ApiRequest 列表, 与 calls 一一对应.
+        """
+        prepared = [self._prepare(auth, referer, args) + (referer, data) for referer, data, args in calls]
+        if 'a_bogus' in self.tail:
+            Params.with_a_bogus_batch([(params, data) for _, params, _, _, data in prepared])
+        requests = []
+        for headers, params, rest, referer, data in prepared:
+            self._add_tail(auth, referer, params, rest)
+            requests.append(self._request(auth, headers, params, data, parse))
+        return requests
+
+
+USER_POST = EndpointSpec(
+    '/aweme/v1/web/aweme/post/',
+    PREFIX + (('sec_user_id', ARG), ('max_cursor', ARG), ('locate_query', 'false'),
+              ('show_live_replay_strategy', '1'), ('need_time_list', ARG), ('time_list_query', '0'),
+              ('whale_cut_token', ''), ('cut_version', '1'), ('count', '18'), ('publish_video_strategy_type', '2'))
+    + FINGERPRINT,
+    overrides={'version_code': '290100', 'version_name': '29.1.0'},
+    expect='aweme_list',
+)
+
+WORK_DETAIL = EndpointSpec(
+    '/aweme/v1/web/aweme/detail/',
+    PREFIX + (('aweme_id', ARG),) + FINGERPRINT,
+    tail=FP_LAST,
+    overrides={'version_code': '190500', 'version_name': '19.5.0', 'downlink': '4.75', 'round_trip_time': '150'},
+    expect='aweme_detail',
+)
+
+COMMENT_LIST = EndpointSpec(
+    '/aweme/v1/web/comment/list/',
+    PREFIX + (('aweme_id', ARG), ('cursor', ARG), ('count', '5'), ('item_type', '0'), ('whale_cut_token', ''),
+              ('cut_version', '1'), ('rcFT', '')) + FINGERPRINT,
+    overrides={'round_trip_time': '0'},
+    expect='comments',
+)
+
+COMMENT_REPLY = EndpointSpec(
+    '/aweme/v1/web/comment/list/reply/',
+    PREFIX + (('item_id', ARG), ('comment_id', ARG), ('cut_version', '1'), ('cursor', ARG), ('count', ARG),
+              ('item_type', '0')) + FINGERPRINT,
+    overrides={'round_trip_time': '0'},
+    expect='comments',
+)
+
+USER_PROFILE = EndpointSpec(
+    '/aweme/v1/web/user/profile/other/',
+    PREFIX + (('publish_video_strategy_type', '2'), ('source', 'channel_pc_web'), ('sec_user_id', ARG),
+              ('personal_center_strategy', '1')) + FINGERPRINT,
+    tail=FP_BEFORE_SIGN,
+    expect='user',
+)
+
+SEARCH_GENERAL = EndpointSpec(
+    '/aweme/v1/web/general/search/single/',
+    PREFIX + (('search_channel', 'aweme_general'), ('enable_history', '1'), ('filter_selected', ARG),
+              ('keyword', ARG), ('search_source', 'tab_search'), ('query_correct_type', '1'),
+              ('is_filter_search', '1'), ('from_group_id', ''), ('offset', ARG), ('count', '25'),
+              ('need_filter_settings', ARG), ('list_type', 'single')) + FINGERPRINT,
+    tail=NO_FP,
+    overrides={'version_code': '190600', 'version_name': '19.6.0', 'round_trip_time': '50'},
+    expect='data',
+)
+
+SEARCH_USER = EndpointSpec(
+    '/aweme/v1/web/discover/search',
+    PREFIX + (('search_channel', 'aweme_user_web'), ('search_filter_value', ARG), ('keyword', ARG),
+              ('search_source', 'switch_tab'), ('query_correct_type', '1'), ('is_filter_search', '1'),
+              ('offset', ARG), ('count', ARG), ('need_filter_settings', ARG), ('list_type', 'single'))
+    + FINGERPRINT,
+    tail=NO_FP,
+    overrides={'round_trip_time': '150'},
+    expect='user_list',
+)
+
+SEARCH_LIVE = EndpointSpec(
+    '/aweme/v1/web/live/search/',
+    PREFIX + (('search_channel', 'aweme_live'), ('keyword', ARG), ('search_source', 'normal_search'),
+              ('query_correct_type', '1'), ('is_filter_search', '0'), ('from_group_id', ''), ('offset', ARG),
+              ('count', ARG), ('need_filter_settings', ARG), ('list_type', 'single')) + FINGERPRINT,
+    tail=NO_FP,
+    overrides={'round_trip_time': '50'},
+    expect='data',
+)
+
+USER_FAVORITE = EndpointSpec(
+    '/aweme/v1/web/aweme/favorite/',
+    PREFIX + (('sec_user_id', 'MS4wLjABAAAA99bTJ_GOw3odYmsXOe7i7xuEv0iQf2X_Kg_VUyVP0U8'), ('max_cursor', ARG),
+              ('min_cursor', '0'), ('whale_cut_token', ''), ('cut_version', '1'), ('count', ARG),
+              ('publish_video_strategy_type', '2')) + FINGERPRINT,
+)
+
+QUERY_USER = EndpointSpec(
+    '/aweme/v1/web/query/user/',
+    PREFIX + FINGERPRINT_PC_FIRST,
+    tail=('webid', 'new_msToken', 'verifyFp', 'a_bogus'),
+)
+
+LIVE_PROMOTIONS = EndpointSpec(
+    '/live/promotions/page/',
+    PREFIX + (('room_id', ARG), ('author_id', ARG), ('offset', ARG), ('limit', '20'), 'pc_client_type',
+              'version_code', 'version_name') + FINGERPRINT[4:],
+    method='POST',
+    host=LIVE_URL,
+    header_extras=('origin', 'referer'),
+    tail=NO_FP,
+    profile=PC_WEB_LIVE,
+    overrides={'version_code': '210800', 'version_name': '21.8.0', 'round_trip_time': '50'},
+)
+
+LIVE_PRODUCT_DETAIL = EndpointSpec(
+    '/ecom/product/detail/saas/pc/',
+    (('is_h5', '1'), ('origin_type', '638301')) + PREFIX + FINGERPRINT_PC_FIRST,
+    method='POST',
+    host=LIVE_URL,
+    header_type=HeaderType.FORM,
+    header_extras=('origin', 'referer', 'csrf'),
+    tail=NO_FP,
+    overrides={'version_code': '', 'version_name': '', 'downlink': '1.7', 'round_trip_time': '200'},
+)
+
+COLLECT = EndpointSpec(
+    '/aweme/v1/web/aweme/collect/',
+    PREFIX + FINGERPRINT_PC_FIRST,
+    method='POST',
+    header_type=HeaderType.FORM,
+    header_extras=('referer', 'bd', 'csrf', 'origin'),
+    overrides={'round_trip_time': '50'},
+)
+
+# 收藏夹接口的参数按字母序排列
+COLLECT_MOVE = EndpointSpec(
+    '/aweme/v1/web/collects/video/move/',
+    ('aid', 'browser_language', 'browser_name', 'browser_online', 'browser_platform', 'browser_version', 'channel',
+     ('collects_name', ARG), 'cookie_enabled', 'cpu_core_num', 'device_memory', 'device_platform', 'downlink',
+     'effective_type', 'engine_name', 'engine_version', ('item_ids', ARG), ('item_type', '2'),
+     ('move_collects_list', ARG), 'os_name', 'os_version', 'pc_client_type', 'platform', 'round_trip_time',
+     'screen_height', 'screen_width', ('to_collects_id', ARG), ('update_collects_sort', 'true'),
+     'update_version_code', 'version_code', 'version_name'),
+    method='POST',
+    header_type=HeaderType.FORM,
+    header_extras=('referer', 'bd', 'csrf', 'origin'),
+    overrides={'round_trip_time': '50'},
+)
+
+COLLECT_REMOVE = EndpointSpec(
+    '/aweme/v1/web/collects/video/move/',
+    ('aid', 'browser_language', 'browser_name', 'browser_online', 'browser_platform', 'browser_version', 'channel',
+     ('collects_name', ARG), 'cookie_enabled', 'cpu_core_num', 'device_memory', 'device_platform', 'downlink',
+     'effective_type', 'engine_name', 'engine_version', ('from_collects_id', ARG), ('item_ids', ARG),
+     ('item_type', '2'), 'os_name', 'os_version', 'pc_client_type', 'platform', 'round_trip_time', 'screen_height',
+     'screen_width', 'update_version_code', 'version_code', 'version_name'),
+    method='POST',
+    header_type=HeaderType.FORM,
+    header_extras=('referer', 'bd', 'csrf', 'origin'),
+    overrides={'round_trip_time': '50'},
+)
+
+COLLECT_LIST = EndpointSpec(
+    '/aweme/v1/web/collects/list/',
+    PREFIX + (('cursor', '0'), ('count', '20')) + FINGERPRINT,
+    tail=FP_LAST,
+    overrides={'downlink': '5.95', 'round_trip_time': '200'},
+)
+
+FOLLOWER_LIST = EndpointSpec(
+    '/aweme/v1/web/user/follower/list/',
+    PREFIX + (('user_id', ARG), ('sec_user_id', ARG), ('offset', '0'), ('min_time', '0'), ('max_time', ARG),
+              ('count', ARG), ('source_type', ARG), ('gps_access', '0'), ('address_book_access', '0'))
+    + FINGERPRINT,
+    tail=FP_LAST,
+    overrides={'round_trip_time': '150'},
+    expect='followers',
+)
+
+FOLLOWING_LIST = EndpointSpec(
+    '/aweme/v1/web/user/following/list/',
+    PREFIX + (('user_id', ARG), ('sec_user_id', ARG), ('offset', '0'), ('min_time', '0'), ('max_time', ARG),
+              ('count', ARG), ('source_type', ARG), ('gps_access', '0'), ('address_book_access', '0'),
+              ('is_top', '1')) + FINGERPRINT,
+    tail=FP_LAST,
+    overrides={'round_trip_time': '150'},
+    expect='followings',
+)
+
+NOTICE_LIST = EndpointSpec(
+    '/aweme/v1/web/notice/',
+    PREFIX + (('is_new_notice', '1'), ('is_mark_read', '1'), ('notice_group', ARG), ('count', ARG),
+              ('min_time', ARG), ('max_time', ARG)) + FINGERPRINT,
+    tail=FP_LAST,
+    overrides={'round_trip_time': '50'},
+    expect='notice_list_v2',
+)
+
+FEED = EndpointSpec(
+    '/aweme/v1/web/module/feed/',
+    PREFIX + (('module_id', '3003101'), ('count', ARG), ('filterGids', ''), ('presented_ids', ''),
+              ('refresh_index', ARG), ('refer_id', ''), ('refer_type', '10'),
+              ('awemePcRecRawData', '{"is_client":false}'), ('Seo-Flag', '0'), ('install_time', '1715480185'))
+    + FINGERPRINT_PC_FIRST,
+    tail=FP_LAST,
+)
@@ -0,0 +1,174 @@
+"""
+翻页结果
+DouyinAPI / AsyncDouyinAPI 的 iter_*_pages 逐页返回 Page, 调用方可以边取边处理, 随时停止,
+也可以用 cursor 从中断的位置继续.
+
+    DY_PREFETCH_DEPTH   prefetch 默认最多提前获取的页数, 默认 2
+"""
+import asyncio
+import os
+import queue
+import threading
+
+PREFETCH_DEPTH = int(os.getenv('DY_PREFETCH_DEPTH', '2'))
+
+
+class Page:
+    """
+    一页结果.
+    cursor 为请求这一页使用的游标, next_cursor 为下一页的游标, 传给 iter_*_pages 即可从下一页继续.
+    """
+    __slots__ = ('items', 'cursor', 'next_cursor', 'has_more', 'raw')
+
+    def __init__(self, items, cursor, next_cursor, has_more, raw):
+        self.items = items
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+        self.raw = raw
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return f'Page(items={len(self.items)}, cursor={self.cursor!r}, next_cursor={self.next_cursor!r}, ' \
+               f'has_more={self.has_more})'
+
+
+def iter_items(pages):
+    """把逐页结果展开为逐条结果"""
+    for page in pages:
+        yield from page.items
+
+
+async def aiter_items(pages):
+    async for page in pages:
+        for item in page.items:
+            yield item
+
+
+def take(pages, num=None, seen=None, key=None) -> list:
+    """
+    取前 num 条结果, 够数后不再请求下一页.
+    :param pages: iter_*_pages 返回的生成器.
+    :param num: 数量, 为 None 时取全部.
+    :param seen: SeenFilter, 跳过已经见过的结果, 跳过的不计入数量. 返回的结果不会记录,
+        调用方处理完后用 seen.mark(items, key) 记录, 处理失败的结果下次仍会返回.
+    :param key: 由结果取出去重 ID 的函数.
+    """
+    items = []
+    taken = set()
+    for page in pages:
+        if seen is not None:
+            items.extend(seen.filter(page.items, key, None if num is None else num - len(items), taken))
+        else:
+            items.extend(page.items)
+        if num is not None and len(items) >= num:
+            pages.close()
+            return items[:num]
+    return items
+
+
+async def atake(pages, num=None, seen=None, key=None) -> list:
+    items = []
+    taken = set()
+    async for page in pages:
+        if seen is not None:
+            items.extend(seen.filter(page.items, key, None if num is None else num - len(items), taken))
+        else:
+            items.extend(page.items)
+        if num is not None and len(items) >= num:
+            await pages.aclose()
+            return items[:num]
+    return items
+
+
+END = object()
+
+
+class Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def prefetch(pages, depth=None, num=None):
+    """
+    在后台线程中提前获取后面的页, 调用方处理第 N 页时第 N+1 页已经在签名和请求.
+    :param pages: iter_*_pages 返回的生成器.
+    :param depth: 最多提前获取的页数, 默认 DY_PREFETCH_DEPTH.
+    :param num: 累计取到 num 条后不再请求下一页, 为 None 时取全部.
+    :return: Page 生成器, 提前关闭时后台线程在当前请求完成后停止.
+    """
+    buffer = queue.Queue(maxsize=depth or PREFETCH_DEPTH)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        count = 0
+        try:
+            for page in pages:
+                count += len(page.items)
+                if not put(page) or num is not None and count >= num:
+                    break
+        except Exception as e:
+            put(Failure(e))
+            return
+        finally:
+            # 生成器只能在运行它的线程中关闭
+            pages.close()
+        put(END)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is END:
+                return
+            if isinstance(item, Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+async def aprefetch(pages, depth=None, num=None):
+    """prefetch 的异步版本, 后面的页在单独的 Task 中获取"""
+    buffer = asyncio.Queue(maxsize=depth or PREFETCH_DEPTH)
+
+    async def produce():
+        count = 0
+        try:
+            async for page in pages:
+                await buffer.put(page)
+                count += len(page.items)
+                if num is not None and count >= num:
+                    break
+        except Exception as e:
+            await buffer.put(Failure(e))
+            return
+        finally:
+            await pages.aclose()
+        await buffer.put(END)
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await buffer.get()
+            if item is END:
+                return
+            if isinstance(item, Failure):
+                raise item.error
+            yield item
+    finally:
+        task.cancel()
@@ -0,0 +1,114 @@
+"""
+任务队列后端接口
+worker 只依赖 Broker 的接口, 单机使用 SQLite (JobQueue), 多台机器共享同一个抓取队列时使用 Redis (RedisBroker).
+除任务队列外还提供去重集合, 多个节点共享已抓取过的对象.
+
+    DY_JOB_BROKER   队列地址, redis:// 开头时使用 RedisBroker, 否则为 SQLite 文件路径, 默认 DY_JOB_DB
+"""
+import os
+
+JOB_BROKER = os.getenv('DY_JOB_BROKER', '')
+
+# 任务类型, target 分别为作品链接, 用户主页链接, 搜索关键词, 作品链接
+JOB_KINDS = ('work', 'user', 'search', 'comment')
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    def __init__(self, id, kind, target, params, priority, attempts, max_attempts, owner=None, lease_until=None):
+        self.id = id
+        self.kind = kind
+        self.target = target
+        self.params = params
+        self.priority = priority
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.owner = owner
+        self.lease_until = lease_until
+
+    def __repr__(self):
+        return f'Job(id={self.id}, kind={self.kind!r}, target={self.target!r}, attempts={self.attempts})'
+
+
+class Broker:
+    """
+    任务队列和去重集合.
+    任务按优先级出队并加租约, 持有者定期续约, 租约过期的任务 (持有的进程或节点已经退出) 由其他 worker 领走.
+    """
+    lease_seconds = None
+
+    def put(self, kind, target, params=None, priority=0, max_attempts=None):
+        """
+        添加任务, 同类型同目标的任务已在队列中时不重复添加, 已完成或已失败的任务重新排队.
+        :param kind: 任务类型, 见 JOB_KINDS.
+        :param target: 抓取对象.
+        :param params: 任务参数, 例如 save_choice.
+        :param priority: 优先级, 越大越先执行.
+        :param max_attempts: 最大尝试次数.
+        :return: 任务 id.
+        """
+        raise NotImplementedError
+
+    def lease(self, owner, lease=None):
+        """
+        领取优先级最高的可执行任务, 包括租约已过期的任务.
+        :param owner: worker 名称, 多个节点时需要全局唯一.
+        :param lease: 租约时长(秒).
+        :return: Job, 没有可执行的任务时返回 None.
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, job, lease=None):
+        """
+        续约.
+        :return: 租约是否仍属于该 worker, 为 False 时任务已被其他 worker 领取.
+        """
+        raise NotImplementedError
+
+    def complete(self, job):
+        raise NotImplementedError
+
+    def fail(self, job, error):
+        """任务出错, 还有尝试次数时延迟后重新排队, 否则标记为失败"""
+        raise NotImplementedError
+
+    def stats(self):
+        """各状态的任务数"""
+        raise NotImplementedError
+
+    def add_seen(self, namespace, key):
+        """
+        加入去重集合.
+        :param namespace: 集合名, 例如 aweme, user.
+        :param key: 对象 ID.
+        :return: 之前是否不在集合中.
+        """
+        raise NotImplementedError
+
+    def is_seen(self, namespace, key):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def check_kind(kind):
+    if kind not in JOB_KINDS:
+        raise ValueError(f'未知的任务类型: {kind}')
+
+
+def create_broker(url=None) -> Broker:
+    """
+    按地址创建队列后端.
+    :param url: redis://, rediss:// 或 unix:// 开头时连接 Redis, 否则为 SQLite 文件路径, 默认 DY_JOB_BROKER.
+    """
+    url = url or JOB_BROKER
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        from dy_jobs.redis_broker import RedisBroker
+        return RedisBroker.from_url(url)
+    from dy_jobs.job_queue import JobQueue
+    return JobQueue(url or None)
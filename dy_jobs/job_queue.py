@@ -0,0 +1,146 @@
+"""
+持久化抓取任务队列
+任务 (作品, 用户主页, 搜索关键词, 评论) 保存在本地 SQLite, 按优先级出队, 出队时加租约,
+租约到期还没完成的任务 (例如 worker 进程崩溃) 会被其他 worker 重新领取, 失败的任务延迟重试, 超过次数后标记为失败.
+多个 worker 进程通过 SQLite 的写锁领取任务, 同一个任务同一时间只会被一个 worker 领取.
+
+    DY_JOB_DB            队列文件路径, 默认 datas/jobs.db
+    DY_JOB_LEASE         租约时长(秒), 默认 300, worker 运行任务期间会定期续约
+    DY_JOB_MAX_ATTEMPTS  最大尝试次数, 默认 3
+    DY_JOB_RETRY_DELAY   重试的基础延迟(秒), 默认 30, 按尝试次数指数增长
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dy_jobs.broker import DONE, FAILED, LEASED, QUEUED, Broker, Job, check_kind
+
+JOB_DB = os.getenv('DY_JOB_DB', os.path.abspath(os.path.join(os.path.dirname(__file__), '../datas/jobs.db')))
+JOB_LEASE = float(os.getenv('DY_JOB_LEASE', '300'))
+JOB_MAX_ATTEMPTS = int(os.getenv('DY_JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY = float(os.getenv('DY_JOB_RETRY_DELAY', '30'))
+
+
+class JobQueue(Broker):
+    """SQLite 后端, 同一台机器上的多个 worker 进程共享"""
+
+    def __init__(self, path=None, lease=None, max_attempts=None, retry_delay=None):
+        self.path = path or JOB_DB
+        self.lease_seconds = JOB_LEASE if lease is None else lease
+        self.max_attempts = max_attempts or JOB_MAX_ATTEMPTS
+        self.retry_delay = JOB_RETRY_DELAY if retry_delay is None else retry_delay
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # 手动管理事务, 领取任务时用 BEGIN IMMEDIATE 先拿写锁, 避免多个进程领到同一个任务
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS jobs ('
+                              'id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, target TEXT NOT NULL, '
+                              'params TEXT NOT NULL, priority INTEGER NOT NULL, state TEXT NOT NULL, '
+                              'attempts INTEGER NOT NULL, max_attempts INTEGER NOT NULL, owner TEXT, '
+                              'lease_until REAL, available_at REAL NOT NULL, error TEXT, '
+                              'created_at REAL NOT NULL, updated_at REAL NOT NULL, UNIQUE (kind, target))')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, id)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS seen (namespace TEXT NOT NULL, key TEXT NOT NULL, '
+                              'PRIMARY KEY (namespace, key))')
+
+    def _transaction(self, fn):
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn()
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+
+    def put(self, kind, target, params=None, priority=0, max_attempts=None):
+        check_kind(kind)
+        now = time.time()
+        params = json.dumps(params or {}, ensure_ascii=False)
+        max_attempts = max_attempts or self.max_attempts
+
+        def put():
+            self.conn.execute('INSERT INTO jobs (kind, target, params, priority, state, attempts, max_attempts, '
+                              'available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?) '
+                              'ON CONFLICT (kind, target) DO UPDATE SET params = excluded.params, '
+                              'priority = excluded.priority, state = excluded.state, attempts = 0, '
+                              'max_attempts = excluded.max_attempts, available_at = excluded.available_at, '
+                              'error = NULL, updated_at = excluded.updated_at WHERE state IN (?, ?)',
+                              (kind, target, params, priority, QUEUED, max_attempts, now, now, now, DONE, FAILED))
+            return self.conn.execute('SELECT id FROM jobs WHERE kind = ? AND target = ?', (kind, target)).fetchone()[0]
+
+        return self._transaction(put)
+
+    def lease(self, owner, lease=None):
+        lease = lease or self.lease_seconds
+
+        def lease_one():
+            now = time.time()
+            # 租约过期且已用完尝试次数的任务不再领取
+            self.conn.execute('UPDATE jobs SET state = ?, error = ?, owner = NULL, updated_at = ? '
+                              'WHERE state = ? AND lease_until < ? AND attempts >= max_attempts',
+                              (FAILED, 'lease expired', now, LEASED, now))
+            row = self.conn.execute('SELECT id, kind, target, params, priority, attempts, max_attempts FROM jobs '
+                                    'WHERE (state = ? AND available_at <= ?) OR (state = ? AND lease_until < ?) '
+                                    'ORDER BY priority DESC, id LIMIT 1', (QUEUED, now, LEASED, now)).fetchone()
+            if row is None:
+                return None
+            id, kind, target, params, priority, attempts, max_attempts = row
+            self.conn.execute('UPDATE jobs SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1, '
+                              'updated_at = ? WHERE id = ?', (LEASED, owner, now + lease, now, id))
+            return Job(id, kind, target, json.loads(params), priority, attempts + 1, max_attempts, owner, now + lease)
+
+        return self._transaction(lease_one)
+
+    def heartbeat(self, job, lease=None):
+        lease_until = time.time() + (lease or self.lease_seconds)
+        with self._lock:
+            cursor = self.conn.execute('UPDATE jobs SET lease_until = ?, updated_at = ? '
+                                       'WHERE id = ? AND state = ? AND owner = ?',
+                                       (lease_until, time.time(), job.id, LEASED, job.owner))
+        if cursor.rowcount:
+            job.lease_until = lease_until
+        return cursor.rowcount > 0
+
+    def complete(self, job):
+        with self._lock:
+            self.conn.execute('UPDATE jobs SET state = ?, owner = NULL, lease_until = NULL, error = NULL, '
+                              'updated_at = ? WHERE id = ? AND owner = ?', (DONE, time.time(), job.id, job.owner))
+
+    def fail(self, job, error):
+        now = time.time()
+        if job.attempts < job.max_attempts:
+            state, available_at = QUEUED, now + self.retry_delay * 2 ** (job.attempts - 1)
+        else:
+            state, available_at = FAILED, now
+        with self._lock:
+            self.conn.execute('UPDATE jobs SET state = ?, owner = NULL, lease_until = NULL, available_at = ?, '
+                              'error = ?, updated_at = ? WHERE id = ? AND owner = ?',
+                              (state, available_at, str(error), now, job.id, job.owner))
+
+    def stats(self):
+        with self._lock:
+            rows = self.conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        stats = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        stats.update(dict(rows))
+        return stats
+
+    def add_seen(self, namespace, key):
+        with self._lock:
+            cursor = self.conn.execute('INSERT OR IGNORE INTO seen (namespace, key) VALUES (?, ?)',
+                                       (namespace, str(key)))
+        return cursor.rowcount > 0
+
+    def is_seen(self, namespace, key):
+        with self._lock:
+            row = self.conn.execute('SELECT 1 FROM seen WHERE namespace = ? AND key = ?',
+                                    (namespace, str(key))).fetchone()
+        return row is not None
+
+    def close(self):
+        self.conn.close()
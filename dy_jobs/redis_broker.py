@@ -0,0 +1,206 @@
+"""
+Redis 任务队列后端
+多台机器的 worker 共享同一个抓取队列和去重集合, 只用到基础命令, 可以连接 Redis 或兼容 Redis 协议的服务.
+需要安装 redis: pip install redis
+
+键 (前缀默认 dy:jobs, 由 DY_JOB_REDIS_PREFIX 配置):
+    {prefix}:ids            任务 id 计数器
+    {prefix}:index          hash, kind:target -> 任务 id, 保证同一个对象只有一个任务
+    {prefix}:job:{id}       hash, 任务内容和状态
+    {prefix}:ready          zset, 可领取的任务, 按优先级和 id 排序
+    {prefix}:delayed        zset, 等待重试的任务, 分数为可重试的时间
+    {prefix}:leases         zset, 已领取的任务, 分数为租约到期时间
+    {prefix}:done / failed  set, 已完成和已失败的任务
+    {prefix}:seen:{name}    set, 去重集合
+
+节点退出或卡住后不再续约, 租约到期的任务由任意一个空闲节点领走重新执行.
+添加任务 (分配 id, 写入索引和任务, 入队) 和领取 (放回到期的重试任务, 回收过期租约, 出队并写入租约)
+各在一个 Lua 脚本里完成, 节点在中途退出也不会留下不完整的任务.
+"""
+import json
+import os
+import time
+
+from loguru import logger
+
+from dy_jobs.broker import DONE, FAILED, LEASED, QUEUED, Broker, Job, check_kind
+from dy_jobs.job_queue import JOB_LEASE, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+
+JOB_REDIS_PREFIX = os.getenv('DY_JOB_REDIS_PREFIX', 'dy:jobs')
+
+# 优先级相同时按 id 先进先出
+PRIORITY_SCALE = 10 ** 12
+
+# KEYS: index, ids, ready, done, failed
+# ARGV: 任务键前缀, kind:target, kind, target, params, priority, max_attempts
+# 同一个对象已有任务时只在已完成或已失败时重新排队, 索引存在但任务内容缺失时重新写入
+PUT_SCRIPT = """
+local prefix, index_key, priority = ARGV[1], ARGV[2], tonumber(ARGV[6])
+local id = redis.call('HGET', KEYS[1], index_key)
+if id then
+    local state = redis.call('HGET', prefix .. id, 'state')
+    if state and state ~= '%s' and state ~= '%s' then
+        return tonumber(id)
+    end
+    if state then
+        redis.call('SREM', state == '%s' and KEYS[4] or KEYS[5], id)
+    end
+else
+    id = redis.call('INCR', KEYS[2])
+    redis.call('HSET', KEYS[1], index_key, id)
+end
+redis.call('HSET', prefix .. id, 'kind', ARGV[3], 'target', ARGV[4], 'params', ARGV[5], 'priority', priority,
+           'state', '%s', 'attempts', 0, 'max_attempts', ARGV[7], 'owner', '', 'error', '')
+redis.call('ZADD', KEYS[3], tonumber(id) - priority * %d, id)
+return tonumber(id)
+""" % (DONE, FAILED, DONE, QUEUED, PRIORITY_SCALE)
+
+# KEYS: ready, delayed, leases, failed
+# ARGV: 任务键前缀, 当前时间, 租约到期时间, owner
+# 返回 {任务字段, 被回收的任务 id 和原持有者}, 没有可领取的任务时任务字段为空
+LEASE_SCRIPT = """
+local prefix, now, lease_until, owner = ARGV[1], tonumber(ARGV[2]), ARGV[3], ARGV[4]
+local scale = %d
+local function enqueue(id)
+    local priority = tonumber(redis.call('HGET', prefix .. id, 'priority') or '0')
+    redis.call('ZADD', KEYS[1], tonumber(id) - priority * scale, id)
+end
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    enqueue(id)
+end
+local reclaimed = {}
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+    redis.call('ZREM', KEYS[3], id)
+    local job = prefix .. id
+    if redis.call('EXISTS', job) == 1 then
+        table.insert(reclaimed, id)
+        table.insert(reclaimed, redis.call('HGET', job, 'owner') or '')
+        if tonumber(redis.call('HGET', job, 'attempts')) >= tonumber(redis.call('HGET', job, 'max_attempts')) then
+            redis.call('HSET', job, 'state', '%s', 'owner', '', 'error', 'lease expired')
+            redis.call('SADD', KEYS[4], id)
+        else
+            redis.call('HSET', job, 'state', '%s', 'owner', '')
+            enqueue(id)
+        end
+    end
+end
+while true do
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then
+        return {{}, reclaimed}
+    end
+    local id = popped[1]
+    local job = prefix .. id
+    if redis.call('HGET', job, 'state') == '%s' then
+        redis.call('HINCRBY', job, 'attempts', 1)
+        redis.call('HSET', job, 'state', '%s', 'owner', owner)
+        redis.call('ZADD', KEYS[3], lease_until, id)
+        local fields = redis.call('HGETALL', job)
+        table.insert(fields, 'id')
+        table.insert(fields, id)
+        return {fields, reclaimed}
+    end
+end
+""" % (PRIORITY_SCALE, FAILED, QUEUED, QUEUED, LEASED)
+
+
+class RedisBroker(Broker):
+    def __init__(self, client, prefix=None, lease=None, max_attempts=None, retry_delay=None):
+        """
+        :param client: redis.Redis, 需要 decode_responses=True.
+        :param prefix: 键前缀, 多个队列共用一个 Redis 时区分.
+        """
+        self.client = client
+        self.prefix = prefix or JOB_REDIS_PREFIX
+        self.lease_seconds = JOB_LEASE if lease is None else lease
+        self.max_attempts = max_attempts or JOB_MAX_ATTEMPTS
+        self.retry_delay = JOB_RETRY_DELAY if retry_delay is None else retry_delay
+        self.put_script = client.register_script(PUT_SCRIPT)
+        self.lease_script = client.register_script(LEASE_SCRIPT)
+
+    @staticmethod
+    def from_url(url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError('RedisBroker 需要安装 redis: pip install redis')
+        return RedisBroker(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def key(self, *parts):
+        return ':'.join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def put(self, kind, target, params=None, priority=0, max_attempts=None):
+        check_kind(kind)
+        return int(self.put_script(
+            keys=[self.key('index'), self.key('ids'), self.key('ready'), self.key(DONE), self.key(FAILED)],
+            args=[self.key('job', ''), f'{kind}:{target}', kind, target,
+                  json.dumps(params or {}, ensure_ascii=False), priority, max_attempts or self.max_attempts]))
+
+    def lease(self, owner, lease=None):
+        now = time.time()
+        lease_until = now + (lease or self.lease_seconds)
+        fields, reclaimed = self.lease_script(
+            keys=[self.key('ready'), self.key('delayed'), self.key('leases'), self.key(FAILED)],
+            args=[self.key('job', ''), repr(now), repr(lease_until), owner])
+        for id, old_owner in zip(reclaimed[::2], reclaimed[1::2]):
+            logger.warning(f'回收租约过期的任务 {id}, 原持有者 {old_owner}')
+        if not fields:
+            return None
+        job = dict(zip(fields[::2], fields[1::2]))
+        return Job(int(job['id']), job['kind'], job['target'], json.loads(job['params']), int(job['priority']),
+                   int(job['attempts']), int(job['max_attempts']), owner, lease_until)
+
+    def _owned(self, job):
+        return self.client.hget(self.key('job', job.id), 'owner') == job.owner
+
+    def heartbeat(self, job, lease=None):
+        if not self._owned(job):
+            return False
+        lease_until = time.time() + (lease or self.lease_seconds)
+        # xx: 已被其他节点回收时不再写回租约
+        if not self.client.zadd(self.key('leases'), {job.id: lease_until}, xx=True, ch=True):
+            return False
+        job.lease_until = lease_until
+        return True
+
+    def complete(self, job):
+        if not self._owned(job):
+            return
+        pipe = self.client.pipeline()
+        pipe.zrem(self.key('leases'), job.id)
+        pipe.hset(self.key('job', job.id), mapping={'state': DONE, 'owner': '', 'error': ''})
+        pipe.sadd(self.key(DONE), job.id)
+        pipe.execute()
+
+    def fail(self, job, error):
+        if not self._owned(job):
+            return
+        pipe = self.client.pipeline()
+        pipe.zrem(self.key('leases'), job.id)
+        if job.attempts < job.max_attempts:
+            pipe.hset(self.key('job', job.id), mapping={'state': QUEUED, 'owner': '', 'error': str(error)})
+            pipe.zadd(self.key('delayed'), {job.id: time.time() + self.retry_delay * 2 ** (job.attempts - 1)})
+        else:
+            pipe.hset(self.key('job', job.id), mapping={'state': FAILED, 'owner': '', 'error': str(error)})
+            pipe.sadd(self.key(FAILED), job.id)
+        pipe.execute()
+
+    def stats(self):
+        pipe = self.client.pipeline()
+        pipe.zcard(self.key('ready'))
+        pipe.zcard(self.key('delayed'))
+        pipe.zcard(self.key('leases'))
+        pipe.scard(self.key(DONE))
+        pipe.scard(self.key(FAILED))
+        ready, delayed, leased, done, failed = pipe.execute()
+        return {QUEUED: ready + delayed, LEASED: leased, DONE: done, FAILED: failed}
+
+    def add_seen(self, namespace, key):
+        return self.client.sadd(self.key('seen', namespace), key) == 1
+
+    def is_seen(self, namespace, key):
+        return bool(self.client.sismember(self.key('seen', namespace), key))
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,187 @@
+"""
+抓取任务 worker
+每个 worker 进程有自己的 DouyinAuth 和连接池, 循环从任务队列领取任务交给 Data_Spider 执行,
+运行期间定期续约, 成功后标记完成, 出错时交给队列决定重试或失败.
+队列后端由 DY_JOB_BROKER 或 --broker 指定, 多台机器连接同一个 Redis 即可共同消费一个队列.
+账号从 COOKIE / DY_COOKIES_FILE 读取, 按 worker 序号轮流分配, 都没有配置时使用 DY_COOKIES.
+DY_SKIP_SEEN=1 时跳过已抓取过的对象, 去重集合保存在队列后端, 连接同一个队列的节点共享.
+用户主页和评论任务默认保存翻页断点 (任务参数 checkpoint, 默认 true), 被限流时任务失败, 重试时从断点继续.
+
+    DY_JOB_WORKERS         worker 进程数, 默认为 CPU 核数
+    DY_JOB_POLL_INTERVAL   队列为空时的轮询间隔(秒), 默认 5
+
+    python -m dy_jobs.worker put user https://www.douyin.com/user/xxx --params '{"incremental": true}'
+    python -m dy_jobs.worker run --workers 4
+    python -m dy_jobs.worker --broker redis://10.0.0.2:6379/0 run
+    python -m dy_jobs.worker stats
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+from loguru import logger
+
+from dy_jobs.broker import JOB_KINDS, create_broker
+
+JOB_WORKERS = int(os.getenv('DY_JOB_WORKERS', '0')) or os.cpu_count() or 1
+JOB_POLL_INTERVAL = float(os.getenv('DY_JOB_POLL_INTERVAL', '5'))
+
+SEEN_NAMESPACES = ('aweme', 'comment')
+
+
+class Worker:
+    def __init__(self, name, auth, base_path, job_queue=None, poll_interval=None, skip_seen=None):
+        """
+        :param skip_seen: 跳过已抓取过的对象, 默认 DY_SKIP_SEEN, 去重集合保存在队列后端, 所有节点共享.
+        """
+        from main import Data_Spider
+        from utils.seen_filter import SKIP_SEEN, SeenFilter, set_seen_filter
+        self.name = name
+        self.auth = auth
+        self.base_path = base_path
+        self.job_queue = job_queue or create_broker()
+        self.poll_interval = JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        skip_seen = SKIP_SEEN if skip_seen is None else skip_seen
+        if skip_seen:
+            # 本地布隆过滤器挡掉大部分查询, 没命中时再查队列后端的共享集合
+            for namespace in SEEN_NAMESPACES:
+                set_seen_filter(namespace, SeenFilter(namespace, exact=self.job_queue, shared=True))
+        self.spider = Data_Spider(skip_seen)
+
+    def run_job(self, job):
+        params = job.params
+        save_choice = params.get('save_choice', 'all')
+        if job.kind == 'work':
+            excel_name = params.get('excel_name', '') or job.target.split('/')[-1].split('?')[0]
+            self.spider.spider_some_work(self.auth, [job.target], self.base_path, save_choice, excel_name)
+        elif job.kind == 'user':
+            self.spider.spider_user_all_work(self.auth, job.target, self.base_path, save_choice,
+                                             incremental=params.get('incremental', False),
+                                             checkpoint=params.get('checkpoint', True))
+        elif job.kind == 'search':
+            self.spider.spider_some_search_work(self.auth, job.target, params.get('num', 20), self.base_path,
+                                                save_choice, params.get('sort_type', '0'),
+                                                params.get('publish_time', '0'), params.get('filter_duration', ''),
+                                                params.get('search_range', ''), params.get('content_type', ''))
+        elif job.kind == 'comment':
+            self.spider.spider_work_all_comment(self.auth, job.target, self.base_path,
+                                                checkpoint=params.get('checkpoint', True))
+        else:
+            raise ValueError(f'未知的任务类型: {job.kind}')
+
+    def _keep_lease(self, job, finished):
+        # 租约过期前续约, 任务运行时间可以超过租约时长
+        while not finished.wait(self.job_queue.lease_seconds / 3):
+            if not self.job_queue.heartbeat(job):
+                logger.warning(f'{self.name} 任务 {job} 的租约已失效')
+                return
+
+    def run(self, drain=False):
+        """
+        循环执行任务.
+        :param drain: 队列为空时退出, 否则一直轮询.
+        :return: 执行的任务数.
+        """
+        count = 0
+        while True:
+            job = self.job_queue.lease(self.name)
+            if job is None:
+                if drain:
+                    return count
+                time.sleep(self.poll_interval)
+                continue
+            logger.info(f'{self.name} 开始任务 {job}')
+            finished = threading.Event()
+            threading.Thread(target=self._keep_lease, args=(job, finished), daemon=True).start()
+            try:
+                self.run_job(job)
+            except Exception as e:
+                logger.exception(f'{self.name} 任务 {job} 出错: {e}')
+                self.job_queue.fail(job, e)
+            else:
+                self.job_queue.complete(job)
+            finally:
+                finished.set()
+            count += 1
+
+
+def load_auth(index):
+    """第 index 个 worker 使用的账号, 没有配置账号池时使用 DY_COOKIES"""
+    from dotenv import load_dotenv
+    from builder.auth import DouyinAuth
+    from builder.auth_pool import AuthPool
+    load_dotenv()
+    accounts = AuthPool.read_accounts()
+    if accounts:
+        cookie_str, web_protect, keys = accounts[index % len(accounts)]
+    else:
+        cookie_str, web_protect, keys = os.getenv('DY_COOKIES'), '', ''
+        if not cookie_str:
+            raise ValueError('没有配置账号, 需要设置 COOKIE, DY_COOKIES_FILE 或 DY_COOKIES')
+    auth = DouyinAuth()
+    auth.perepare_auth(cookie_str, web_protect, keys)
+    return auth
+
+
+def worker_main(index, broker_url=None, drain=False):
+    from utils.common_util import init_base_path
+    # 多个节点共用队列时 worker 名称要全局唯一
+    name = f'{socket.gethostname()}-{os.getpid()}-{index}'
+    worker = Worker(name, load_auth(index), init_base_path(), create_broker(broker_url))
+    worker.run(drain)
+
+
+def run_workers(workers=None, broker_url=None, drain=False):
+    """
+    启动多个 worker 进程并等待退出.
+    使用 spawn 启动, 子进程不继承父进程的连接池和签名引擎.
+    """
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=worker_main, args=(index, broker_url, drain), daemon=True)
+                 for index in range(workers or JOB_WORKERS)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # 被中断的任务租约到期后由其他 worker 重新领取
+        for process in processes:
+            process.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='抓取任务队列')
+    parser.add_argument('--broker', default=None, help='队列地址, SQLite 文件路径或 redis://, 默认 DY_JOB_BROKER')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    put_parser = subparsers.add_parser('put', help='添加任务')
+    put_parser.add_argument('kind', choices=JOB_KINDS)
+    put_parser.add_argument('targets', nargs='+', help='作品链接, 用户主页链接或搜索关键词')
+    put_parser.add_argument('--priority', type=int, default=0, help='优先级, 越大越先执行')
+    put_parser.add_argument('--params', default='{}', help='任务参数 JSON, 例如 {"save_choice": "media"}')
+    run_parser = subparsers.add_parser('run', help='启动 worker')
+    run_parser.add_argument('--workers', type=int, default=None, help='worker 进程数, 默认 DY_JOB_WORKERS')
+    run_parser.add_argument('--drain', action='store_true', help='队列为空时退出')
+    subparsers.add_parser('stats', help='各状态的任务数')
+    args = parser.parse_args(argv)
+
+    if args.command == 'put':
+        job_queue = create_broker(args.broker)
+        params = json.loads(args.params)
+        for target in args.targets:
+            job_queue.put(args.kind, target, params, args.priority)
+        print(json.dumps(job_queue.stats()))
+    elif args.command == 'run':
+        run_workers(args.workers, args.broker, args.drain)
+    else:
+        print(json.dumps(create_broker(args.broker).stats()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
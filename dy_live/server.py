@@ -10,7 +10,6 @@ from dy_apis.douyin_api import DouyinAPI
 from builder.header import HeaderBuilder
 from builder.params import Params
 import utils.common_util as common_util
-from utils.dy_util import generate_signature
 
 
 class DouyinLive:
@@ -134,7 +133,7 @@ class DouyinLive:
          .add_param('live_reason', '')
          .add_param('room_id', room_id)
          .add_param('heartbeatDuration', '0')
-         .add_param('signature', generate_signature(room_id, user_id))
+         .add_param('signature', self.auth_.get_live_signature(room_id, user_id))
          )
         wss_url = f"wss://webcast5-ws-web-lf.douyin.com/webcast/im/push/v2/?{urlencode(params.get())}"
         self.ws = WebSocketApp(
@@ -1,16 +1,33 @@
 # coding=utf-8
+import itertools
 import json
 import os
 from loguru import logger
 
-from dy_apis.douyin_api import DouyinAPI
+from dy_apis.douyin_api import DouyinAPI, aweme_key, parse_aweme_id, parse_user_id
+from dy_apis.pagination import iter_items, prefetch
 from utils.common_util import init
 from utils.data_util import handle_work_info, download_work, save_to_xlsx
+from utils.seen_filter import SKIP_SEEN, get_seen_filter
+from utils.work_index import get_work_index
 
 
 class Data_Spider():
-    def __init__(self):
+    def __init__(self, skip_seen=None):
+        """
+        :param skip_seen: 跳过之前已经抓取过的作品和评论 (包括其他运行中抓取的), 默认 DY_SKIP_SEEN
+        """
         self.douyin_apis = DouyinAPI()
+        skip_seen = SKIP_SEEN if skip_seen is None else skip_seen
+        self.seen = get_seen_filter('aweme') if skip_seen else None
+        self.seen_comments = get_seen_filter('comment') if skip_seen else None
+
+    def is_seen(self, aweme_id):
+        return self.seen is not None and aweme_id in self.seen
+
+    def mark_seen(self, aweme_id):
+        if self.seen is not None:
+            self.seen.add(aweme_id)
 
     def spider_work(self, auth, work_url: str, proxies=None):
         """
@@ -19,7 +36,7 @@ class Data_Spider():
         :param work_url: 作品链接
         :return:
         """
-        res_json = self.douyin_apis.get_work_info(auth, work_url)
+        res_json = self.douyin_apis.get_work_info(auth, work_url, proxies=proxies)
         data = res_json['aweme_detail']
 
         work_info = handle_work_info(data)
@@ -40,17 +57,21 @@ class Data_Spider():
             raise ValueError('excel_name 不能为空')
         work_list = []
         for work_url in works:
-            work_info = self.spider_work(auth, work_url)
+            if self.is_seen(parse_aweme_id(work_url)):
+                logger.info(f'跳过已爬取的作品 {work_url}')
+                continue
+            work_info = self.spider_work(auth, work_url, proxies)
             work_list.append(work_info)
         for work_info in work_list:
             if save_choice == 'all' or 'media' in save_choice:
                 download_work(work_info, base_path['media'], save_choice)
+            self.mark_seen(work_info['work_id'])
         if save_choice == 'all' or save_choice == 'excel':
             file_path = os.path.abspath(os.path.join(base_path['excel'], f'{excel_name}.xlsx'))
             save_to_xlsx(work_list, file_path)
 
 
-    def spider_user_all_work(self, auth, user_url: str, base_path: dict, save_choice: str, excel_name: str = '', proxies=None):
+    def spider_user_all_work(self, auth, user_url: str, base_path: dict, save_choice: str, excel_name: str = '', proxies=None, incremental=False, checkpoint=False):
         """
         爬取一个用户的所有作品
         :param auth: 用户认证信息
@@ -59,27 +80,92 @@ class Data_Spider():
         :param save_choice: 保存方式 all: 保存所有的信息, media: 保存视频和图片（media-video只下载视频, media-image只下载图片，media都下载）, excel: 保存到excel
         :param excel_name: excel文件名
         :param proxies: 代理
+        :param incremental: 增量同步, 只爬取上次之后新发布的作品, 已爬取的作品记录在 datas/work_index.db
+        :param checkpoint: 保存翻页断点, 中途被限流时抛出 IncompletePage, 再次运行从断点继续; 默认不保存, 被限流时返回已取到的作品
         :return:
         """
-        user_info = self.douyin_apis.get_user_info(auth, user_url)
-        work_list = self.douyin_apis.get_user_all_work_info(auth, user_url)
+        user_info = self.douyin_apis.get_user_info(auth, user_url, proxies=proxies)
+        sec_uid = parse_user_id(user_url)
+        work_index = get_work_index()
+        if incremental:
+            work_list = self.douyin_apis.get_user_new_work_info(auth, user_url, work_index.known(sec_uid), proxies=proxies)
+            logger.info(f'用户 {user_url} 新作品数量: {len(work_list)}')
+        else:
+            work_list = self.douyin_apis.get_user_all_work_info(auth, user_url, checkpoint=checkpoint, proxies=proxies)
+            logger.info(f'用户 {user_url} 作品数量: {len(work_list)}')
         work_info_list = []
-        logger.info(f'用户 {user_url} 作品数量: {len(work_list)}')
         if save_choice == 'all' or save_choice == 'excel':
             excel_name = user_url.split('/')[-1].split('?')[0]
 
         for work_info in work_list:
+            if self.is_seen(work_info['aweme_id']):
+                # 其他运行已抓取过的作品也要记入这个用户的索引, 否则增量同步遇到它不会停止
+                work_index.add(sec_uid, work_info['aweme_id'], work_info.get('create_time'))
+                continue
             work_info['author'].update(user_info['user'])
             work_info = handle_work_info(work_info)
             work_info_list.append(work_info)
             logger.info(f'爬取作品信息 {work_info["work_url"]}')
             if save_choice == 'all' or 'media' in save_choice:
                 download_work(work_info, base_path['media'], save_choice)
+            work_index.add(sec_uid, work_info['work_id'], work_info['create_time'])
+            self.mark_seen(work_info['work_id'])
         if save_choice == 'all' or save_choice == 'excel':
             file_path = os.path.abspath(os.path.join(base_path['excel'], f'{excel_name}.xlsx'))
             save_to_xlsx(work_info_list, file_path)
 
-    def spider_some_search_work(self, auth, query: str, require_num: int, base_path: dict, save_choice: str,  sort_type: str, publish_time: str, filter_duration="", search_range="", content_type="",   excel_name: str = '', proxies=None):
+    def spider_work_all_comment(self, auth, work_url: str, base_path: dict, proxies=None, checkpoint=False):
+        """
+        爬取一个作品的全部评论, 保存为 JSON
+        :param auth: 用户认证信息
+        :param work_url: 作品链接
+        :param base_path: 保存路径
+        :param proxies: 代理
+        :param checkpoint: 保存翻页断点, 中途被限流时抛出 IncompletePage, 再次运行从断点继续; 默认不保存, 被限流时返回已取到的评论
+        :return:
+        """
+        comment_list = self.douyin_apis.get_work_all_comment(auth, work_url, checkpoint=checkpoint, proxies=proxies)
+        logger.info(f'作品 {work_url} 评论数量: {len(comment_list)}')
+        file_path = os.path.abspath(os.path.join(base_path['comment'], f'{parse_aweme_id(work_url)}.json'))
+        saved_list, new_cids = comment_list, []
+        if self.seen_comments is not None:
+            saved_list, new_cids = self.merge_new_comments(file_path, comment_list)
+            logger.info(f'作品 {work_url} 新评论数量: {len(new_cids)}')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(saved_list, f, ensure_ascii=False)
+        # 写入文件后再记录, 中途失败的评论下次仍会保存
+        for cid in new_cids:
+            self.seen_comments.add(cid)
+        return comment_list
+
+    def merge_new_comments(self, file_path, comment_list):
+        """
+        跳过已保存过的评论, 新评论和已保存评论下的新回复合并到已有的评论文件.
+        :param file_path: 评论文件.
+        :param comment_list: 本次获取的评论, 带 reply_comment.
+        :return: 合并后的评论列表, 新评论和新回复的 cid.
+        """
+        saved_list = []
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                saved_list = json.load(f)
+        saved = {comment.get('cid'): comment for comment in saved_list}
+        new_cids = []
+        for comment in comment_list:
+            replies = [reply for reply in comment.get('reply_comment') or []
+                       if reply.get('cid') not in self.seen_comments]
+            cid = comment.get('cid')
+            if cid in saved and cid in self.seen_comments:
+                saved[cid].setdefault('reply_comment', []).extend(replies)
+            else:
+                comment['reply_comment'] = replies
+                saved_list.append(comment)
+                saved[cid] = comment
+                new_cids.append(cid)
+            new_cids.extend(reply.get('cid') for reply in replies)
+        return saved_list, new_cids
+
+    def spider_some_search_work(self, auth, query: str, require_num: int, base_path: dict, save_choice: str,  sort_type: str, publish_time: str, filter_duration="", search_range="", content_type="",   excel_name: str = '', proxies=None, prefetch_depth=None):
         """
             :param auth: DouyinAuth object.
             :param query: 搜索关键字.
@@ -92,19 +178,27 @@ class Data_Spider():
             :param search_range: 搜索范围 0 不限, 1 最近看过, 2 还未看过, 3 关注的人
             :param content_type: 内容形式 0 不限, 1 视频, 2 图文
             :param excel_name: excel文件名
+            :param proxies: 代理, requests 风格的代理字典或 ProxyPool
+            :param prefetch_depth: 处理当前页时提前获取的页数, 默认 DY_PREFETCH_DEPTH
         """
         work_info_list = []
-        work_list = self.douyin_apis.search_some_general_work(auth, query, require_num, sort_type, publish_time, filter_duration, search_range, content_type)
-        logger.info(f'搜索关键词 {query} 作品数量: {len(work_list)}')
         if save_choice == 'all' or save_choice == 'excel':
             excel_name = query
-        for work_info in work_list:
-            logger.info(json.dumps(work_info))
-            logger.info(f'爬取作品信息 https://www.douyin.com/video/{work_info["aweme_info"]["aweme_id"]}')
-            work_info = handle_work_info(work_info['aweme_info'])
-            work_info_list.append(work_info)
-            if save_choice == 'all' or 'media' in save_choice:
-                download_work(work_info, base_path['media'], save_choice)
+        # 处理和下载当前页的同时获取后面的页, 跳过已爬取的作品时需要多取几页才够数
+        pages = prefetch(self.douyin_apis.iter_search_general_work_pages(auth, query, sort_type, publish_time, filter_duration, search_range, content_type, proxies=proxies), prefetch_depth, require_num if self.seen is None else None)
+        works = (work_info for work_info in iter_items(pages) if not self.is_seen(aweme_key(work_info)))
+        try:
+            for work_info in itertools.islice(works, require_num):
+                logger.info(json.dumps(work_info))
+                logger.info(f'爬取作品信息 https://www.douyin.com/video/{work_info["aweme_info"]["aweme_id"]}')
+                work_info = handle_work_info(work_info['aweme_info'])
+                work_info_list.append(work_info)
+                if save_choice == 'all' or 'media' in save_choice:
+                    download_work(work_info, base_path['media'], save_choice)
+                self.mark_seen(work_info['work_id'])
+        finally:
+            pages.close()
+        logger.info(f'搜索关键词 {query} 作品数量: {len(work_info_list)}')
         if save_choice == 'all' or save_choice == 'excel':
             file_path = os.path.abspath(os.path.join(base_path['excel'], f'{excel_name}.xlsx'))
             save_to_xlsx(work_info_list, file_path)
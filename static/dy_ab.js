@@ -11053,3 +11053,9 @@ function get_ree_key(e){
         return t
     }(jsrsasign.KEYUTIL.getKey(e).generatePublicKeyHex()))
 }
+
+function get_ab_batch(pairs) {
+    return pairs.map(function (pair) {
+        return get_ab(pair[0], pair[1]);
+    });
+}
@@ -0,0 +1,69 @@
+// 常驻签名进程: 启动时加载 dy_ab.js / dy_live_sign.js, 之后通过 stdin/stdout 按行收发 JSON
+// 请求: {"id": 1, "fn": "get_ab", "args": ["query", "data"]}
+// 响应: {"id": 1, "result": "..."} 或 {"id": 1, "error": "..."}
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const { createRequire } = require('module');
+
+const [, , abPath, livePath, nodeModules] = process.argv;
+
+// 签名脚本里的 console 输出会污染协议, 统一转到 stderr
+const write = process.stdout.write.bind(process.stdout);
+console.log = console.info = console.warn = console.debug = console.error;
+
+// 与 execjs 的 cwd=node_modules 保持一致, 从项目根目录解析依赖
+const scriptRequire = createRequire(path.join(path.dirname(nodeModules), 'sign_worker.js'));
+
+function load(file, names) {
+    const source = fs.readFileSync(file, 'utf-8');
+    const factory = new Function('require', `${source}\nreturn {${names.join(', ')}};`);
+    return factory(scriptRequire);
+}
+
+const scripts = {
+    dy: { file: abPath, names: ['get_ab', 'get_ab_batch', 'get_req_sign', 'get_ree_key'] },
+    live: { file: livePath, names: ['sign'] },
+};
+const handlers = {};
+const loadErrors = {};
+for (const [name, script] of Object.entries(scripts)) {
+    try {
+        Object.assign(handlers, load(script.file, script.names));
+    } catch (e) {
+        for (const fn of script.names) {
+            loadErrors[fn] = `load ${name} failed: ${e && e.stack ? e.stack : e}`;
+        }
+    }
+}
+handlers.ping = () => 'pong';
+
+function handle(request) {
+    const fn = request.fn;
+    if (loadErrors[fn]) {
+        return { id: request.id, error: loadErrors[fn] };
+    }
+    if (!handlers[fn]) {
+        return { id: request.id, error: `unknown function: ${fn}` };
+    }
+    try {
+        return { id: request.id, result: handlers[fn](...(request.args || [])) };
+    } catch (e) {
+        return { id: request.id, error: e && e.stack ? e.stack : String(e) };
+    }
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+    let response;
+    try {
+        response = handle(JSON.parse(line));
+    } catch (e) {
+        response = { id: null, error: `bad request: ${e}` };
+    }
+    write(JSON.stringify(response) + '\n');
+});
+rl.on('close', () => process.exit(0));
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')
+
+from dy_jobs.broker import DONE, FAILED, LEASED, QUEUED
+from dy_jobs.redis_broker import RedisBroker
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def make_broker(client, **kwargs):
+    kwargs.setdefault('lease', 0.3)
+    kwargs.setdefault('retry_delay', 0.1)
+    kwargs.setdefault('max_attempts', 2)
+    return RedisBroker(client, prefix='test:jobs', **kwargs)
+
+
+def test_put_is_idempotent_and_lease_follows_priority(client):
+    broker = make_broker(client)
+    user_id = broker.put('user', 'u1')
+    work_id = broker.put('work', 'w1', priority=5)
+    assert broker.put('user', 'u1') == user_id
+    job = broker.lease('A')
+    assert (job.id, job.kind, job.attempts, job.owner) == (work_id, 'work', 1, 'A')
+    assert broker.lease('B').id == user_id
+    assert broker.lease('C') is None
+    assert broker.stats() == {QUEUED: 0, LEASED: 2, DONE: 0, FAILED: 0}
+
+
+def test_expired_lease_is_reclaimed(client):
+    a, b = make_broker(client), make_broker(client)
+    a.put('user', 'u1')
+    job = a.lease('A')
+    assert a.heartbeat(job)
+    time.sleep(0.35)
+    stolen = b.lease('B')
+    assert (stolen.id, stolen.owner, stolen.attempts) == (job.id, 'B', 2)
+    assert not a.heartbeat(job)
+    a.complete(job)
+    assert client.hget(b.key('job', job.id), 'state') == LEASED
+
+
+def test_failed_job_is_retried_after_delay(client):
+    broker = make_broker(client)
+    broker.put('work', 'w1')
+    job = broker.lease('A')
+    broker.fail(job, 'boom')
+    assert broker.lease('A') is None
+    time.sleep(0.15)
+    retry = broker.lease('A')
+    assert (retry.id, retry.attempts) == (job.id, 2)
+    broker.fail(retry, 'boom')
+    assert broker.stats()[FAILED] == 1
+
+
+def test_concurrent_lease_hands_out_each_job_once(client):
+    producer = make_broker(client, lease=30)
+    for i in range(200):
+        producer.put('search', f's{i}', priority=i % 3)
+    leased = []
+
+    def work(name):
+        broker = make_broker(client, lease=30)
+        while (job := broker.lease(name)) is not None:
+            leased.append(job.id)
+            broker.complete(job)
+
+    threads = [threading.Thread(target=work, args=(f't{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(leased) == sorted(set(leased))
+    assert len(leased) == 200
+    assert producer.stats() == {QUEUED: 0, LEASED: 0, DONE: 200, FAILED: 0}
+
+
+def test_seen_set(client):
+    broker = make_broker(client)
+    assert broker.add_seen('aweme', 1)
+    assert not broker.add_seen('aweme', 1)
+    assert broker.is_seen('aweme', '1')
+
+
+def test_workers_share_seen_set_through_broker(client, tmp_path, monkeypatch):
+    from dy_jobs.worker import Worker
+    from utils import seen_filter
+
+    monkeypatch.setattr(seen_filter, 'default_seen_filters', {})
+    workers = []
+    for name in ('node-a', 'node-b'):
+        # 每个节点有自己的本地过滤器文件
+        monkeypatch.setattr(seen_filter, 'SEEN_DIR', str(tmp_path / name))
+        workers.append(Worker(name, None, {}, make_broker(client), skip_seen=True))
+    a, b = (worker.spider for worker in workers)
+    assert a.seen is not b.seen
+    assert a.seen.bloom.path != b.seen.bloom.path
+
+    assert not b.is_seen('7212619184386182435')
+    a.mark_seen('7212619184386182435')
+    assert b.is_seen('7212619184386182435')
+    assert not b.is_seen('7212619184386182436')
+    b.mark_seen('7212619184386182436')
+    assert a.is_seen('7212619184386182436')
+
+
+def test_put_requeues_finished_jobs_only(client):
+    broker = make_broker(client)
+    job_id = broker.put('work', 'w1', {'save_choice': 'media'})
+    job = broker.lease('A')
+    assert broker.put('work', 'w1') == job_id
+    assert broker.stats()[LEASED] == 1
+    broker.complete(job)
+    assert broker.put('work', 'w1', priority=3) == job_id
+    assert broker.stats() == {QUEUED: 1, LEASED: 0, DONE: 0, FAILED: 0}
+    again = broker.lease('A')
+    assert (again.id, again.priority, again.attempts, again.params) == (job_id, 3, 1, {})
+
+
+def test_put_repairs_index_without_job(client):
+    broker = make_broker(client)
+    # 旧版本在写入索引后, 写入任务前退出留下的状态
+    client.hset(broker.key('index'), 'user:u1', 7)
+    assert broker.put('user', 'u1') == 7
+    job = broker.lease('A')
+    assert (job.id, job.kind, job.target) == (7, 'user', 'u1')
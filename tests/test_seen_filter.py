@@ -0,0 +1,27 @@
+import multiprocessing
+
+from utils.seen_filter import BloomFilter
+
+
+def add_keys(path, start, count):
+    bloom = BloomFilter(path)
+    for i in range(start, start + count):
+        bloom.add(f'aweme-{i}')
+    bloom.close()
+
+
+def test_processes_sharing_a_filter_file_lose_no_keys(tmp_path):
+    path = str(tmp_path / 'aweme.bloom')
+    BloomFilter(path, capacity=100000, error_rate=0.01).close()
+    # 与 dy_jobs.worker 相同, 用 spawn 启动的进程各自 mmap 同一个文件
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=add_keys, args=(path, i * 10000, 10000)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    bloom = BloomFilter(path)
+    assert all(f'aweme-{i}' in bloom for i in range(40000))
+    assert 39000 <= bloom.count <= 40000
+    bloom.close()
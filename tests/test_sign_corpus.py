@@ -0,0 +1,69 @@
+import pytest
+
+from utils import signer as signer_module
+from utils.sign_corpus import BENCH_PRIVATE_KEY, CORPUS, check_signers
+from utils.signer import SIGNER_BACKENDS, Signer, get_signer
+
+# 原始实现, 其余后端以它的输出为准
+REFERENCE = 'execjs'
+
+
+def unavailable_reason(name):
+    """后端不可用 (依赖没有安装, 缺少 node_modules 等) 时返回原因"""
+    try:
+        signer = get_signer(name)
+        signer.warm_up()
+        signer.ree_key(BENCH_PRIVATE_KEY)
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'.splitlines()[0]
+    return None
+
+
+def require_backend(name):
+    reason = unavailable_reason(name)
+    if reason:
+        pytest.skip(f'签名后端 {name} 不可用: {reason}')
+
+
+def test_reference_signs_whole_corpus():
+    require_backend(REFERENCE)
+    assert check_signers([REFERENCE]) == []
+
+
+@pytest.mark.parametrize('backend', [name for name in SIGNER_BACKENDS if name != REFERENCE])
+def test_backend_matches_reference(backend):
+    require_backend(REFERENCE)
+    require_backend(backend)
+    assert check_signers([REFERENCE, backend]) == []
+
+
+class FakeSigner(Signer):
+    def __init__(self, suffix=''):
+        self.suffix = suffix
+
+    def a_bogus(self, query, data=''):
+        return 'a' * 64
+
+    def a_bogus_batch(self, pairs):
+        return [self.a_bogus(query, data) for query, data in pairs]
+
+    def req_sign(self, e, prik):
+        return 's' * 88
+
+    def ree_key(self, prik):
+        return 'key' + self.suffix
+
+    def live_signature(self, room_id, user_unique_id):
+        return 'l' * 32
+
+
+def test_check_signers_reports_mismatches(monkeypatch):
+    monkeypatch.setattr(signer_module, 'signers', {})
+    monkeypatch.setitem(SIGNER_BACKENDS, 'fake', FakeSigner)
+    monkeypatch.setitem(SIGNER_BACKENDS, 'fake_same', lambda: FakeSigner())
+    monkeypatch.setitem(SIGNER_BACKENDS, 'fake_other', lambda: FakeSigner('x'))
+    assert check_signers(['fake', 'fake_same']) == []
+    mismatches = check_signers(['fake', 'fake_other'])
+    assert len(mismatches) == 1
+    assert mismatches[0].startswith('fake_other ree_key')
+    assert {case for case, _, _, _ in CORPUS} >= {'ree_key', 'a_bogus_query', 'live_signature'}
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """线程安全的 LRU 缓存, 支持整体或单条过期时间"""
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expire_at = item
+                if expire_at is None or expire_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, loader, ttl=None):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class RefreshingValue:
+    """
+    带过期时间的单值缓存.
+    临近过期时在后台刷新并继续返回旧值; 已过期或为空时同步加载, 并发调用方只触发一次加载.
+    loader 返回 (value, ttl), ttl 为 None 时使用默认过期时间.
+    """
+
+    def __init__(self, loader, ttl, refresh_ahead=0.2):
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self._value = None
+        self._expire_at = 0.0
+        self._refresh_at = 0.0
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def _fresh(self, now):
+        return self._value is not None and now < self._expire_at
+
+    def set(self, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._value = value
+        self._expire_at = now + ttl
+        self._refresh_at = now + ttl * (1 - self.refresh_ahead)
+
+    def _load(self):
+        value, ttl = self.loader()
+        self.set(value, ttl)
+
+    def get(self):
+        now = time.monotonic()
+        if self._fresh(now):
+            if now >= self._refresh_at:
+                self._refresh_in_background()
+            return self._value
+        with self._load_lock:
+            if not self._fresh(time.monotonic()):
+                self._load()
+            return self._value
+
+    def _refresh_in_background(self):
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            with self._load_lock:
+                self._load()
+        except Exception:
+            # 刷新失败时保留旧值, 等过期后再同步加载
+            pass
+        finally:
+            self._refreshing = False
+
+    def invalidate(self):
+        with self._load_lock:
+            self._value = None
+            self._expire_at = 0.0
+            self._refresh_at = 0.0
@@ -0,0 +1,186 @@
+"""
+翻页任务断点
+长时间的翻页抓取 (用户全部作品, 作品全部评论等) 每 N 页把游标和已取到的结果写入本地 SQLite,
+中途失败后重新运行同一个任务时从上次的游标继续, 不再重复请求已取过的页.
+只有 API 在最后一页返回 has_more == 0 时才算完成并删除断点, 被限流或返回不完整的页会抛出 IncompletePage, 断点保留.
+
+    DY_CHECKPOINT_DB      断点文件路径, 默认 datas/checkpoints.db
+    DY_CHECKPOINT_EVERY   每多少页保存一次, 默认 5, 抛出异常时总会保存
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+CHECKPOINT_DB = os.getenv('DY_CHECKPOINT_DB', os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '../datas/checkpoints.db')))
+CHECKPOINT_EVERY = int(os.getenv('DY_CHECKPOINT_EVERY', '5'))
+
+
+class IncompletePage(Exception):
+    """翻页在 API 返回 has_more == 0 之前中断, 例如被限流或返回的页缺少结果字段"""
+
+
+class CheckpointStore:
+    def __init__(self, path=None):
+        self.path = path or CHECKPOINT_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS checkpoints ('
+                              'job TEXT PRIMARY KEY, endpoint TEXT NOT NULL, target TEXT NOT NULL, '
+                              'cursor TEXT, pages INTEGER NOT NULL, updated_at REAL NOT NULL)')
+            # 结果按页追加写入, 避免每次保存都重写全部结果
+            self.conn.execute('CREATE TABLE IF NOT EXISTS checkpoint_items ('
+                              'job TEXT NOT NULL, seq INTEGER NOT NULL, item TEXT NOT NULL, PRIMARY KEY (job, seq))')
+
+    def load(self, endpoint, target):
+        """
+        读取断点, 没有时返回空断点.
+        :param endpoint: 任务类型, 例如接口名.
+        :param target: 抓取对象, 例如 sec_uid, aweme_id.
+        :return: Checkpoint.
+        """
+        job = f'{endpoint}:{target}'
+        with self._lock:
+            row = self.conn.execute('SELECT cursor, pages FROM checkpoints WHERE job = ?', (job,)).fetchone()
+            items = [json.loads(item) for item, in self.conn.execute(
+                'SELECT item FROM checkpoint_items WHERE job = ? ORDER BY seq', (job,))] if row else []
+        if row is None:
+            return Checkpoint(self, job, endpoint, target)
+        cursor, pages = row
+        return Checkpoint(self, job, endpoint, target, json.loads(cursor), items, pages)
+
+    def save(self, checkpoint, new_items):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO checkpoints (job, endpoint, target, cursor, pages, updated_at) '
+                              'VALUES (?, ?, ?, ?, ?, ?)',
+                              (checkpoint.job, checkpoint.endpoint, checkpoint.target,
+                               json.dumps(checkpoint.cursor), checkpoint.pages, time.time()))
+            start = len(checkpoint.items) - len(new_items)
+            self.conn.executemany('INSERT OR REPLACE INTO checkpoint_items (job, seq, item) VALUES (?, ?, ?)',
+                                  [(checkpoint.job, start + i, json.dumps(item, ensure_ascii=False))
+                                   for i, item in enumerate(new_items)])
+
+    def delete(self, job):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM checkpoints WHERE job = ?', (job,))
+            self.conn.execute('DELETE FROM checkpoint_items WHERE job = ?', (job,))
+
+    def jobs(self):
+        """未完成的任务列表"""
+        with self._lock:
+            rows = self.conn.execute('SELECT job, endpoint, target, cursor, pages, updated_at FROM checkpoints '
+                                     'ORDER BY updated_at DESC').fetchall()
+        return [dict(job=job, endpoint=endpoint, target=target, cursor=json.loads(cursor), pages=pages,
+                     updated_at=updated_at) for job, endpoint, target, cursor, pages, updated_at in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+class Checkpoint:
+    def __init__(self, store, job, endpoint, target, cursor=None, items=None, pages=0):
+        self.store = store
+        self.job = job
+        self.endpoint = endpoint
+        self.target = target
+        # 下一页的游标, 为 None 时从第一页开始
+        self.cursor = cursor
+        self.items = items or []
+        self.pages = pages
+        self.unsaved = 0
+        # 本次运行取到的最后一页是否为最后一页
+        self.done = False
+
+    def add(self, page):
+        self.items.extend(page.items)
+        self.cursor = page.next_cursor
+        self.pages += 1
+        self.unsaved += len(page.items)
+        self.done = not page.has_more
+
+    def save(self):
+        if self.unsaved or self.pages:
+            self.store.save(self, self.items[len(self.items) - self.unsaved:])
+            self.unsaved = 0
+
+    def finish(self):
+        """翻页结束, API 已报告没有更多时删除断点, 否则保存断点并抛出 IncompletePage"""
+        if not self.done:
+            self.save()
+            raise IncompletePage(f'{self.job} 在第 {self.pages} 页后中断, 已保存断点')
+        self.store.delete(self.job)
+
+
+def _start(store, endpoint, target):
+    checkpoint = store.load(endpoint, target)
+    if checkpoint.pages:
+        logger.info(f'{endpoint} {target} 从断点继续, 已完成 {checkpoint.pages} 页, {len(checkpoint.items)} 条')
+    return checkpoint
+
+
+def crawl(endpoint, target, iter_pages, store=None, every=None) -> list:
+    """
+    带断点的翻页抓取.
+    :param endpoint: 任务类型.
+    :param target: 抓取对象.
+    :param iter_pages: iter_pages(cursor) 返回 Page 生成器, cursor 为 None 时从第一页开始,
+        页不完整时应抛出 IncompletePage, 空结果也要返回一页 has_more 为 False 的 Page.
+    :param store: CheckpointStore, 默认使用全局实例.
+    :param every: 每多少页保存一次.
+    :return: 全部结果, 包括断点中已有的结果.
+    """
+    store = store or get_checkpoint_store()
+    every = every or CHECKPOINT_EVERY
+    checkpoint = _start(store, endpoint, target)
+    try:
+        for page in iter_pages(checkpoint.cursor):
+            checkpoint.add(page)
+            if checkpoint.pages % every == 0:
+                checkpoint.save()
+    except BaseException:
+        checkpoint.save()
+        raise
+    checkpoint.finish()
+    return checkpoint.items
+
+
+async def acrawl(endpoint, target, iter_pages, store=None, every=None) -> list:
+    """crawl 的异步版本, iter_pages(cursor) 返回 Page 异步生成器"""
+    store = store or get_checkpoint_store()
+    every = every or CHECKPOINT_EVERY
+    checkpoint = _start(store, endpoint, target)
+    try:
+        async for page in iter_pages(checkpoint.cursor):
+            checkpoint.add(page)
+            if checkpoint.pages % every == 0:
+                checkpoint.save()
+    except BaseException:
+        checkpoint.save()
+        raise
+    checkpoint.finish()
+    return checkpoint.items
+
+
+default_checkpoint_store = None
+default_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global default_checkpoint_store
+    if default_checkpoint_store is None:
+        with default_checkpoint_store_lock:
+            if default_checkpoint_store is None:
+                default_checkpoint_store = CheckpointStore()
+    return default_checkpoint_store
+
+
+def set_checkpoint_store(store: CheckpointStore):
+    global default_checkpoint_store
+    default_checkpoint_store = store
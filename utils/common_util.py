@@ -16,16 +16,22 @@ def load_env():
     dy_live_auth.perepare_auth(cookies_live, "", "")
     return dy_auth
 
-def init():
+def init_base_path():
+    """创建数据目录, 不读取账号, 只需要保存路径时使用"""
     media_base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../datas/media_datas'))
     excel_base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../datas/excel_datas'))
-    for base_path in [media_base_path, excel_base_path]:
+    comment_base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../datas/comment_datas'))
+    for base_path in [media_base_path, excel_base_path, comment_base_path]:
         if not os.path.exists(base_path):
             os.makedirs(base_path)
             # logger.info(f'create {base_path}')
-    cookies = load_env()
-    base_path = {
+    return {
         'media': media_base_path,
         'excel': excel_base_path,
+        'comment': comment_base_path,
     }
+
+def init():
+    base_path = init_base_path()
+    cookies = load_env()
     return cookies, base_path
@@ -0,0 +1,224 @@
+"""
+AIMD 自适应并发控制
+按 (接口路径, 账号) 维护允许同时在途的请求数: 正常响应时缓慢加一, 遇到限流信号时按比例减半.
+限流信号包括 429/503 状态码, 空响应体, 验证码/风控页面, 以及列表接口缺少预期字段.
+
+    DY_AIMD_INITIAL   初始窗口, 默认 4
+    DY_AIMD_MIN       最小窗口, 默认 1
+    DY_AIMD_MAX       最大窗口, 默认 32
+    DY_AIMD_DECREASE  减小系数, 默认 0.5
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+from utils.rate_limiter import account_key
+
+AIMD_INITIAL = float(os.getenv('DY_AIMD_INITIAL', '4'))
+AIMD_MIN = float(os.getenv('DY_AIMD_MIN', '1'))
+AIMD_MAX = float(os.getenv('DY_AIMD_MAX', '32'))
+AIMD_DECREASE = float(os.getenv('DY_AIMD_DECREASE', '0.5'))
+
+THROTTLE_STATUS = (429, 503)
+# 验证页 (HTML 等非 JSON 响应) 中出现这些内容时视为被限流
+THROTTLE_MARKERS = ('captcha', 'verify_check', 'verifycenter', 'verify_event', '验证码')
+# JSON 响应只看这些顶层字段, 不扫描正文, 评论和作品描述里出现 "验证码" 之类的文字不会误判
+VERIFY_FIELDS = ('verify_check', 'verify_event', 'verify_center_decision_conf', 'captcha')
+
+OK = 'ok'
+THROTTLED = 'throttled'
+ERROR = 'error'
+
+
+def classify(res, result=None, expect=None):
+    """
+    根据响应判断是否被限流.
+    :param res: 响应对象, 请求异常时为 None.
+    :param result: 解析后的结果.
+    :param expect: 正常响应必须包含的字段.
+    :return: OK / THROTTLED / ERROR.
+    """
+    if res is None:
+        return ERROR
+    if res.status_code in THROTTLE_STATUS:
+        return THROTTLED
+    text = res.text
+    if not text.strip():
+        return THROTTLED
+    if text.lstrip()[:1] in ('{', '['):
+        if isinstance(result, dict) and any(result.get(field) for field in VERIFY_FIELDS):
+            return THROTTLED
+    else:
+        head = text[:2048].lower()
+        if any(marker in head for marker in THROTTLE_MARKERS):
+            return THROTTLED
+    if res.status_code >= 500:
+        return ERROR
+    if expect and isinstance(result, dict) and expect not in result:
+        return THROTTLED
+    return OK
+
+
+class Window:
+    def __init__(self, initial, minimum, maximum, decrease):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.inflight = 0
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+    def try_acquire(self):
+        with self.cond:
+            if self.inflight < max(int(self.limit), 1):
+                self.inflight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self.cond:
+            while self.inflight >= max(int(self.limit), 1):
+                self.cond.wait()
+            self.inflight += 1
+
+    def release(self, outcome, started):
+        with self.cond:
+            self.inflight -= 1
+            if outcome == OK:
+                self.successes += 1
+                # 每个窗口的请求都成功后窗口加一
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif outcome == THROTTLED:
+                self.throttles += 1
+                # 同一批在途请求只减一次, 避免一次限流把窗口连续打到最小
+                if started >= self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.last_decrease = time.monotonic()
+            else:
+                self.errors += 1
+            self.cond.notify_all()
+
+    def snapshot(self):
+        return {
+            'limit': round(self.limit, 2),
+            'inflight': self.inflight,
+            'successes': self.successes,
+            'throttles': self.throttles,
+            'errors': self.errors,
+        }
+
+
+class Slot:
+    """一次在途请求, 由调用方在拿到响应后设置 outcome"""
+
+    def __init__(self):
+        self.outcome = ERROR
+        self.started = time.monotonic()
+
+    def observe(self, res, result=None, expect=None):
+        self.outcome = classify(res, result, expect)
+        return self.outcome
+
+
+class ConcurrencyController:
+    def __init__(self, initial=None, minimum=None, maximum=None, decrease=None):
+        self.initial = initial or AIMD_INITIAL
+        self.minimum = minimum or AIMD_MIN
+        self.maximum = maximum or AIMD_MAX
+        self.decrease = decrease or AIMD_DECREASE
+        self.windows = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        注册请求结束回调.
+        :param listener: listener(url, cookies, outcome), 不应抛出异常.
+        """
+        with self._lock:
+            self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self.listeners = [item for item in self.listeners if item != listener]
+
+    def _notify(self, url, cookies, outcome):
+        # 注册和注销时整体替换列表, 这里遍历的是当时的快照
+        for listener in self.listeners:
+            listener(url, cookies, outcome)
+
+    def inflight(self, account):
+        """某个账号在所有接口上的在途请求数"""
+        return sum(window.inflight for (_, key), window in list(self.windows.items()) if key == account)
+
+    def window(self, url, cookies=None) -> Window:
+        key = (urlparse(url).path, account_key(cookies))
+        window = self.windows.get(key)
+        if window is None:
+            with self._lock:
+                window = self.windows.get(key)
+                if window is None:
+                    window = Window(self.initial, self.minimum, self.maximum, self.decrease)
+                    self.windows[key] = window
+        return window
+
+    @contextmanager
+    def slot(self, url, cookies=None):
+        window = self.window(url, cookies)
+        window.acquire()
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            window.release(slot.outcome, slot.started)
+            self._notify(url, cookies, slot.outcome)
+
+    @asynccontextmanager
+    async def slot_async(self, url, cookies=None):
+        window = self.window(url, cookies)
+        # 窗口同时被线程和协程使用, 不能在事件循环里阻塞等待条件变量, 这里轮询
+        delay = 0.01
+        while not window.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            window.release(slot.outcome, slot.started)
+            self._notify(url, cookies, slot.outcome)
+
+    def snapshot(self):
+        """
+        当前各窗口的状态, 账号为 account_key 的摘要.
+        :return: 列表, 每项包含 endpoint, account, limit, inflight 等.
+        """
+        with self._lock:
+            items = list(self.windows.items())
+        return [dict(endpoint=endpoint, account=account, **window.snapshot())
+                for (endpoint, account), window in items]
+
+
+default_controller = None
+default_controller_lock = threading.Lock()
+
+
+def get_concurrency_controller() -> ConcurrencyController:
+    global default_controller
+    if default_controller is None:
+        with default_controller_lock:
+            if default_controller is None:
+                default_controller = ConcurrencyController()
+    return default_controller
+
+
+def set_concurrency_controller(controller: ConcurrencyController):
+    global default_controller
+    default_controller = controller
@@ -3,10 +3,11 @@ import os
 import re
 import time
 import openpyxl
-import requests
 from loguru import logger
 from retry import retry
 
+from utils.transport import get_transport
+
 
 def norm_str(str):
     new_str = re.sub(r"|[\\/:*?\"<>| ]+", "", str).replace('\n', '').replace('\r', '')
@@ -127,11 +128,11 @@ def download_media(path, name, url, type):
         "Referer": "https://www.douyin.com/"
     }
     if type == 'image':
-        content = requests.get(url, headers=headers).content
+        content = get_transport().get(url, headers=headers).content
         with open(path + '/' + name + '.jpg', mode="wb") as f:
             f.write(content)
     elif type == 'video':
-        res = requests.get(url, headers=headers, stream=True)
+        res = get_transport().get(url, headers=headers, stream=True)
         size = 0
         chunk_size = 1024 * 1024
         with open(path + '/' + name + '.mp4', mode="wb") as f:
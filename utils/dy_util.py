@@ -1,11 +1,11 @@
 import re
-import sys
 import time
 import json
 import random
 import base64
 import urllib
-from os import path
+import os
+import threading
 
 import requests
 requests.packages.urllib3.disable_warnings()
@@ -13,26 +13,15 @@ import subprocess
 from functools import partial
 
 subprocess.Popen = partial(subprocess.Popen, encoding="utf-8")
-import execjs
 
-if getattr(sys, 'frozen', None):
-    basedir = sys._MEIPASS
-else:
-    basedir = path.dirname(__file__)
+from utils.cache_util import LRUCache, RefreshingValue
+from utils.signer import get_signer, warm_up
+from utils.transport import get_transport
 
-
-try:
-    node_modules = path.join(basedir, 'node_modules')
-    dy_path = path.join(basedir, 'static', 'dy_ab.js')
-    dy_js = execjs.compile(open(dy_path, 'r', encoding='utf-8').read(), cwd=node_modules)
-    sign_path = path.join(basedir, 'static', 'dy_live_sign.js')
-    sign_js = execjs.compile(open(sign_path, 'r', encoding='utf-8').read(), cwd=node_modules)
-except:
-    node_modules = path.join(basedir, '..', 'node_modules')
-    dy_path = path.join(basedir, '..', 'static', 'dy_ab.js')
-    dy_js = execjs.compile(open(dy_path, 'r', encoding='utf-8').read(), cwd=node_modules)
-    sign_path = path.join(basedir, '..', 'static', 'dy_live_sign.js')
-    sign_js = execjs.compile(open(sign_path, 'r', encoding='utf-8').read(), cwd=node_modules)
+# csrf token 按 cookie 缓存的时间(秒)
+CSRF_TOKEN_TTL = int(os.getenv('DY_CSRF_TOKEN_TTL', '1800'))
+csrf_token_caches = LRUCache(maxsize=64)
+csrf_token_lock = threading.Lock()
 
 
 def trans_cookies(cookies_str):
@@ -50,23 +39,37 @@ def trans_cookies(cookies_str):
 
 # 私信传obj, 其他的拼接
 def generate_req_sign(e, priK):
-    sign = dy_js.call('get_req_sign', e, priK)
+    sign = get_signer().req_sign(e, priK)
     return sign
 
 
 # query, data都是拼接字符串
 def generate_a_bogus(query, data=""):
-    a_bogus = dy_js.call('get_ab', query, data)
+    a_bogus = get_signer().a_bogus(query, data)
     return a_bogus
 
 
+# 批量生成 a_bogus, queries 为 (query, data) 或 query 组成的列表, 一次调用签完
+def generate_a_bogus_batch(queries):
+    pairs = []
+    for item in queries:
+        if isinstance(item, str):
+            pairs.append((item, ''))
+        else:
+            query, data = item
+            pairs.append((query, data or ''))
+    if not pairs:
+        return []
+    return get_signer().a_bogus_batch(pairs)
+
+
 def generate_signature(roomId, user_unique_id):
-    return sign_js.call('sign', roomId, user_unique_id)
+    return get_signer().live_signature(roomId, user_unique_id)
 
 
 # 传递私钥
 def generate_ree_key(prik):
-    ree_key = dy_js.call('get_ree_key', prik)
+    ree_key = get_signer().ree_key(prik)
     return ree_key
 
 
@@ -102,7 +105,7 @@ def generate_ttwid():
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
         }
-        response = requests.get(url, headers=headers, verify=False)
+        response = get_transport().get(url, headers=headers, verify=False)
         cookies_dict = response.cookies.get_dict()
         ttwid = cookies_dict.get('ttwid')
         return ttwid
@@ -119,7 +122,7 @@ def generate_fake_webid(random_length=19):
     return random_str
 
 
-def generate_webid(auth=None, url=""):
+def generate_webid(auth=None, url="", fallback=True):
     if url == "":
         url = f"https://www.douyin.com/discover?modal_id=7376449060384935209"
     try:
@@ -127,7 +130,7 @@ def generate_webid(auth=None, url=""):
         headers = HeaderBuilder().build(HeaderType.DOC)
         headers.set_header('cookie', auth.cookie_str if auth else "")
         headers.set_header("upgrade-insecure-requests", "1")
-        response = requests.get(url, headers=headers.get(), verify=False)
+        response = get_transport().get(url, headers=headers.get(), verify=False)
         res_text = response.text
         user_unique_id = re.findall(r'\\"user_unique_id\\":\\"(.*?)\\"', res_text)[0]
         webid = user_unique_id
@@ -137,7 +140,7 @@ def generate_webid(auth=None, url=""):
         # print(url)
         # print(e)
         # print("===================")
-        return generate_fake_webid()
+        return generate_fake_webid() if fallback else None
 
 
 def ws_accept_key(ws_key):
@@ -159,7 +162,7 @@ def ws_accept_key(ws_key):
         return None
 
 
-def generate_csrf_token(cookies_str):
+def generate_csrf_token(cookies_str, with_ttl=False):
     csrf_token_1, csrf_token_2 = None, None
     try:
         headers = {
@@ -180,12 +183,51 @@ def generate_csrf_token(cookies_str):
             'x-secsdk-csrf-request': '1',
             'x-secsdk-csrf-version': '1.2.22',
         }
-        response = requests.head('https://www.douyin.com/service/2/abtest_config/', headers=headers, verify=False)
-        return response.headers['X-Ware-Csrf-Token'].split(',')[1], response.headers['X-Ware-Csrf-Token'].split(',')[4]
+        response = get_transport().head('https://www.douyin.com/service/2/abtest_config/', headers=headers, verify=False)
+        # X-Ware-Csrf-Token: 0,token,有效期(毫秒),success,token
+        csrf_token = response.headers['X-Ware-Csrf-Token'].split(',')
+        if with_ttl:
+            ttl = int(csrf_token[2]) / 1000 if csrf_token[2].isdigit() else None
+            return csrf_token[1], csrf_token[4], ttl
+        return csrf_token[1], csrf_token[4]
     except Exception as e:
+        if with_ttl:
+            return csrf_token_1, csrf_token_2, None
         return csrf_token_1, csrf_token_2
 
 
+def load_csrf_token(cookies_str):
+    csrf_token_1, csrf_token_2, ttl = generate_csrf_token(cookies_str, with_ttl=True)
+    if csrf_token_1 is None:
+        raise ValueError('csrf token not found')
+    # 以服务端给出的有效期为准, 留出余量
+    if ttl:
+        ttl = min(ttl * 0.9, CSRF_TOKEN_TTL)
+    return (csrf_token_1, csrf_token_2), ttl
+
+
+def get_csrf_token(cookies_str):
+    """按 cookie 缓存 csrf token, 临近过期时后台刷新"""
+    cache = csrf_token_caches.get(cookies_str)
+    if cache is None:
+        with csrf_token_lock:
+            cache = csrf_token_caches.get(cookies_str)
+            if cache is None:
+                cache = RefreshingValue(partial(load_csrf_token, cookies_str), ttl=CSRF_TOKEN_TTL)
+                csrf_token_caches.set(cookies_str, cache)
+    try:
+        return cache.get()
+    except Exception:
+        return None, None
+
+
+def invalidate_csrf_token(cookies_str):
+    """接口返回 403 或 token 失效时调用, 下次使用时重新获取"""
+    cache = csrf_token_caches.get(cookies_str)
+    if cache is not None:
+        cache.invalidate()
+
+
 def generate_millisecond():
     millis = int(round(time.time() * 1000))
     return millis
@@ -0,0 +1,186 @@
+"""
+代理池
+记录每个代理的延迟, 失败次数和在途请求数, 按观测到的速度加权随机选择代理,
+每个代理限制同时在途的请求数, 连续失败过多的代理会被移出代理池.
+
+    DY_PROXIES              逗号分隔的代理地址, 例如 "http://1.2.3.4:8080,socks5://5.6.7.8:1080"
+    DY_PROXY_FILE           代理文件, 每行一个代理地址
+    DY_PROXY_MAX_INFLIGHT   每个代理同时在途的请求数, 默认 4
+    DY_PROXY_MAX_FAILURES   连续失败多少次后移除代理, 默认 3
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+from loguru import logger
+
+PROXIES = os.getenv('DY_PROXIES', '')
+PROXY_FILE = os.getenv('DY_PROXY_FILE', '')
+PROXY_MAX_INFLIGHT = int(os.getenv('DY_PROXY_MAX_INFLIGHT', '4'))
+PROXY_MAX_FAILURES = int(os.getenv('DY_PROXY_MAX_FAILURES', '3'))
+# 新代理还没有延迟数据时按这个延迟(秒)参与选择
+PROXY_DEFAULT_LATENCY = 1.0
+PROXY_LATENCY_DECAY = 0.3
+
+
+class Proxy:
+    def __init__(self, url):
+        self.url = url
+        self.latency = PROXY_DEFAULT_LATENCY
+        self.inflight = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def as_requests(self):
+        return {'http': self.url, 'https': self.url}
+
+    def weight(self):
+        return 1 / max(self.latency, 0.01)
+
+    def display_url(self):
+        # 不对外暴露代理的账号密码
+        parsed = urlparse(self.url)
+        if parsed.password is None:
+            return self.url
+        return parsed._replace(netloc=f'{parsed.username}:***@{parsed.hostname}:{parsed.port}').geturl()
+
+    def snapshot(self):
+        return {
+            'url': self.display_url(),
+            'latency': round(self.latency, 3),
+            'inflight': self.inflight,
+            'successes': self.successes,
+            'failures': self.failures,
+        }
+
+
+class ProxyLease:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.ok = True
+        self.started = time.monotonic()
+
+    def finish(self, pool):
+        if self.proxy is not None:
+            pool.release(self.proxy, time.monotonic() - self.started, self.ok)
+
+
+class ProxyPool:
+    def __init__(self, proxies=None, max_inflight=None, max_failures=None):
+        self.proxies = [Proxy(url) for url in proxies or []]
+        self.max_inflight = max_inflight or PROXY_MAX_INFLIGHT
+        self.max_failures = max_failures or PROXY_MAX_FAILURES
+        self.evicted = []
+        self.cond = threading.Condition()
+
+    @staticmethod
+    def from_env():
+        """
+        从 DY_PROXIES 和 DY_PROXY_FILE 加载代理.
+        :return: ProxyPool, 没有配置代理时返回 None.
+        """
+        urls = [url.strip() for url in PROXIES.split(',') if url.strip()]
+        if PROXY_FILE and os.path.exists(PROXY_FILE):
+            with open(PROXY_FILE, 'r', encoding='utf-8') as f:
+                urls += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        return ProxyPool(urls) if urls else None
+
+    @staticmethod
+    def from_proxies(proxies):
+        """
+        兼容 requests 风格的 proxies 参数.
+        :param proxies: ProxyPool, {'http': ..., 'https': ...} 或代理地址列表.
+        """
+        if proxies is None or isinstance(proxies, ProxyPool):
+            return proxies
+        if isinstance(proxies, dict):
+            proxies = list(dict.fromkeys(proxies.values()))
+        return ProxyPool(proxies)
+
+    def __len__(self):
+        return len(self.proxies)
+
+    def _choose(self):
+        candidates = [proxy for proxy in self.proxies if proxy.inflight < self.max_inflight]
+        if not candidates:
+            return None
+        return random.choices(candidates, weights=[proxy.weight() for proxy in candidates])[0]
+
+    def try_acquire(self):
+        with self.cond:
+            proxy = self._choose()
+            if proxy is not None:
+                proxy.inflight += 1
+            return proxy
+
+    def acquire(self):
+        """
+        选一个代理, 所有代理都达到并发上限时等待.
+        :return: Proxy, 代理全部被移除时返回 None, 即直连.
+        """
+        with self.cond:
+            while self.proxies:
+                proxy = self._choose()
+                if proxy is not None:
+                    proxy.inflight += 1
+                    return proxy
+                self.cond.wait()
+            return None
+
+    def release(self, proxy, latency, ok):
+        with self.cond:
+            proxy.inflight -= 1
+            if ok:
+                proxy.successes += 1
+                proxy.consecutive_failures = 0
+                proxy.latency = (1 - PROXY_LATENCY_DECAY) * proxy.latency + PROXY_LATENCY_DECAY * latency
+            else:
+                proxy.failures += 1
+                proxy.consecutive_failures += 1
+                if proxy.consecutive_failures >= self.max_failures and proxy in self.proxies:
+                    self.proxies.remove(proxy)
+                    self.evicted.append(proxy)
+                    logger.warning(f'代理 {proxy.url} 连续失败 {proxy.consecutive_failures} 次, 已移除')
+            self.cond.notify_all()
+
+    @contextmanager
+    def use(self):
+        """
+        借用一个代理, 请求抛出异常或调用方把 lease.ok 置为 False 时记为失败.
+        :return: ProxyLease, 代理全部被移除时 lease.proxy 为 None.
+        """
+        lease = ProxyLease(self.acquire())
+        try:
+            yield lease
+        except BaseException:
+            lease.ok = False
+            raise
+        finally:
+            lease.finish(self)
+
+    @asynccontextmanager
+    async def use_async(self):
+        # 代理池也被同步代码使用, 不能在事件循环里阻塞等待, 这里轮询
+        delay = 0.01
+        proxy = self.try_acquire()
+        while proxy is None and self.proxies:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            proxy = self.try_acquire()
+        lease = ProxyLease(proxy)
+        try:
+            yield lease
+        except BaseException:
+            lease.ok = False
+            raise
+        finally:
+            lease.finish(self)
+
+    def snapshot(self):
+        with self.cond:
+            return [proxy.snapshot() for proxy in self.proxies]
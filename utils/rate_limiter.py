@@ -0,0 +1,157 @@
+"""
+令牌桶限流
+每个接口路径和每个账号各有一个令牌桶, 一次请求需要同时拿到两边的令牌, 同步和异步代码共用同一组令牌桶
+
+配置格式为 "速率:突发", 速率单位为次/秒, 速率 <= 0 表示不限流:
+    DY_RATE_LIMIT_ENDPOINT  每个接口的默认限流, 默认 5:10
+    DY_RATE_LIMIT_ACCOUNT   每个账号的默认限流, 默认 2:4
+    DY_RATE_LIMITS          单独配置某些接口, 例如 "/aweme/v1/web/aweme/post/=0.7:2,/aweme/v1/web/comment/list/=3:6"
+
+账号令牌桶限制的是一个账号所有请求的总速率, 多线程或并发任务 (例如二级评论的并发获取 DY_REPLY_CONCURRENCY)
+用同一个账号时共享这个桶, 稳定后的总速率不会超过账号限流, 想要更高的吞吐需要提高账号限流或使用账号池.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+RATE_LIMIT_ENDPOINT = os.getenv('DY_RATE_LIMIT_ENDPOINT', '5:10')
+RATE_LIMIT_ACCOUNT = os.getenv('DY_RATE_LIMIT_ACCOUNT', '2:4')
+RATE_LIMITS = os.getenv('DY_RATE_LIMITS', '')
+
+# 翻页接口原先每页固定等待 1~2 秒, 默认保持相近的速率
+DEFAULT_ENDPOINT_LIMITS = {
+    '/aweme/v1/web/aweme/post/': (0.7, 2),
+}
+
+
+def parse_limit(value):
+    rate, _, burst = value.partition(':')
+    rate = float(rate)
+    return rate, float(burst) if burst else max(rate, 1)
+
+
+def parse_limits(value):
+    limits = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        path, limit = item.split('=', 1)
+        limits[path.strip()] = parse_limit(limit)
+    return limits
+
+
+def default_reply_concurrency():
+    """二级评论默认并发数, 与账号限流的突发数一致, 更多的并发只会在账号令牌桶上排队"""
+    rate, burst = parse_limit(RATE_LIMIT_ACCOUNT)
+    if rate <= 0:
+        return 8
+    return max(1, int(burst))
+
+
+def account_key(cookies):
+    """
+    账号标识, 取 sessionid (没有时为整个 cookie) 的 sha1 前 8 位, 可以出现在日志和监控接口中而不暴露凭证.
+    :param cookies: cookie 字典.
+    """
+    if not cookies:
+        return ''
+    for name in ('sessionid', 'sessionid_ss', 'uid_tt'):
+        if cookies.get(name):
+            raw = cookies[name]
+            break
+    else:
+        raw = '; '.join(f'{k}={v}' for k, v in sorted(cookies.items()))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:8]
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        预占令牌, 令牌不足时记为欠账.
+        :return: 需要等待的秒数.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    def __init__(self, endpoint_limit=None, account_limit=None, endpoint_limits=None):
+        self.endpoint_limit = endpoint_limit or parse_limit(RATE_LIMIT_ENDPOINT)
+        self.account_limit = account_limit or parse_limit(RATE_LIMIT_ACCOUNT)
+        if endpoint_limits is None:
+            endpoint_limits = dict(DEFAULT_ENDPOINT_LIMITS)
+            endpoint_limits.update(parse_limits(RATE_LIMITS))
+        self.endpoint_limits = endpoint_limits
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, limit):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(*limit)
+                    self.buckets[key] = bucket
+        return bucket
+
+    def reserve(self, url, cookies=None):
+        """
+        为一次请求预占接口和账号两边的令牌.
+        :param url: 请求地址, 按路径区分接口.
+        :param cookies: 账号 cookie.
+        :return: 需要等待的秒数.
+        """
+        path = urlparse(url).path
+        limit = self.endpoint_limits.get(path, self.endpoint_limit)
+        wait = self._bucket(('endpoint', path), limit).reserve()
+        account = account_key(cookies)
+        if account:
+            wait = max(wait, self._bucket(('account', account), self.account_limit).reserve())
+        return wait
+
+    def acquire(self, url, cookies=None):
+        wait = self.reserve(url, cookies)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url, cookies=None):
+        wait = self.reserve(url, cookies)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+default_rate_limiter = None
+default_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global default_rate_limiter
+    if default_rate_limiter is None:
+        with default_rate_limiter_lock:
+            if default_rate_limiter is None:
+                default_rate_limiter = RateLimiter()
+    return default_rate_limiter
+
+
+def set_rate_limiter(rate_limiter: RateLimiter):
+    global default_rate_limiter
+    default_rate_limiter = rate_limiter
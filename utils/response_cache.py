@@ -0,0 +1,188 @@
+"""
+只读接口的响应缓存
+内存 LRU 一级缓存, 可选 SQLite 二级缓存 (多进程或重启后共享), 每个接口单独配置过期时间.
+缓存键为 (接口名, 归一化后的 ID), 同一个作品不论分享链接还是 modal_id 链接都命中同一条缓存,
+结果与账号有关的接口 ID 前带账号标识, 每个账号单独缓存.
+只缓存正常响应, 被限流或出错的响应不会写入.
+
+    DY_RESPONSE_CACHE_SIZE   内存缓存条数, 默认 1024, 为 0 时关闭响应缓存
+    DY_RESPONSE_CACHE_DB     SQLite 缓存文件路径, 默认为空即不启用磁盘缓存
+    DY_RESPONSE_CACHE_TTLS   单独配置某些接口的过期时间(秒), 例如 "get_work_info=600,get_live_info=0", 为 0 时不缓存该接口
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.cache_util import LRUCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv('DY_RESPONSE_CACHE_SIZE', '1024'))
+RESPONSE_CACHE_DB = os.getenv('DY_RESPONSE_CACHE_DB', '')
+RESPONSE_CACHE_TTLS = os.getenv('DY_RESPONSE_CACHE_TTLS', '')
+
+# 直播间状态和 ttwid 变化快, 过期时间短一些
+DEFAULT_TTLS = {
+    'get_work_info': 300,
+    'get_user_info': 300,
+    'get_live_info': 30,
+}
+
+MISSING = object()
+
+
+def parse_ttls(value):
+    ttls = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        name, ttl = item.split('=', 1)
+        ttls[name.strip()] = float(ttl)
+    return ttls
+
+
+class SqliteCache:
+    """SQLite 二级缓存, 值以 JSON 保存, 过期时间使用墙上时间以便跨进程共享"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS response_cache ('
+                              'key TEXT PRIMARY KEY, value TEXT NOT NULL, expire_at REAL NOT NULL)')
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute('SELECT value, expire_at FROM response_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return default
+        value, expire_at = row
+        if expire_at <= time.time():
+            self.delete(key)
+            return default
+        return json.loads(value)
+
+    def set(self, key, value, ttl):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO response_cache (key, value, expire_at) VALUES (?, ?, ?)',
+                              (key, json.dumps(value, ensure_ascii=False), time.time() + ttl))
+
+    def delete(self, key):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+
+    def purge(self):
+        """删除已过期的缓存"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM response_cache WHERE expire_at <= ?', (time.time(),))
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM response_cache')
+
+    def close(self):
+        self.conn.close()
+
+
+class ResponseCache:
+    def __init__(self, size=None, db_path=None, ttls=None):
+        self.size = RESPONSE_CACHE_SIZE if size is None else size
+        self.memory = LRUCache(maxsize=self.size)
+        db_path = RESPONSE_CACHE_DB if db_path is None else db_path
+        self.disk = SqliteCache(db_path) if db_path else None
+        if ttls is None:
+            ttls = dict(DEFAULT_TTLS)
+            ttls.update(parse_ttls(RESPONSE_CACHE_TTLS))
+        self.ttls = ttls
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def enabled(self, endpoint):
+        return self.size > 0 and self.ttls.get(endpoint, 0) > 0
+
+    def _count(self, endpoint, name):
+        with self._lock:
+            counter = self.counters.setdefault(endpoint, {'memory_hits': 0, 'disk_hits': 0, 'misses': 0})
+            counter[name] += 1
+
+    def get(self, endpoint, key, default=None):
+        """
+        读取缓存.
+        :param endpoint: 接口名.
+        :param key: 归一化后的 ID.
+        :return: 缓存的结果的副本, 未命中时返回 default.
+        """
+        if not self.enabled(endpoint):
+            return default
+        cache_key = f'{endpoint}:{key}'
+        value = self.memory.get(cache_key, MISSING)
+        if value is not MISSING:
+            self._count(endpoint, 'memory_hits')
+            # 调用方可能会修改返回的字典, 不能直接交出缓存里的对象
+            return copy.deepcopy(value)
+        if self.disk is not None:
+            value = self.disk.get(cache_key, MISSING)
+            if value is not MISSING:
+                self._count(endpoint, 'disk_hits')
+                self.memory.set(cache_key, value, self.ttls[endpoint])
+                return copy.deepcopy(value)
+        self._count(endpoint, 'misses')
+        return default
+
+    def set(self, endpoint, key, value):
+        if not self.enabled(endpoint):
+            return
+        cache_key = f'{endpoint}:{key}'
+        ttl = self.ttls[endpoint]
+        value = copy.deepcopy(value)
+        self.memory.set(cache_key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(cache_key, value, ttl)
+
+    def invalidate(self, endpoint, key):
+        cache_key = f'{endpoint}:{key}'
+        self.memory.delete(cache_key)
+        if self.disk is not None:
+            self.disk.delete(cache_key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def snapshot(self):
+        """
+        各接口的命中统计.
+        :return: 列表, 每项包含 endpoint, ttl, memory_hits, disk_hits, misses, hit_rate.
+        """
+        with self._lock:
+            counters = {endpoint: dict(counter) for endpoint, counter in self.counters.items()}
+        items = []
+        for endpoint, ttl in self.ttls.items():
+            counter = counters.get(endpoint, {'memory_hits': 0, 'disk_hits': 0, 'misses': 0})
+            hits = counter['memory_hits'] + counter['disk_hits']
+            total = hits + counter['misses']
+            items.append(dict(endpoint=endpoint, ttl=ttl, hit_rate=round(hits / total, 3) if total else 0.0,
+                              **counter))
+        return items
+
+
+default_response_cache = None
+default_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global default_response_cache
+    if default_response_cache is None:
+        with default_response_cache_lock:
+            if default_response_cache is None:
+                default_response_cache = ResponseCache()
+    return default_response_cache
+
+
+def set_response_cache(response_cache: ResponseCache):
+    global default_response_cache
+    default_response_cache = response_cache
@@ -0,0 +1,241 @@
+"""
+已抓取对象的去重过滤器
+布隆过滤器保存在内存映射文件中, 百万级 ID 只占几 MB, 打开时不需要读入整个文件, 跨运行持久化.
+多个 worker 进程可以打开同一个文件, 写入时加文件锁, 不会互相覆盖.
+布隆过滤器没有漏判, 但有一定比例的误判 (把没见过的当成见过), 可以开启精确校验,
+过滤器判断为见过时再查一次精确集合 (本地 SQLite 或 dy_jobs 的 Broker), 多花一次查询换取零误判.
+多个节点共用一个 Broker 时精确集合是共享的, 本地过滤器没有的对象也要查一次, 其他节点抓取过的对象同样会被跳过.
+
+    DY_SEEN_DIR          过滤器文件目录, 默认 datas/seen, 每个命名空间 (aweme, user, comment) 一个文件
+    DY_SEEN_CAPACITY     新建过滤器的预计元素数量, 默认 1000000
+    DY_SEEN_ERROR_RATE   新建过滤器的误判率, 默认 0.001
+    DY_SEEN_EXACT        为 1 时开启精确校验, 精确集合保存在同目录的 SQLite 中
+    DY_SKIP_SEEN         为 1 时 Data_Spider 默认跳过之前已经抓取过的作品
+"""
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+SEEN_DIR = os.getenv('DY_SEEN_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '../datas/seen')))
+SEEN_CAPACITY = int(os.getenv('DY_SEEN_CAPACITY', '1000000'))
+SEEN_ERROR_RATE = float(os.getenv('DY_SEEN_ERROR_RATE', '0.001'))
+SEEN_EXACT = os.getenv('DY_SEEN_EXACT', '0') == '1'
+SKIP_SEEN = os.getenv('DY_SKIP_SEEN', '0') == '1'
+
+# 文件头: 魔数, 哈希函数个数, 位数, 已添加数量, 设计容量
+HEADER = struct.Struct('<4sIQQQ')
+MAGIC = b'DYBF'
+
+
+class BloomFilter:
+    def __init__(self, path, capacity=None, error_rate=None):
+        """
+        打开或新建过滤器文件, 文件已存在时使用文件中的参数.
+        :param path: 文件路径.
+        :param capacity: 预计元素数量.
+        :param error_rate: 达到预计数量时的误判率.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            capacity = capacity or SEEN_CAPACITY
+            error_rate = error_rate or SEEN_ERROR_RATE
+            bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, hashes, bits, 0, capacity))
+                f.truncate(HEADER.size + (bits + 7) // 8)
+        self.file = open(path, 'r+b')
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        magic, self.hashes, self.bits, self.count, self.capacity = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} 不是过滤器文件')
+        self.warned = False
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        # 双重哈希模拟 k 个哈希函数
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程的写锁, 同一个文件的多个 mmap 共享底层页面, 读改写必须互斥"""
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __contains__(self, key):
+        mm = self.mm
+        return all(mm[HEADER.size + position // 8] & (1 << position % 8) for position in self._positions(key))
+
+    def add(self, key):
+        """
+        :return: 添加前是否不在过滤器中.
+        """
+        added = False
+        with self._lock, self._file_lock():
+            mm = self.mm
+            for position in self._positions(key):
+                index = HEADER.size + position // 8
+                bit = 1 << position % 8
+                if not mm[index] & bit:
+                    mm[index] |= bit
+                    added = True
+            if added:
+                # 其他进程也会更新计数, 以文件头为准
+                self.count = HEADER.unpack_from(mm, 0)[3] + 1
+                HEADER.pack_into(mm, 0, MAGIC, self.hashes, self.bits, self.count, self.capacity)
+                if self.count > self.capacity and not self.warned:
+                    self.warned = True
+                    logger.warning(f'{self.path} 已超过设计容量 {self.capacity}, 误判率会升高')
+        return added
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+        self.file.close()
+
+
+class SqliteSeenSet:
+    """精确集合, 接口与 dy_jobs 的 Broker.add_seen / is_seen 相同"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS seen (namespace TEXT NOT NULL, key TEXT NOT NULL, '
+                              'PRIMARY KEY (namespace, key))')
+
+    def add_seen(self, namespace, key):
+        with self._lock, self.conn:
+            cursor = self.conn.execute('INSERT OR IGNORE INTO seen (namespace, key) VALUES (?, ?)',
+                                       (namespace, str(key)))
+        return cursor.rowcount > 0
+
+    def is_seen(self, namespace, key):
+        with self._lock:
+            row = self.conn.execute('SELECT 1 FROM seen WHERE namespace = ? AND key = ?',
+                                    (namespace, str(key))).fetchone()
+        return row is not None
+
+    def close(self):
+        self.conn.close()
+
+
+class SeenFilter:
+    def __init__(self, namespace, path=None, capacity=None, error_rate=None, exact=None, shared=False):
+        """
+        :param namespace: 命名空间, 例如 aweme, user, comment.
+        :param path: 过滤器文件路径, 默认 DY_SEEN_DIR/{namespace}.bloom.
+        :param exact: 精确集合, 需要 add_seen(namespace, key) 和 is_seen(namespace, key), 为 None 时不做精确校验.
+        :param shared: 精确集合由多个节点共享 (例如 Broker), 本地过滤器没有的对象也查询精确集合.
+        """
+        self.namespace = namespace
+        self.bloom = BloomFilter(path or os.path.join(SEEN_DIR, f'{namespace}.bloom'), capacity, error_rate)
+        self.exact = exact
+        self.shared = shared
+
+    def __contains__(self, key):
+        if key is None:
+            return False
+        if key in self.bloom:
+            return self.exact is None or self.exact.is_seen(self.namespace, key)
+        if self.shared and self.exact is not None and self.exact.is_seen(self.namespace, key):
+            # 其他节点抓取过, 记入本地过滤器, 下次不用再查
+            self.bloom.add(key)
+            return True
+        return False
+
+    def add(self, key):
+        """
+        记录对象.
+        :return: 之前是否没有见过, key 为 None 时返回 True.
+        """
+        if key is None:
+            return True
+        added = self.bloom.add(key)
+        if self.exact is not None:
+            return self.exact.add_seen(self.namespace, key)
+        return added
+
+    def filter(self, items, key, limit=None, taken=None):
+        """
+        取出没有见过的对象, 不做记录, 调用方处理成功后再用 add / mark 记录, 处理失败的对象下次仍会取出.
+        :param items: 对象列表.
+        :param key: 由对象取出 ID 的函数, 取不到时返回 None, 这样的对象不去重.
+        :param limit: 最多取出的数量.
+        :param taken: 本次已经取出的 ID 集合, 用于多页结果之间去重, 新取出的 ID 会加入其中.
+        """
+        new_items = []
+        for item in items:
+            if limit is not None and len(new_items) >= limit:
+                break
+            item_key = key(item)
+            if item_key is not None:
+                if item_key in self or taken is not None and item_key in taken:
+                    continue
+                if taken is not None:
+                    taken.add(item_key)
+            new_items.append(item)
+        return new_items
+
+    def mark(self, items, key):
+        """记录已处理的对象"""
+        for item in items:
+            self.add(key(item))
+
+    def flush(self):
+        self.bloom.flush()
+
+    def close(self):
+        self.bloom.close()
+
+
+default_seen_filters = {}
+default_seen_filters_lock = threading.Lock()
+
+
+def get_seen_filter(namespace) -> SeenFilter:
+    with default_seen_filters_lock:
+        seen = default_seen_filters.get(namespace)
+        if seen is None:
+            exact = SqliteSeenSet(os.path.join(SEEN_DIR, 'seen.db')) if SEEN_EXACT else None
+            seen = SeenFilter(namespace, exact=exact)
+            default_seen_filters[namespace] = seen
+        return seen
+
+
+def set_seen_filter(namespace, seen: SeenFilter):
+    with default_seen_filters_lock:
+        default_seen_filters[namespace] = seen
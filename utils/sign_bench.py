@@ -0,0 +1,211 @@
+"""
+签名耗时基准测试
+离线运行, 统计各签名后端在不同并发下的 p50/p95/p99 延迟和每秒调用次数, 结果写入 JSON,
+可与之前提交的结果对比, 用于发现 dy_ab.js 更新后的性能退化
+
+用法:
+    python -m utils.sign_bench --backends execjs,pool,mini_racer --concurrency 1,4,8 --output bench.json
+    python -m utils.sign_bench --baseline bench_old.json --threshold 1.3
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dy_util
+from utils.sign_corpus import BENCH_PRIVATE_KEY
+from utils.signer import SIGNER_BACKENDS
+
+BENCH_PARAMS = {
+    'device_platform': 'webapp',
+    'aid': '6383',
+    'channel': 'channel_pc_web',
+    'aweme_id': '7212619184386182435',
+    'update_version_code': '170400',
+    'pc_client_type': '1',
+    'version_code': '190500',
+    'version_name': '19.5.0',
+    'cookie_enabled': 'true',
+    'screen_width': '1707',
+    'screen_height': '960',
+    'browser_language': 'zh-CN',
+    'browser_platform': 'Win32',
+    'browser_name': 'Edge',
+    'browser_version': '125.0.0.0',
+    'browser_online': 'true',
+    'engine_name': 'Blink',
+    'engine_version': '125.0.0.0',
+    'os_name': 'Windows',
+    'os_version': '10',
+    'cpu_core_num': '32',
+    'device_memory': '8',
+    'platform': 'PC',
+    'downlink': '10',
+    'effective_type': '4g',
+    'round_trip_time': '100',
+    'webid': '7376449060384935209',
+    'msToken': 'x' * 107,
+}
+BENCH_QUERY = dy_util.splice_url(BENCH_PARAMS)
+
+# (名称, 是否依赖 JS 引擎, 调用)
+CASES = [
+    ('generate_a_bogus', True, lambda: dy_util.generate_a_bogus(BENCH_QUERY, '')),
+    ('generate_req_sign', True, lambda: dy_util.generate_req_sign('ticket=t&path=/p&timestamp=1', BENCH_PRIVATE_KEY)),
+    ('generate_bd_ticket_client_data', True,
+     lambda: dy_util.generate_bd_ticket_client_data('/aweme/v1/web/aweme/collect/', 'ticket', 'ts.2.sign',
+                                                    BENCH_PRIVATE_KEY)),
+    ('generate_signature', True, lambda: dy_util.generate_signature('7379220637308504843', '7376449060384935209')),
+    ('generate_msToken', False, lambda: dy_util.generate_msToken()),
+    ('splice_url', False, lambda: dy_util.splice_url(BENCH_PARAMS)),
+]
+
+
+@contextmanager
+def use_backend(backend):
+    """临时切换签名后端"""
+    old = os.environ.get('DY_SIGN_BACKEND')
+    if backend != 'python':
+        os.environ['DY_SIGN_BACKEND'] = backend
+    try:
+        yield
+    finally:
+        if old is None:
+            os.environ.pop('DY_SIGN_BACKEND', None)
+        else:
+            os.environ['DY_SIGN_BACKEND'] = old
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+    return samples[index]
+
+
+def run_case(func, iterations, concurrency, warmup):
+    for _ in range(warmup):
+        func()
+
+    def timed(_):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'calls_per_sec': round(iterations / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)), encoding='utf-8').strip()
+    except Exception:
+        return None
+
+
+def run(backends, concurrency_levels, iterations, warmup, cases=None):
+    results = {}
+    plans = [('python', [case for case in CASES if not case[1]])]
+    plans += [(backend, [case for case in CASES if case[1]]) for backend in backends]
+    for backend, backend_cases in plans:
+        with use_backend(backend):
+            for name, _, func in backend_cases:
+                if cases and name not in cases:
+                    continue
+                for concurrency in concurrency_levels:
+                    try:
+                        stats = run_case(func, iterations, concurrency, warmup)
+                    except Exception as e:
+                        stats = {'error': f'{type(e).__name__}: {e}'}
+                    results.setdefault(backend, {}).setdefault(name, {})[str(concurrency)] = stats
+                    print(f'{backend:<8} {name:<32} c={concurrency:<3} {format_stats(stats)}')
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': iterations,
+        },
+        'results': results,
+    }
+
+
+def format_stats(stats):
+    if 'error' in stats:
+        return f"error: {stats['error'].splitlines()[0]}"
+    return (f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms "
+            f"{stats['calls_per_sec']}/s")
+
+
+def compare(current, baseline, threshold):
+    """对比基线, 返回 p50 或 p95 变慢超过 threshold 倍的条目"""
+    regressions = []
+    for backend, cases in current['results'].items():
+        for name, levels in cases.items():
+            for concurrency, stats in levels.items():
+                old = baseline.get('results', {}).get(backend, {}).get(name, {}).get(concurrency)
+                if not old or 'error' in old or 'error' in stats:
+                    continue
+                for key in ('p50_ms', 'p95_ms'):
+                    if old[key] > 0 and stats[key] / old[key] > threshold:
+                        regressions.append(f'{backend} {name} c={concurrency} {key}: {old[key]} -> {stats[key]}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='签名耗时基准测试')
+    parser.add_argument('--backends', default=','.join(SIGNER_BACKENDS), help='逗号分隔的签名后端')
+    parser.add_argument('--concurrency', default='1,4,8', help='逗号分隔的并发数')
+    parser.add_argument('--iterations', type=int, default=50, help='每组调用次数')
+    parser.add_argument('--warmup', type=int, default=3, help='每组预热次数')
+    parser.add_argument('--cases', default='', help='只跑指定用例, 逗号分隔')
+    parser.add_argument('--output', default='', help='结果 JSON 输出路径')
+    parser.add_argument('--baseline', default='', help='用于对比的历史结果 JSON')
+    parser.add_argument('--threshold', type=float, default=1.3, help='相对基线允许的最大变慢倍数')
+    args = parser.parse_args(argv)
+
+    report = run(
+        backends=[b for b in args.backends.split(',') if b],
+        concurrency_levels=[int(c) for c in args.concurrency.split(',') if c],
+        iterations=args.iterations,
+        warmup=args.warmup,
+        cases=[c for c in args.cases.split(',') if c],
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'结果保存至 {args.output}')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f'[REGRESSION] {line}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+常驻 Node 签名进程池
+每个进程启动时只加载一次 dy_ab.js / dy_live_sign.js, 之后通过管道按行收发 JSON,
+避免 PyExecJS 每次调用都重新启动 Node 并解析 1.2 MB 的签名脚本
+
+    DY_SIGN_TIMEOUT   单次签名的超时(秒), 默认 10, 超时后杀掉并重启进程
+"""
+import atexit
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from os import path
+
+SIGN_TIMEOUT = float(os.getenv('DY_SIGN_TIMEOUT', '10'))
+
+
+class SignWorkerError(Exception):
+    """签名脚本执行出错 (进程本身仍可用)"""
+
+
+class SignWorkerCrashed(SignWorkerError):
+    """签名进程退出或管道断开"""
+
+
+class SignWorkerTimeout(SignWorkerError):
+    """签名超时, 进程已被重启"""
+
+
+class SignWorker:
+    def __init__(self, worker_path, dy_path, sign_path, node_modules, node_bin=None, timeout=None):
+        self.worker_path = worker_path
+        self.dy_path = dy_path
+        self.sign_path = sign_path
+        self.node_modules = node_modules
+        self.node_bin = node_bin or os.getenv('DY_NODE_BIN') or shutil.which('node') or 'node'
+        self.timeout = SIGN_TIMEOUT if timeout is None else timeout
+        self.process = None
+        self._lines = None
+        self._seq = 0
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [self.node_bin, self.worker_path, self.dy_path, self.sign_path, self.node_modules],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        # 由读线程转发输出, 等待响应时可以设置超时, 每个进程一个队列, 不会读到旧进程的输出
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process.stdout, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _read(stdout, lines):
+        try:
+            for line in stdout:
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        # 进程退出或管道关闭
+        lines.put('')
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=3)
+        except Exception:
+            self.process.kill()
+        self.process = None
+
+    def kill(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def _request(self, fn, args):
+        self._seq += 1
+        request = json.dumps({'id': self._seq, 'fn': fn, 'args': list(args)}, ensure_ascii=False)
+        try:
+            self.process.stdin.write(request + '\n')
+            self.process.stdin.flush()
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    # 脚本卡死时不会再有输出, 杀掉进程并重新拉起, 本次调用报错
+                    self.kill()
+                    self.start()
+                    raise SignWorkerTimeout(f'sign worker did not answer {fn} within {self.timeout}s')
+                if not line:
+                    raise SignWorkerCrashed(f'sign worker exited with code {self.process.poll()}')
+                response = json.loads(line)
+                # 丢弃上一次崩溃前残留的响应
+                if response.get('id') == self._seq:
+                    break
+        except (OSError, ValueError) as e:
+            raise SignWorkerCrashed(str(e)) from e
+        if 'error' in response:
+            raise SignWorkerError(response['error'])
+        return response.get('result')
+
+    def call(self, fn, *args):
+        if not self.alive():
+            self.start()
+        try:
+            return self._request(fn, args)
+        except SignWorkerCrashed:
+            # 进程崩溃后重启并重试一次
+            self.restart()
+            return self._request(fn, args)
+
+
+class SignWorkerPool:
+    def __init__(self, dy_path, sign_path, node_modules, size=None, worker_path=None):
+        if size is None:
+            size = int(os.getenv('DY_SIGN_POOL_SIZE', '2'))
+        self.size = max(1, size)
+        self.dy_path = dy_path
+        self.sign_path = sign_path
+        self.node_modules = node_modules
+        self.worker_path = worker_path or path.join(path.dirname(dy_path), 'sign_worker.js')
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for _ in range(self.size):
+                worker = SignWorker(self.worker_path, self.dy_path, self.sign_path, self.node_modules)
+                self._workers.append(worker)
+                self._idle.put(worker)
+            atexit.register(self.close)
+
+    def start(self):
+        """提前拉起全部进程并完成脚本加载"""
+        self._ensure_workers()
+        workers = [self._idle.get() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                worker.call('ping')
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+        return self
+
+    def call(self, fn, *args):
+        if self._closed:
+            raise SignWorkerError('sign worker pool is closed')
+        self._ensure_workers()
+        worker = self._idle.get()
+        try:
+            return worker.call(fn, *args)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            worker.stop()
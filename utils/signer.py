@@ -0,0 +1,240 @@
+"""
+签名后端
+Signer 为每种签名提供一个方法, 通过 DY_SIGN_BACKEND 环境变量选择实现:
+    execjs      PyExecJS, 每次调用启动一个 Node 进程
+    pool        常驻 Node 签名进程池 (默认)
+    mini_racer  进程内嵌 V8 (需安装 mini-racer), 直播签名依赖 sdenv, 仍交给 Node 处理
+"""
+import os
+import sys
+import threading
+from os import path
+
+import execjs
+
+from utils.sign_pool import SignWorkerPool
+
+if getattr(sys, 'frozen', None):
+    basedir = sys._MEIPASS
+else:
+    basedir = path.dirname(__file__)
+
+
+def find_root_dir():
+    # 打包后 static 与 node_modules 位于 basedir, 源码运行时位于上一级目录
+    for root in (basedir, path.join(basedir, '..')):
+        if path.exists(path.join(root, 'static', 'dy_ab.js')):
+            return path.abspath(root)
+    return path.abspath(path.join(basedir, '..'))
+
+
+root_dir = find_root_dir()
+node_modules = path.join(root_dir, 'node_modules')
+dy_path = path.join(root_dir, 'static', 'dy_ab.js')
+sign_path = path.join(root_dir, 'static', 'dy_live_sign.js')
+
+
+def read_js(js_path):
+    with open(js_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class Signer:
+    name = ''
+
+    def a_bogus(self, query, data=''):
+        raise NotImplementedError
+
+    def a_bogus_batch(self, pairs):
+        return [self.a_bogus(query, data) for query, data in pairs]
+
+    def req_sign(self, e, prik):
+        raise NotImplementedError
+
+    def ree_key(self, prik):
+        raise NotImplementedError
+
+    def live_signature(self, room_id, user_unique_id):
+        raise NotImplementedError
+
+    def warm_up(self, live=False):
+        pass
+
+    def close(self):
+        pass
+
+
+class ExecJSSigner(Signer):
+    name = 'execjs'
+
+    def __init__(self):
+        # 签名脚本在首次使用时才编译, 避免导入就读取 1.2 MB 的 JS
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def _js(self, js_path):
+        js = self._compiled.get(js_path)
+        if js is None:
+            with self._lock:
+                js = self._compiled.get(js_path)
+                if js is None:
+                    js = execjs.compile(read_js(js_path), cwd=node_modules)
+                    self._compiled[js_path] = js
+        return js
+
+    def a_bogus(self, query, data=''):
+        return self._js(dy_path).call('get_ab', query, data)
+
+    def a_bogus_batch(self, pairs):
+        return self._js(dy_path).call('get_ab_batch', [[query, data] for query, data in pairs])
+
+    def req_sign(self, e, prik):
+        return self._js(dy_path).call('get_req_sign', e, prik)
+
+    def ree_key(self, prik):
+        return self._js(dy_path).call('get_ree_key', prik)
+
+    def live_signature(self, room_id, user_unique_id):
+        return self._js(sign_path).call('sign', room_id, user_unique_id)
+
+    def warm_up(self, live=False):
+        self._js(dy_path)
+        if live:
+            self._js(sign_path)
+
+
+class NodePoolSigner(Signer):
+    name = 'pool'
+
+    def __init__(self, size=None):
+        self.pool = SignWorkerPool(dy_path, sign_path, node_modules, size=size)
+
+    def a_bogus(self, query, data=''):
+        return self.pool.call('get_ab', query, data)
+
+    def a_bogus_batch(self, pairs):
+        return self.pool.call('get_ab_batch', [[query, data] for query, data in pairs])
+
+    def req_sign(self, e, prik):
+        return self.pool.call('get_req_sign', e, prik)
+
+    def ree_key(self, prik):
+        return self.pool.call('get_ree_key', prik)
+
+    def live_signature(self, room_id, user_unique_id):
+        return self.pool.call('sign', room_id, user_unique_id)
+
+    def warm_up(self, live=False):
+        self.pool.start()
+
+    def close(self):
+        self.pool.close()
+
+
+class MiniRacerSigner(Signer):
+    name = 'mini_racer'
+
+    # 在 V8 里模拟 require('jsrsasign')
+    require_shim = '''
+var module = {exports: {}};
+var exports = module.exports;
+%s
+var __modules = {jsrsasign: module.exports};
+function require(name) {
+    if (!(name in __modules)) {
+        throw new Error("module not available in mini_racer: " + name);
+    }
+    return __modules[name];
+}
+'''
+
+    def __init__(self, fallback=None):
+        self._ctx = None
+        self._lock = threading.Lock()
+        self.fallback = fallback
+
+    def _context(self):
+        if self._ctx is None:
+            from py_mini_racer import MiniRacer
+            ctx = MiniRacer()
+            jsrsasign_path = path.join(node_modules, 'jsrsasign', 'lib', 'jsrsasign.js')
+            ctx.eval(self.require_shim % read_js(jsrsasign_path))
+            ctx.eval(read_js(dy_path))
+            self._ctx = ctx
+        return self._ctx
+
+    def _call(self, fn, *args):
+        # MiniRacer 上下文不是线程安全的
+        with self._lock:
+            return self._context().call(fn, *args)
+
+    def a_bogus(self, query, data=''):
+        return self._call('get_ab', query, data)
+
+    def a_bogus_batch(self, pairs):
+        return self._call('get_ab_batch', [[query, data] for query, data in pairs])
+
+    def req_sign(self, e, prik):
+        return self._call('get_req_sign', e, prik)
+
+    def ree_key(self, prik):
+        return self._call('get_ree_key', prik)
+
+    def _live_signer(self):
+        # 直播签名脚本依赖 node 的 vm 和 sdenv, 无法在 V8 里运行, 交给 execjs
+        if self.fallback is None:
+            self.fallback = ExecJSSigner()
+        return self.fallback
+
+    def live_signature(self, room_id, user_unique_id):
+        return self._live_signer().live_signature(room_id, user_unique_id)
+
+    def warm_up(self, live=False):
+        with self._lock:
+            self._context()
+        if live:
+            self._live_signer().warm_up(live)
+
+
+SIGNER_BACKENDS = {
+    ExecJSSigner.name: ExecJSSigner,
+    NodePoolSigner.name: NodePoolSigner,
+    MiniRacerSigner.name: MiniRacerSigner,
+}
+
+signers = {}
+signers_lock = threading.Lock()
+
+
+def register_signer(name, signer_cls):
+    SIGNER_BACKENDS[name] = signer_cls
+
+
+def default_backend():
+    backend = os.getenv('DY_SIGN_BACKEND', '')
+    if backend:
+        return backend
+    # 兼容旧配置: DY_SIGN_POOL_SIZE=0 表示不使用进程池
+    return 'execjs' if int(os.getenv('DY_SIGN_POOL_SIZE', '2')) <= 0 else 'pool'
+
+
+def get_signer(name=None) -> Signer:
+    name = name or default_backend()
+    signer = signers.get(name)
+    if signer is None:
+        with signers_lock:
+            signer = signers.get(name)
+            if signer is None:
+                if name not in SIGNER_BACKENDS:
+                    raise ValueError(f'未知的签名后端: {name}, 可选: {", ".join(SIGNER_BACKENDS)}')
+                signer = SIGNER_BACKENDS[name]()
+                signers[name] = signer
+    return signer
+
+
+def warm_up(live=False):
+    """
+    预热当前签名后端, 供 API 服务启动时调用.
+    :param live: 是否同时预热直播签名脚本.
+    """
+    get_signer().warm_up(live)
@@ -0,0 +1,120 @@
+"""
+请求合并 (single-flight)
+相同键的请求同时在途时只有第一个真正发出, 其余调用方等待并共享它的结果或异常.
+同步调用和协程分开合并, 同步用线程事件等待, 异步用共享的 Task 等待.
+"""
+import asyncio
+import copy
+import threading
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """同步版本, 多线程共享"""
+
+    def __init__(self):
+        self.flights = {}
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        执行 fn, 同一个 key 已有在途调用时等待它的结果.
+        :param key: 可哈希的请求标识.
+        :param fn: 无参函数.
+        :return: fn 的返回值, 多个调用方共享时每个调用方拿到各自的副本.
+        """
+        with self._lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                self.flights[key] = flight
+                self.calls += 1
+            else:
+                flight.waiters += 1
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self.flights[key]
+            flight.done.set()
+        # 有其他调用方在复制结果时不能把原对象交给调用方修改
+        return copy.deepcopy(flight.result) if flight.waiters else flight.result
+
+    def stats(self):
+        return {'inflight': len(self.flights), 'calls': self.calls, 'shared': self.shared}
+
+
+class AsyncSingleFlight:
+    """异步版本, 在途请求以 Task 运行, 发起的协程被取消不影响其他等待方"""
+
+    def __init__(self):
+        self.flights = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """
+        执行 fn, 同一个 key 已有在途调用时等待它的结果.
+        :param key: 可哈希的请求标识.
+        :param fn: 无参函数, 返回 awaitable.
+        :return: fn 的结果, 多个调用方共享时每个调用方拿到各自的副本.
+        """
+        # Task 绑定事件循环, 不同事件循环的请求不合并
+        key = (id(asyncio.get_running_loop()), key)
+        flight = self.flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = [task, 0]
+            self.flights[key] = flight
+            self.calls += 1
+            task.add_done_callback(lambda _: self.flights.pop(key, None))
+            result = await asyncio.shield(task)
+            return copy.deepcopy(result) if flight[1] else result
+        flight[1] += 1
+        self.shared += 1
+        result = await asyncio.shield(flight[0])
+        return copy.deepcopy(result)
+
+    def stats(self):
+        return {'inflight': len(self.flights), 'calls': self.calls, 'shared': self.shared}
+
+
+default_single_flight = SingleFlight()
+default_async_single_flight = AsyncSingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return default_single_flight
+
+
+def set_single_flight(single_flight: SingleFlight):
+    global default_single_flight
+    default_single_flight = single_flight
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    return default_async_single_flight
+
+
+def set_async_single_flight(single_flight: AsyncSingleFlight):
+    global default_async_single_flight
+    default_async_single_flight = single_flight
@@ -0,0 +1,232 @@
+"""
+共享 HTTP 传输层
+所有请求复用同一个 requests.Session, 按域名保持长连接池, 统一超时和重试
+"""
+import os
+import threading
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlencode
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.proxy_pool import ProxyPool
+
+requests.packages.urllib3.disable_warnings()
+
+HTTP_POOL_HOSTS = int(os.getenv('DY_HTTP_POOL_HOSTS', '10'))
+HTTP_POOL_SIZE = int(os.getenv('DY_HTTP_POOL_SIZE', '20'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('DY_HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('DY_HTTP_READ_TIMEOUT', '30'))
+HTTP_RETRIES = int(os.getenv('DY_HTTP_RETRIES', '2'))
+# 单独配置某些域名的连接池大小, 例如 "www.douyin.com=50,live.douyin.com=10"
+HTTP_HOST_POOL_SIZES = os.getenv('DY_HTTP_HOST_POOL_SIZES', '')
+# 经代理请求时出现这些状态码, 记为代理失败
+PROXY_ERROR_STATUS = (407, 502, 504)
+
+
+def parse_host_pool_sizes(value):
+    sizes = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        host, size = item.split('=', 1)
+        host = host.strip()
+        if not host.startswith('http'):
+            host = f'https://{host}'
+        sizes[host] = int(size)
+    return sizes
+
+
+def parse_json(res):
+    return res.json()
+
+
+class ApiRequest:
+    """
+    一次接口调用需要的全部信息, 由 DouyinAPI 构造, 同步和异步客户端共用.
+    parse 接收响应对象 (requests.Response 或 httpx.Response), 返回接口结果.
+    expect 为正常响应必须包含的字段, 缺失时视为被限流.
+    proxies 为 requests 风格的代理字典或 ProxyPool, 为 None 时使用传输层的代理池.
+    """
+
+    def __init__(self, method, url, params=None, headers=None, cookies=None, data=None, parse=parse_json,
+                 verify=False, expect=None, proxies=None):
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.data = data
+        self.parse = parse
+        self.verify = verify
+        self.expect = expect
+        self.proxies = proxies
+
+    def full_url(self):
+        # 与 requests 一致地编码查询参数, 保证 a_bogus 签名的字符串就是实际发送的字符串
+        if not self.params:
+            return self.url
+        return f'{self.url}?{urlencode(self.params, doseq=True)}'
+
+    def cookie_header(self):
+        return '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+
+
+class Transport:
+    def __init__(self, pool_size=None, pool_hosts=None, connect_timeout=None, read_timeout=None, retries=None,
+                 host_pool_sizes=None, proxy_pool=None):
+        self.pool_size = pool_size or HTTP_POOL_SIZE
+        self.pool_hosts = pool_hosts or HTTP_POOL_HOSTS
+        self.timeout = (connect_timeout or HTTP_CONNECT_TIMEOUT, read_timeout or HTTP_READ_TIMEOUT)
+        self.retries = HTTP_RETRIES if retries is None else retries
+        if host_pool_sizes is None:
+            host_pool_sizes = parse_host_pool_sizes(HTTP_HOST_POOL_SIZES)
+        self.session = requests.Session()
+        # 不在会话里保存响应下发的 cookie, 避免不同账号之间串号, cookie 由调用方每次传入
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        default_adapter = self._adapter(self.pool_size)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+        for host, size in host_pool_sizes.items():
+            self.session.mount(host, self._adapter(size))
+        # 未指定时使用 DY_PROXIES / DY_PROXY_FILE 配置的代理, 都没有配置则直连
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_env()
+
+    def _adapter(self, pool_size):
+        # POST 不是幂等的, 只对连接失败重试; GET/HEAD 额外对 5xx 重试
+        retry = Retry(total=self.retries, connect=self.retries, read=self.retries, status=self.retries,
+                      backoff_factor=0.3, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET', 'HEAD']), raise_on_status=False)
+        return HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=pool_size, max_retries=retry)
+
+    def request(self, method, url, proxy_pool=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        proxy_pool = proxy_pool or self.proxy_pool
+        if not proxy_pool or kwargs.get('proxies'):
+            return self.session.request(method, url, **kwargs)
+        with proxy_pool.use() as lease:
+            if lease.proxy is not None:
+                kwargs['proxies'] = lease.proxy.as_requests()
+            res = self.session.request(method, url, **kwargs)
+            lease.ok = res.status_code not in PROXY_ERROR_STATUS
+            return res
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def send(self, api_request: ApiRequest):
+        proxies = api_request.proxies
+        if isinstance(proxies, ProxyPool):
+            proxy_pool, proxies = proxies, None
+        else:
+            proxy_pool = None
+        return self.request(api_request.method, api_request.url, proxy_pool=proxy_pool, params=api_request.params,
+                            headers=api_request.headers, cookies=api_request.cookies, data=api_request.data,
+                            verify=api_request.verify, proxies=proxies)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport:
+    """基于 httpx.AsyncClient 的异步传输层, 连接池, 超时和代理池配置与 Transport 相同"""
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None, retries=None, proxy_pool=None):
+        pool_size = pool_size or HTTP_POOL_SIZE
+        self.retries = HTTP_RETRIES if retries is None else retries
+        self.timeout = httpx.Timeout(read_timeout or HTTP_READ_TIMEOUT,
+                                     connect=connect_timeout or HTTP_CONNECT_TIMEOUT)
+        self.limits = httpx.Limits(max_connections=pool_size * HTTP_POOL_HOSTS, max_keepalive_connections=pool_size)
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_env()
+        self.client = self._make_client()
+        # httpx 的代理按客户端配置, 每个代理一个客户端
+        self.proxy_clients = {}
+
+    def _make_client(self, proxy=None):
+        # 同 Transport, 不保存响应下发的 cookie
+        cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        transport = httpx.AsyncHTTPTransport(retries=self.retries, limits=self.limits, verify=False, proxy=proxy)
+        return httpx.AsyncClient(timeout=self.timeout, cookies=cookies, transport=transport)
+
+    def _client(self, proxy_url=None):
+        if proxy_url is None:
+            return self.client
+        client = self.proxy_clients.get(proxy_url)
+        if client is None:
+            client = self._make_client(proxy_url)
+            self.proxy_clients[proxy_url] = client
+        return client
+
+    async def request(self, method, url, proxy_pool=None, proxy=None, **kwargs):
+        proxy_pool = proxy_pool or self.proxy_pool
+        if not proxy_pool or proxy:
+            return await self._client(proxy).request(method, url, **kwargs)
+        async with proxy_pool.use_async() as lease:
+            proxy = lease.proxy.url if lease.proxy is not None else None
+            res = await self._client(proxy).request(method, url, **kwargs)
+            lease.ok = res.status_code not in PROXY_ERROR_STATUS
+            return res
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def send(self, api_request: ApiRequest):
+        headers = dict(api_request.headers)
+        if api_request.cookies:
+            # httpx 不再支持按请求传 cookies, 直接写入请求头
+            headers['cookie'] = api_request.cookie_header()
+        proxies = api_request.proxies
+        proxy_pool = proxies if isinstance(proxies, ProxyPool) else None
+        proxy = proxies.get('https') or proxies.get('http') if isinstance(proxies, dict) else None
+        return await self.request(api_request.method, api_request.full_url(), proxy_pool=proxy_pool, proxy=proxy,
+                                  headers=headers, data=api_request.data)
+
+    async def close(self):
+        await self.client.aclose()
+        for client in self.proxy_clients.values():
+            await client.aclose()
+
+
+default_transport = None
+default_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    global default_transport
+    if default_transport is None:
+        with default_transport_lock:
+            if default_transport is None:
+                default_transport = Transport()
+    return default_transport
+
+
+def set_transport(transport: Transport):
+    global default_transport
+    default_transport = transport
+
+
+default_async_transport = None
+
+
+def get_async_transport() -> AsyncTransport:
+    global default_async_transport
+    if default_async_transport is None:
+        default_async_transport = AsyncTransport()
+    return default_async_transport
+
+
+def set_async_transport(transport: AsyncTransport):
+    global default_async_transport
+    default_async_transport = transport
@@ -0,0 +1,73 @@
+"""
+已抓取作品索引
+按 sec_uid 记录已经抓取过的 aweme_id, 增量同步用户作品时遇到整页都已抓取过就停止翻页.
+
+    DY_WORK_INDEX_DB   索引文件路径, 默认 datas/work_index.db
+"""
+import os
+import sqlite3
+import threading
+import time
+
+WORK_INDEX_DB = os.getenv('DY_WORK_INDEX_DB', os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '../datas/work_index.db')))
+
+
+class WorkIndex:
+    def __init__(self, path=None):
+        self.path = path or WORK_INDEX_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS known_works ('
+                              'sec_uid TEXT NOT NULL, aweme_id TEXT NOT NULL, create_time INTEGER, '
+                              'synced_at REAL NOT NULL, PRIMARY KEY (sec_uid, aweme_id))')
+
+    def known(self, sec_uid) -> set:
+        """
+        用户已抓取过的作品.
+        :param sec_uid: 用户 sec_uid.
+        :return: aweme_id 集合.
+        """
+        with self._lock:
+            rows = self.conn.execute('SELECT aweme_id FROM known_works WHERE sec_uid = ?', (sec_uid,)).fetchall()
+        return {aweme_id for aweme_id, in rows}
+
+    def add(self, sec_uid, aweme_id, create_time=None):
+        """
+        记录已抓取的作品.
+        :param sec_uid: 用户 sec_uid.
+        :param aweme_id: 作品ID.
+        :param create_time: 作品发布时间.
+        """
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO known_works (sec_uid, aweme_id, create_time, synced_at) '
+                              'VALUES (?, ?, ?, ?)', (sec_uid, str(aweme_id), create_time, time.time()))
+
+    def forget(self, sec_uid):
+        """清空用户的索引, 下次同步时重新抓取全部作品"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM known_works WHERE sec_uid = ?', (sec_uid,))
+
+    def close(self):
+        self.conn.close()
+
+
+default_work_index = None
+default_work_index_lock = threading.Lock()
+
+
+def get_work_index() -> WorkIndex:
+    global default_work_index
+    if default_work_index is None:
+        with default_work_index_lock:
+            if default_work_index is None:
+                default_work_index = WorkIndex()
+    return default_work_index
+
+
+def set_work_index(work_index: WorkIndex):
+    global default_work_index
+    default_work_index = work_index